@@ -0,0 +1,78 @@
+# alarm_skill4/tests/bench_scheduler.py
+"""
+Бенчмарк AlarmScheduler: вставка/отмена и разброс момента срабатывания (jitter)
+при большом числе ожидающих будильников.
+
+    python bench_scheduler.py --alarms 10000 --spread 3
+"""
+import argparse
+import importlib
+import importlib.machinery
+import importlib.util
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+SKILL_DIR = Path(__file__).resolve().parents[1]  # alarm_skill4/
+
+
+def load_skill():
+    # handlers/ — пакет: main.py импортирует хелперы относительно
+    spec = importlib.machinery.ModuleSpec("alarm_skill4_bench", None, is_package=True)
+    spec.submodule_search_locations = [str(SKILL_DIR / "handlers")]
+    sys.modules["alarm_skill4_bench"] = importlib.util.module_from_spec(spec)
+    return importlib.import_module("alarm_skill4_bench.main")
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AlarmScheduler wake-up jitter benchmark")
+    parser.add_argument("--alarms", type=int, default=10000, help="pending alarms")
+    parser.add_argument("--spread", type=float, default=3.0, help="alarms fire within this many seconds")
+    parser.add_argument("--cancel", type=float, default=0.1, help="share of alarms cancelled before firing")
+    args = parser.parse_args(argv)
+
+    skill = load_skill()
+    scheduler = skill.AlarmScheduler()
+    rnd = random.Random(1)
+    jitter = []
+    done = threading.Event()
+    lock = threading.Lock()
+    expected = args.alarms - int(args.alarms * args.cancel)
+
+    def on_fire(alarm_id, fire_at):
+        with lock:
+            jitter.append(time.time() - fire_at)
+            if len(jitter) >= expected:
+                done.set()
+
+    base = time.time() + 1.0
+    threads_before = threading.active_count()
+    started = time.perf_counter()
+    for i in range(args.alarms):
+        scheduler.schedule(i, base + rnd.uniform(0, args.spread), on_fire)
+    insert_s = time.perf_counter() - started
+    threads_during = threading.active_count()
+
+    started = time.perf_counter()
+    for i in rnd.sample(range(args.alarms), args.alarms - expected):
+        scheduler.cancel(i)
+    cancel_s = time.perf_counter() - started
+
+    done.wait(args.spread + 10)
+    scheduler.stop()
+
+    ms = [j * 1000 for j in jitter]
+    print(f"alarms={args.alarms} fired={len(ms)} threads={threads_during - threads_before} (scheduler)")
+    print(f"insert: {insert_s / args.alarms * 1e6:.2f} us/op, cancel: {cancel_s / max(1, args.alarms - expected) * 1e6:.2f} us/op")
+    print(f"jitter ms: p50={percentile(ms, 0.5):.3f} p99={percentile(ms, 0.99):.3f} max={max(ms, default=0):.3f}")
+
+
+if __name__ == "__main__":
+    main()
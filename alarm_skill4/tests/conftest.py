@@ -0,0 +1,25 @@
+# alarm_skill4/tests/conftest.py
+import importlib
+import importlib.machinery
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+SKILL_DIR = Path(__file__).resolve().parents[1]  # alarm_skill4/
+
+
+@pytest.fixture(scope="module")
+def skill(request):
+    """
+    handlers/main.py, загруженный как <пакет>.main (хелперы в handlers/ импортируются
+    относительно); у каждого тестового файла свой пакет и свой экземпляр модуля.
+    """
+    package = f"alarm_skill4_{request.module.__name__.rpartition('.')[2]}"
+    spec = importlib.machinery.ModuleSpec(package, None, is_package=True)
+    spec.submodule_search_locations = [str(SKILL_DIR / "handlers")]
+    sys.modules[package] = importlib.util.module_from_spec(spec)
+    yield importlib.import_module(f"{package}.main")
+    for name in [n for n in sys.modules if n == package or n.startswith(package + ".")]:
+        del sys.modules[name]
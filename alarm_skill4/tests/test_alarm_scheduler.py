@@ -0,0 +1,120 @@
+# alarm_skill4/tests/test_alarm_scheduler.py
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def scheduler(skill):
+    scheduler = skill.AlarmScheduler()
+    yield scheduler
+    scheduler.stop()
+
+
+class Recorder:
+    def __init__(self, expected=1):
+        self.fired = []
+        self._expected = expected
+        self._lock = threading.Lock()
+        self.done = threading.Event()
+
+    def __call__(self, alarm_id, fire_at):
+        with self._lock:
+            self.fired.append((alarm_id, fire_at, time.time()))
+            if len(self.fired) >= self._expected:
+                self.done.set()
+
+    @property
+    def ids(self):
+        return [alarm_id for alarm_id, _fire_at, _at in self.fired]
+
+
+def test_fires_in_due_order(scheduler):
+    rec = Recorder(expected=3)
+    now = time.time()
+    scheduler.schedule("b", now + 0.10, rec)
+    scheduler.schedule("a", now + 0.05, rec)
+    scheduler.schedule("c", datetime.fromtimestamp(now + 0.15), rec)
+    assert rec.done.wait(5)
+    assert rec.ids == ["a", "b", "c"]
+    assert all(at >= fire_at for _id, fire_at, at in rec.fired)
+    assert scheduler.pending() == 0
+
+
+def test_cancel_and_replace(scheduler):
+    rec = Recorder(expected=1)
+    now = time.time()
+    scheduler.schedule("gone", now + 0.05, rec)
+    scheduler.schedule("moved", now + 0.05, rec)
+    scheduler.schedule("moved", now + 0.10, rec)  # same id replaces the alarm
+    assert scheduler.cancel("gone")
+    assert not scheduler.cancel("unknown")
+    assert scheduler.next_fire_at("moved") == pytest.approx(now + 0.10)
+    assert rec.done.wait(5)
+    time.sleep(0.1)
+    assert [(alarm_id, round(fire_at - now, 2)) for alarm_id, fire_at, _at in rec.fired] == [("moved", 0.10)]
+
+
+def test_repeating_alarm_reschedules(scheduler):
+    rec = Recorder(expected=3)
+    scheduler.schedule("daily", time.time() + 0.02, rec, repeat=timedelta(seconds=0.05))
+    assert rec.done.wait(5)
+    assert scheduler.pending() == 1
+    fire_times = [fire_at for _id, fire_at, _at in rec.fired[:3]]
+    periods = [(b - a) / 0.05 for a, b in zip(fire_times, fire_times[1:])]
+    # следующий срок — по сетке wall-clock; под нагрузкой пропущенные периоды не догоняются
+    assert all(p >= 1 - 1e-6 and abs(p - round(p)) < 1e-6 for p in periods)
+    assert scheduler.cancel("daily")
+
+
+def test_schedule_many(scheduler):
+    rec = Recorder(expected=50)
+    now = time.time()
+    scheduler.schedule_many((f"a{i}", now + 0.001 * (50 - i), rec, None) for i in range(50))
+    assert scheduler.pending() == 50
+    assert rec.done.wait(5)
+    assert rec.ids == [f"a{i}" for i in reversed(range(50))]
+
+
+def test_callback_error_does_not_stop_the_thread(scheduler):
+    rec = Recorder(expected=1)
+
+    def broken(alarm_id, fire_at):
+        raise RuntimeError("speaker unplugged")
+
+    now = time.time()
+    scheduler.schedule("broken", now + 0.01, broken)
+    scheduler.schedule("ok", now + 0.05, rec)
+    assert rec.done.wait(5)
+    assert rec.ids == ["ok"]
+
+
+def test_heap_rebuilt_after_many_cancels(scheduler):
+    far = time.time() + 3600
+    for i in range(200):
+        scheduler.schedule(f"a{i}", far + i, Recorder())
+    for i in range(150):
+        scheduler.cancel(f"a{i}")
+    assert scheduler.pending() == 50
+    assert len(scheduler._heap) <= 2 * scheduler.pending() + 64
+
+
+def test_clock_jump_recomputes_deadlines(scheduler, monkeypatch):
+    rec = Recorder(expected=1)
+    scheduler.schedule("jump", time.time() + 3600, rec)
+    real_time = time.time
+    monkeypatch.setattr(time, "time", lambda: real_time() + 3600)  # wall clock set forward one hour
+    with scheduler._cond:
+        scheduler._cond.notify()
+    assert rec.done.wait(5)
+    assert rec.ids == ["jump"]
+
+
+def test_stop_joins_the_thread(scheduler):
+    scheduler.schedule("x", time.time() + 3600, Recorder())
+    thread = scheduler._thread
+    scheduler.stop()
+    assert not thread.is_alive()
+    assert scheduler._thread is None
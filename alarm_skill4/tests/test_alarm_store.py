@@ -0,0 +1,128 @@
+# alarm_skill4/tests/test_alarm_store.py
+import json
+
+import pytest
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "alarms.journal"), str(tmp_path / "alarms.snapshot.json")
+
+
+def test_put_remove_survive_restart(skill, paths):
+    store = skill.AlarmStore(*paths).load()
+    store.put("a", 200.0)
+    store.put("b", 100.0, 86400.0)
+    store.put("c", 300.0)
+    store.remove("c")
+
+    reloaded = skill.AlarmStore(*paths).load()
+    assert [a["id"] for a in reloaded.all()] == ["b", "a"]
+    assert reloaded.get("b")["repeat"] == 86400.0
+    assert [a["id"] for a in reloaded.due_before(150.0)] == ["b"]
+
+
+def test_torn_tail_is_truncated_and_nothing_lost_after_two_restarts(skill, paths):
+    journal, _snapshot = paths
+    store = skill.AlarmStore(*paths).load()
+    store.put("a", 100.0)
+    with open(journal, "a", encoding="utf-8") as f:
+        f.write('{"op": "set", "id": "torn", "fi')  # сбой посреди записи
+
+    first = skill.AlarmStore(*paths).load()
+    assert [a["id"] for a in first.all()] == ["a"]
+    first.put("b", 200.0)  # без обрезки эта запись склеилась бы с мусором
+
+    second = skill.AlarmStore(*paths).load()
+    assert [a["id"] for a in second.all()] == ["a", "b"]
+    second.put("c", 300.0)
+
+    third = skill.AlarmStore(*paths).load()
+    assert [a["id"] for a in third.all()] == ["a", "b", "c"]
+    with open(journal, encoding="utf-8") as f:
+        assert all(json.loads(line)["id"] != "torn" for line in f)
+
+
+def test_line_without_newline_is_torn(skill, paths):
+    journal, _snapshot = paths
+    with open(journal, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"op": "set", "id": "a", "fire_at": 1.0}) + "\n")
+        f.write(json.dumps({"op": "set", "id": "b", "fire_at": 2.0}))
+
+    store = skill.AlarmStore(*paths).load()
+    assert [a["id"] for a in store.all()] == ["a"]
+    store.put("c", 3.0)
+    assert [a["id"] for a in skill.AlarmStore(*paths).load().all()] == ["a", "c"]
+
+
+def test_failed_write_restores_memory_from_disk(skill, paths, monkeypatch):
+    store = skill.AlarmStore(*paths).load()
+    store.put("a", 100.0)
+
+    def broken(records):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(store, "_write", broken)
+    with pytest.raises(OSError):
+        store.put("b", 200.0)
+    with pytest.raises(OSError):
+        store.remove("a")
+    assert [a["id"] for a in store.all()] == ["a"]
+
+    monkeypatch.undo()
+    store.put("c", 300.0)
+    assert [a["id"] for a in skill.AlarmStore(*paths).load().all()] == ["a", "c"]
+
+
+def test_compaction_keeps_state(skill, paths):
+    store = skill.AlarmStore(*paths, compact_min=10).load()
+    for i in range(30):
+        store.put(f"a{i % 3}", float(i))
+
+    reloaded = skill.AlarmStore(*paths).load()
+    assert {a["id"]: a["fire_at"] for a in reloaded.all()} == {"a0": 27.0, "a1": 28.0, "a2": 29.0}
+    assert reloaded._journal_records < 30
+
+
+@pytest.fixture
+def alarms(skill, tmp_path):
+    said = []
+    alarms = skill.Alarms(str(tmp_path), notify=lambda text, emotion=None: said.append((text, emotion)))
+    alarms.said = said
+    yield alarms
+    alarms.shutdown()
+
+
+def test_cancel_reports_unparsed_time(alarms):
+    alarms.start()
+    alarms.set_alarm("в 7 утра")
+    with pytest.raises(ValueError):
+        alarms.cancel_alarm("когда-нибудь")
+    assert len(alarms.store.all()) == 1
+    assert alarms.cancel_alarm("в 8 утра") == 0
+    assert alarms.said[-1] == ("Будильник не найден", "sad")
+    assert alarms.cancel_alarm("7:00") == 1
+    assert alarms.said[-1] == ("Будильник отменён", "sad")
+    assert alarms.store.all() == []
+
+
+def test_start_rehydrates_once_and_shutdown_stops_scheduler(skill, alarms):
+    store = skill.AlarmStore(alarms.store.journal_path, alarms.store.snapshot_path).load()
+    store.put("soon", 4102444800.0)
+    store.put("expired", 1.0)
+
+    alarms.start()
+    alarms.start()
+    assert alarms.scheduler.pending() == 1
+    assert [a["id"] for a in alarms.store.all()] == ["soon"]
+    alarms.shutdown()
+    assert alarms.scheduler._thread is None
+    assert not alarms.started
+
+
+def test_start_migrates_the_legacy_config(alarms):
+    alarms.save_config({"alarm": "2100-01-01T07:00:00", "repeat": "daily"})
+    alarms.start()
+    assert [(a["id"], a["repeat"]) for a in alarms.store.all()] == [("alarm", 86400.0)]
+    assert alarms.load_config() == {}
+
@@ -0,0 +1,373 @@
+"""
+Prep (discover/explore) runner shared by every skill's ``prep/prepare.py``.
+
+prepare.py declares what it needs: ``Hypothesis`` checks with dependencies,
+required resources, a timeout and a TTL, and the ``Resource`` values to
+collect. ``prepare()`` runs the hypotheses as a DAG on a bounded thread pool
+while the resources are collected, reuses results of the previous run that
+are still valid for the same inputs, and writes ``prep_result.json`` and
+``prep_result_prompt.md``.
+
+Progress is streamed to ``prep_result.running.json``. Only a successful run
+replaces ``prep_result.json``, so handlers never read resources (an API key
+the API has just rejected) from a running or failed prep; a failed run is
+left in ``prep_result.failed.json``.
+
+Stdlib only: skills ship a byte-identical copy in ``prep/`` (see
+``tools/vendor.py``). Edit this file, then run ``python -m tools.vendor``.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# Probes run concurrently on a bounded pool; prep takes the longest dependency path, not the sum
+PREP_WORKERS = 4
+RESULT_FILE = "prep_result.json"
+RUNNING_FILE = "prep_result.running.json"
+FAILED_FILE = "prep_result.failed.json"
+PROMPT_FILE = "prep_result_prompt.md"
+
+
+class Hypothesis(NamedTuple):
+    name: str
+    check: Callable[[Dict, object, float], bool]  # check(resources, session, timeout)
+    depends_on: Tuple[str, ...] = ()  # hypotheses that must pass first
+    requires: Tuple[str, ...] = ()  # resources that must be collected first
+    critical: bool = True
+    timeout: float = 5.0
+    ttl: float = 0.0  # 0 means always re-test
+    log_key: str = "prep.unexpected_error"
+    fail_key: str = "prep.unexpected_error"
+
+
+class Resource(NamedTuple):
+    key: str
+    prompt: Optional[str]  # i18n key of the input() question; None means default is used as is
+    default: Optional[str] = None
+
+
+def _as_is(key: str) -> str:
+    return key
+
+
+def code_hash(prepare_py: Path) -> str:
+    """Hash of the code a result depends on: the skill's prepare.py and this runner."""
+    digest = hashlib.sha256(Path(prepare_py).read_bytes())
+    digest.update(Path(__file__).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def fingerprint(h: Hypothesis, res: Dict[str, str], code: str) -> str:
+    """Hash of everything a hypothesis result depends on: its inputs and the code."""
+    data = {"name": h.name, "code": code, "inputs": {key: res.get(key) for key in h.requires}}
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def is_fresh(record: Dict, fp: str, now: datetime) -> bool:
+    """A previous record can be reused if it passed, has the same fingerprint and its TTL has not run out."""
+    if not record.get("result") or record.get("fingerprint") != fp or not record.get("ttl"):
+        return False
+    try:
+        checked_at = datetime.fromisoformat(record["checked_at"])
+    except (KeyError, TypeError, ValueError):
+        return False
+    return now < checked_at + timedelta(seconds=record["ttl"])
+
+
+def load_previous(result_path: Path) -> Dict:
+    try:
+        with open(result_path, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return previous if isinstance(previous, dict) else {}
+
+
+def reusable_resources(previous: Dict, items: List[Hypothesis]) -> Dict[str, str]:
+    """Resources from the previous run, minus those used by a hypothesis that actually failed."""
+    requires = {h.name: h.requires for h in items}
+    suspect = set()
+    for record in previous.get("tested_hypotheses") or []:
+        if not record.get("result") and not record.get("skipped") and not record.get("timed_out"):
+            suspect.update(requires.get(record.get("name"), ()))
+    return {key: value for key, value in (previous.get("resources") or {}).items() if key not in suspect}
+
+
+class HypothesisRunner:
+    """
+    Runs hypotheses as a DAG on a bounded thread pool.
+
+    A hypothesis starts once its dependencies have passed and its required resources
+    are provided, so probes that need no user input run while the user is still being
+    asked. Each hypothesis has its own timeout; a failed critical hypothesis stops the
+    run and everything not started yet is dropped. on_result is called for every
+    finished hypothesis as soon as it completes. A hypothesis whose record in
+    previous is still fresh for the same fingerprint is not run again.
+    """
+
+    def __init__(
+        self,
+        items: List[Hypothesis],
+        session,
+        on_result: Callable[[Dict], None],
+        previous: Optional[Dict[str, Dict]] = None,
+        workers: int = PREP_WORKERS,
+        logger: Optional[logging.Logger] = None,
+        probes=None,
+        code: str = "",
+        translate: Callable[[str], str] = _as_is,
+    ):
+        self._previous = previous or {}
+        self._log = logger or logging.getLogger(__name__)
+        self._probes = probes  # shared probe cache in batch prep: probes.run(hypothesis, resources, check)
+        self._code = code
+        self._ = translate
+        self._pending = {h.name: h for h in items}
+        self._running: Dict[str, Tuple[Hypothesis, Optional[float]]] = {}  # name -> (hypothesis, started_at)
+        self._passed: Dict[str, bool] = {}
+        self._resources: Dict[str, str] = {}
+        self._session = session
+        self._on_result = on_result
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prep")
+        self._cond = threading.Condition()
+        self.failed: Optional[Hypothesis] = None
+
+    def start(self) -> "HypothesisRunner":
+        with self._cond:
+            self._schedule()
+        return self
+
+    def provide(self, key: str, value: str) -> None:
+        with self._cond:
+            self._resources[key] = value
+            self._schedule()
+
+    def wait(self) -> Optional[Hypothesis]:
+        """Blocks until every hypothesis has finished (or a critical one failed); returns the failed one."""
+        try:
+            with self._cond:
+                self._schedule()
+                while self._running and self.failed is None:
+                    now = time.monotonic()
+                    deadlines = [started + h.timeout for h, started in self._running.values() if started is not None]
+                    for name, (h, started) in list(self._running.items()):
+                        if started is not None and now >= started + h.timeout:
+                            self._finish(h, False, started, timed_out=True)
+                    if self._running and self.failed is None:
+                        self._cond.wait(max(0.0, min(deadlines) - now) if deadlines else None)
+                # whatever is left can no longer matter: a critical hypothesis failed,
+                # a dependency failed or a required resource was never provided
+                for h, started in list(self._running.values()):
+                    self._finish(h, False, started, skipped=True)
+                for h in list(self._pending.values()):
+                    self._finish(h, False, None, skipped=True)
+                self._pending.clear()
+                return self.failed
+        finally:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _schedule(self) -> None:
+        if self.failed is not None:
+            return
+        for name, h in list(self._pending.items()):
+            if any(self._passed.get(dep) is False for dep in h.depends_on):
+                del self._pending[name]
+                self._finish(h, False, None, skipped=True)
+                continue
+            if all(self._passed.get(dep) for dep in h.depends_on) and all(key in self._resources for key in h.requires):
+                del self._pending[name]
+                fp = fingerprint(h, self._resources, self._code)
+                previous = self._previous.get(name)
+                if previous is not None and is_fresh(previous, fp, datetime.utcnow()):
+                    self._finish(h, True, None, reused=previous)
+                    continue
+                self._running[name] = (h, None)
+                self._pool.submit(self._run, h, dict(self._resources), fp)
+
+    def _run(self, h: Hypothesis, res: Dict[str, str], fp: str) -> None:
+        with self._cond:
+            if h.name not in self._running:  # the run was stopped before this one got a worker
+                return
+            started = time.monotonic()
+            self._running[h.name] = (h, started)
+            self._cond.notify_all()
+        self._log.info(self._(h.log_key))
+        try:
+            check = lambda: h.check(res, self._session, h.timeout)
+            result = bool(check() if self._probes is None else self._probes.run(h, res, check))
+        except Exception:
+            self._log.error(self._("prep.unexpected_error"), exc_info=True)
+            result = False
+        with self._cond:
+            if h.name in self._running:  # not already given up on by timeout
+                self._finish(h, result, started, fp=fp)
+                self._schedule()
+
+    def _finish(
+        self,
+        h: Hypothesis,
+        result: bool,
+        started: Optional[float],
+        fp: Optional[str] = None,
+        reused: Optional[Dict] = None,
+        timed_out: bool = False,
+        skipped: bool = False,
+    ) -> None:
+        self._running.pop(h.name, None)
+        self._passed[h.name] = result
+        if reused is not None:
+            record = dict(reused, cached=True)
+            record.pop("duration_ms", None)
+        else:
+            record = {"name": h.name, "result": result, "critical": h.critical}
+        if fp is not None:
+            record.update(fingerprint=fp, checked_at=datetime.utcnow().isoformat(), ttl=h.ttl)
+        if started is not None:
+            record["duration_ms"] = round((time.monotonic() - started) * 1000, 1)
+        if timed_out:
+            record["timed_out"] = True
+        if skipped:
+            record["skipped"] = True
+        if not result and h.critical and self.failed is None:
+            self.failed = h
+        self._on_result(record)
+        self._cond.notify_all()
+
+
+def write_json_atomic(path: Path, data: Dict) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def prep_logger(skill_path: Path) -> logging.Logger:
+    """
+    Per-skill logger writing to logs/prep.log. Unlike logging.basicConfig it keeps
+    working when several skills are prepared in one process.
+    """
+    logs_dir = skill_path / "logs"
+    logs_dir.mkdir(exist_ok=True)
+    logger = logging.getLogger(f"adaos.prep.{skill_path.resolve().name}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    for old in logger.handlers[:]:
+        logger.removeHandler(old)
+        old.close()
+    handler = logging.FileHandler(logs_dir / "prep.log", encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    logger.addHandler(handler)
+    return logger
+
+
+def prepare(
+    skill_path: Path,
+    items: List[Hypothesis],
+    wanted: List[Resource],
+    session,
+    translate: Callable[[str], str] = _as_is,
+    code: str = "",
+    force: bool = False,
+    answers: Optional[Dict[str, str]] = None,
+    probes=None,
+) -> Dict:
+    """
+    The body of prepare.py's run_prep(): checks items while collecting wanted.
+
+    force ignores the previous prep_result.json; otherwise its resources are reused
+    and hypotheses that are still valid for the same inputs (and the same code)
+    are not re-tested. answers switches to non-interactive mode: resources are
+    taken from it (then from the previous run) and never asked with input().
+    """
+    _ = translate
+    prep_result = {"status": "running", "timestamp": datetime.utcnow().isoformat(), "resources": {}, "tested_hypotheses": []}
+    result_path = skill_path / RESULT_FILE
+    running_path = skill_path / RUNNING_FILE
+    previous = {} if force else load_previous(result_path)
+    known = reusable_resources(previous, items)
+    previous_records = {r.get("name"): r for r in previous.get("tested_hypotheses") or [] if isinstance(r, dict)}
+
+    # Setup logging
+    logger = prep_logger(skill_path)
+
+    write_lock = threading.Lock()
+
+    def on_result(record):
+        # Stream every finished hypothesis into prep_result.running.json
+        with write_lock:
+            prep_result["tested_hypotheses"].append(record)
+            write_json_atomic(running_path, prep_result)
+
+    runner = HypothesisRunner(items, session, on_result, previous_records, logger=logger, probes=probes, code=code, translate=translate)
+    try:
+        runner.start()
+
+        # Collect resources while probes that need none are already running
+        missing = []
+        for resource in wanted:
+            if runner.failed is not None:
+                break
+            if resource.prompt is None:
+                value = resource.default
+            elif answers is not None and resource.key in answers:
+                value = answers[resource.key]
+            elif resource.key in known:
+                value = known[resource.key]
+            elif answers is None:
+                value = input(_(resource.prompt))
+            else:
+                missing.append(resource.key)
+                continue
+            prep_result["resources"][resource.key] = value
+            runner.provide(resource.key, value)
+
+        if missing:
+            prep_result["status"] = "failed"
+            prep_result["reason"] = f"{_('prep.missing_resource')}: {', '.join(missing)}"
+
+    except Exception:
+        logger.error(_("prep.unexpected_error"), exc_info=True)
+        prep_result["status"] = "failed"
+        prep_result["reason"] = _("prep.unexpected_error")
+    finally:
+        failed = runner.wait()
+        for handler in logger.handlers[:]:
+            logger.removeHandler(handler)
+            handler.close()
+
+    if prep_result["status"] == "running":
+        prep_result["status"] = "failed" if failed is not None else "ok"
+        if failed is not None:
+            prep_result["reason"] = _(failed.fail_key)
+
+    # Write output files with UTF-8 encoding
+    with write_lock:
+        write_json_atomic(running_path, prep_result)
+        if prep_result["status"] == "ok":
+            os.replace(running_path, result_path)
+            (skill_path / FAILED_FILE).unlink(missing_ok=True)
+        else:
+            os.replace(running_path, skill_path / FAILED_FILE)
+
+    with open(skill_path / PROMPT_FILE, "w", encoding="utf-8") as f:
+        if prep_result["status"] == "ok":
+            f.write(f"# {_('prep.summary_header')}\n\n")
+            f.write(f"## {_('prep.collected_resources')}\n")
+            for key, value in prep_result["resources"].items():
+                f.write(f"- **{key}**: {value}\n")
+            f.write(f"\n## {_('prep.tested_hypotheses')}\n")
+            for hypothesis in prep_result["tested_hypotheses"]:
+                status = "✅" if hypothesis["result"] else "❌"
+                f.write(f"- {status} {hypothesis['name']}\n")
+        else:
+            f.write(f"# {_('prep.failed_header')}\n\n")
+            f.write(f"**{_('prep.reason')}**: {prep_result['reason']}\n")
+
+    return prep_result
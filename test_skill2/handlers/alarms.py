@@ -0,0 +1,455 @@
+"""
+Alarms for the alarm skills: a single-thread heap scheduler, a journaled store
+with crash recovery, and the skill lifecycle (start/shutdown, set/cancel).
+Skills differ only in how they tell the user: ``Alarms(skill_dir, notify)``
+with ``notify(text, emotion=...)``.
+
+Stdlib only: skills ship a byte-identical copy in ``handlers/`` (see
+``tools/vendor.py``). Edit this file, then run ``python -m tools.vendor``.
+"""
+import bisect
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from .time_slot import parse_time
+
+# журнал сжимается в снимок, когда записей в нём больше, чем max(минимум, N x живых будильников)
+JOURNAL_COMPACT_MIN = 1000
+JOURNAL_COMPACT_RATIO = 4
+# пропущенный (пока навык не работал) разовый будильник звонит при старте, если опоздание не больше
+MISSED_GRACE = 600.0
+
+# планировщик просыпается не реже, чтобы заметить перевод системных часов
+SCHEDULER_MAX_SLEEP = 10.0
+# расхождение wall/monotonic (сек), после которого сроки пересчитываются
+CLOCK_JUMP_THRESHOLD = 0.5
+
+
+class AlarmScheduler:
+    """
+    Один поток и min-heap вместо потока на каждый будильник.
+
+    Срок хранится как wall-clock (epoch) и как момент по time.monotonic();
+    ждём по monotonic, а при переводе часов пересчитываем сроки из wall-clock.
+    Вставка — O(log n), отмена — O(1) (ленивое удаление из кучи).
+    """
+
+    def __init__(self):
+        self._heap = []  # (due_monotonic, seq, alarm_id)
+        self._alarms = {}  # alarm_id -> [fire_at_epoch, repeat_seconds, callback, seq]
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._offset = time.time() - time.monotonic()
+        self._thread = None
+        self._stopped = False
+
+    def schedule(self, alarm_id, fire_at, callback, repeat=None):
+        """
+        fire_at — datetime или epoch; repeat — timedelta/секунды для повторяющихся.
+        Повторный вызов с тем же alarm_id заменяет будильник.
+        """
+        if isinstance(fire_at, datetime):
+            fire_at = fire_at.timestamp()
+        if isinstance(repeat, timedelta):
+            repeat = repeat.total_seconds()
+        with self._cond:
+            seq = next(self._seq)
+            self._alarms[alarm_id] = [fire_at, repeat or None, callback, seq]
+            heapq.heappush(self._heap, (fire_at - self._offset, seq, alarm_id))
+            self._ensure_thread()
+            self._cond.notify()
+
+    def schedule_many(self, items):
+        """Пакетная загрузка: items — (alarm_id, fire_at, callback, repeat); одна блокировка и heapify."""
+        with self._cond:
+            for alarm_id, fire_at, callback, repeat in items:
+                if isinstance(fire_at, datetime):
+                    fire_at = fire_at.timestamp()
+                if isinstance(repeat, timedelta):
+                    repeat = repeat.total_seconds()
+                self._alarms[alarm_id] = [fire_at, repeat or None, callback, next(self._seq)]
+            self._rebuild()
+            if self._alarms:
+                self._ensure_thread()
+            self._cond.notify()
+
+    def cancel(self, alarm_id):
+        with self._cond:
+            found = self._alarms.pop(alarm_id, None) is not None
+            # устаревшие записи кучи копятся — изредка перестраиваем её целиком
+            if found and len(self._heap) > 64 and len(self._heap) > 2 * len(self._alarms):
+                self._rebuild()
+            self._cond.notify()
+            return found
+
+    def pending(self):
+        with self._cond:
+            return len(self._alarms)
+
+    def next_fire_at(self, alarm_id):
+        with self._cond:
+            alarm = self._alarms.get(alarm_id)
+            return alarm[0] if alarm else None
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="alarm_scheduler", daemon=True)
+            self._thread.start()
+
+    def _rebuild(self):
+        self._heap = [(a[0] - self._offset, a[3], alarm_id) for alarm_id, a in self._alarms.items()]
+        heapq.heapify(self._heap)
+
+    def _check_clock(self):
+        offset = time.time() - time.monotonic()
+        if abs(offset - self._offset) > CLOCK_JUMP_THRESHOLD:
+            self._offset = offset
+            self._rebuild()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopped:
+                        return
+                    self._check_clock()
+                    # выбрасываем отменённые/заменённые записи с вершины кучи
+                    while self._heap:
+                        _due, seq, alarm_id = self._heap[0]
+                        alarm = self._alarms.get(alarm_id)
+                        if alarm is not None and alarm[3] == seq:
+                            break
+                        heapq.heappop(self._heap)
+                    delay = self._heap[0][0] - time.monotonic() if self._heap else SCHEDULER_MAX_SLEEP
+                    if delay <= 0:
+                        break
+                    self._cond.wait(min(delay, SCHEDULER_MAX_SLEEP))
+
+                _due, seq, alarm_id = heapq.heappop(self._heap)
+                fire_at, repeat, callback, _seq = self._alarms[alarm_id]
+                if repeat:
+                    # следующий срок — по wall-clock, пропущенные периоды не догоняем
+                    missed = max(0, int((time.time() - fire_at) // repeat))
+                    next_at = fire_at + (missed + 1) * repeat
+                    seq = next(self._seq)
+                    self._alarms[alarm_id] = [next_at, repeat, callback, seq]
+                    heapq.heappush(self._heap, (next_at - self._offset, seq, alarm_id))
+                else:
+                    del self._alarms[alarm_id]
+
+            try:
+                callback(alarm_id, fire_at)
+            except Exception:
+                pass
+
+
+class AlarmStore:
+    """
+    Постоянное хранилище будильников: снимок + журнал (JSON lines, только дописывание).
+
+    Каждая запись журнала — полное состояние будильника ("set") или его удаление ("del"),
+    поэтому повторное применение безопасно. Параллельные записи объединяются в одну
+    группу с одним fsync (group commit). Журнал периодически сжимается в снимок,
+    который заменяется атомарно (os.replace). В памяти — индексы по id и по времени.
+    Если запись группы не удалась, индексы перечитываются с диска: в памяти остаётся
+    только то, что реально сохранено, плюс ещё не записанные группы.
+    """
+
+    def __init__(self, journal_path, snapshot_path, compact_min=JOURNAL_COMPACT_MIN):
+        self.journal_path = journal_path
+        self.snapshot_path = snapshot_path
+        self.compact_min = compact_min
+        self._by_id = {}  # id -> {"id", "fire_at", "repeat"}
+        self._by_time = []  # отсортированный список (fire_at, id)
+        self._journal_records = 0
+        self._cond = threading.Condition(threading.RLock())  # RLock: load() вызывается и под ним
+        self._pending = []  # записи открытой группы
+        self._batch = 1  # номер открытой группы
+        self._durable = 0  # последняя группа, записанная на диск
+        self._writing = False
+        self._failed = (0, None)  # (номер группы, ошибка) последней неудачной записи
+
+    # --- индексы ---
+
+    def _index_put(self, alarm):
+        old = self._by_id.get(alarm["id"])
+        if old is not None:
+            self._index_del(old["id"])
+        self._by_id[alarm["id"]] = alarm
+        bisect.insort(self._by_time, (alarm["fire_at"], alarm["id"]))
+
+    def _index_del(self, alarm_id):
+        old = self._by_id.pop(alarm_id, None)
+        if old is not None:
+            i = bisect.bisect_left(self._by_time, (old["fire_at"], alarm_id))
+            if i < len(self._by_time) and self._by_time[i] == (old["fire_at"], alarm_id):
+                del self._by_time[i]
+        return old
+
+    def _apply(self, record):
+        if record.get("op") == "set":
+            self._index_put({"id": record["id"], "fire_at": record["fire_at"], "repeat": record.get("repeat")})
+        elif record.get("op") == "del":
+            self._index_del(record["id"])
+
+    # --- чтение ---
+
+    def load(self):
+        """
+        Снимок + проигрывание журнала. Недописанный хвост (сбой при записи) обрезается
+        по концу последней целой строки: иначе следующие записи легли бы после мусора
+        и потерялись бы при следующей загрузке.
+        """
+        with self._cond:
+            self._by_id, self._by_time = {}, []
+            if os.path.exists(self.snapshot_path):
+                with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                    for alarm in json.load(f).get("alarms", []):
+                        self._index_put(alarm)
+            self._journal_records = 0
+            if os.path.exists(self.journal_path):
+                good = 0  # смещение конца последней целой записи
+                with open(self.journal_path, "rb") as f:
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            break
+                        self._apply(record)
+                        self._journal_records += 1
+                        good += len(line)
+                if os.path.getsize(self.journal_path) > good:
+                    with open(self.journal_path, "r+b") as f:
+                        f.truncate(good)
+                        f.flush()
+                        os.fsync(f.fileno())
+        return self
+
+    def get(self, alarm_id):
+        with self._cond:
+            return self._by_id.get(alarm_id)
+
+    def all(self):
+        """Будильники в порядке срабатывания."""
+        with self._cond:
+            return [self._by_id[alarm_id] for _fire_at, alarm_id in self._by_time]
+
+    def due_before(self, epoch):
+        with self._cond:
+            end = bisect.bisect_right(self._by_time, (epoch, "\uffff"))
+            return [self._by_id[alarm_id] for _fire_at, alarm_id in self._by_time[:end]]
+
+    # --- запись ---
+
+    def put(self, alarm_id, fire_at, repeat=None):
+        self._commit([{"op": "set", "id": alarm_id, "fire_at": fire_at, "repeat": repeat}])
+
+    def remove(self, alarm_id):
+        if self.get(alarm_id) is not None:
+            self._commit([{"op": "del", "id": alarm_id}])
+
+    def remove_many(self, alarm_ids):
+        self._commit([{"op": "del", "id": alarm_id} for alarm_id in alarm_ids])
+
+    def _commit(self, records):
+        if not records:
+            return
+        with self._cond:
+            for record in records:
+                self._apply(record)
+            self._pending.extend(records)
+            my_batch = self._batch
+            while self._durable < my_batch:
+                if self._writing:
+                    self._cond.wait()
+                    continue
+                # лидер группы: пишет всё накопленное одним write + fsync
+                self._writing = True
+                batch_records, self._pending = self._pending, []
+                batch = self._batch
+                self._batch += 1
+                self._cond.release()
+                error = None
+                try:
+                    self._write(batch_records)
+                except Exception as e:
+                    error = e
+                finally:
+                    self._cond.acquire()
+                    if error is None:
+                        self._journal_records += len(batch_records)
+                    else:
+                        self._failed = (batch, error)
+                        self._recover()
+                    self._writing = False
+                    self._durable = batch
+                    self._cond.notify_all()
+            failed_batch, error = self._failed
+            if failed_batch == my_batch:
+                raise error
+            if self._journal_records > max(self.compact_min, JOURNAL_COMPACT_RATIO * len(self._by_id)):
+                self._compact()
+
+    def _write(self, records):
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _recover(self):
+        # под self._cond после неудачной записи группы: её записи уже применены к индексам,
+        # но на диске их нет (или есть часть) — перечитываем диск и заново применяем
+        # записи следующей, ещё не записанной группы
+        saved = self._by_id, self._by_time, self._journal_records
+        try:
+            self.load()
+        except (OSError, ValueError):
+            # диск не читается: оставляем индексы как были, вызывающий получит ошибку записи
+            self._by_id, self._by_time, self._journal_records = saved
+            return
+        for record in self._pending:
+            self._apply(record)
+
+    def _compact(self):
+        # под self._cond и без активного лидера: новых записей в журнал сейчас нет
+        if self._writing or self._pending:
+            return
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"alarms": [self._by_id[i] for _t, i in self._by_time]}, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        # сбой между replace и усечением безопасен: записи журнала идемпотентны
+        with open(self.journal_path, "w", encoding="utf-8") as f:
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_records = 0
+
+
+class Alarms:
+    """
+    Будильники одного навыка: хранилище и планировщик в папке навыка, хуки start/shutdown
+    и обработчики интентов. notify(text, emotion=...) сообщает пользователю о результате
+    (speak() голосового навыка или print).
+    """
+
+    def __init__(self, skill_dir, notify):
+        self.config_path = os.path.join(skill_dir, "config.json")
+        self.store = AlarmStore(os.path.join(skill_dir, "alarms.journal"), os.path.join(skill_dir, "alarms.snapshot.json"))
+        self.scheduler = AlarmScheduler()
+        self.notify = notify
+        self.started = False
+        self._lifecycle_lock = threading.Lock()
+
+    def load_config(self):
+        if os.path.exists(self.config_path):
+            with open(self.config_path, "r") as f:
+                return json.load(f)
+        return {}
+
+    def save_config(self, cfg):
+        with open(self.config_path, "w") as f:
+            json.dump(cfg, f)
+
+    def start(self):
+        """
+        Хук запуска: хост вызывает его один раз после загрузки навыка (handle() вызывает его
+        сам, если хост этого не сделал). Загружает будильники с диска и разом отдаёт их
+        планировщику; старый формат config.json ({"alarm": iso}) переносится в хранилище.
+        Повторный вызов ничего не делает.
+        """
+        with self._lifecycle_lock:
+            if self.started:
+                return
+            self.store.load()
+            cfg = self.load_config()
+            legacy = cfg.get("alarm")
+            if legacy:
+                period = 86400.0 if cfg.get("repeat") == "daily" else None
+                self.store.put("alarm", datetime.fromisoformat(legacy).timestamp(), period)
+                self.save_config({})
+
+            now = time.time()
+            expired = [a["id"] for a in self.store.all() if not a.get("repeat") and a["fire_at"] < now - MISSED_GRACE]
+            self.store.remove_many(expired)
+            self.scheduler.schedule_many((a["id"], _next_fire_at(a, now), self.ring, a.get("repeat")) for a in self.store.all())
+            self.started = True
+
+    def shutdown(self):
+        """Хук остановки (выгрузка или перезагрузка навыка): останавливает поток планировщика."""
+        with self._lifecycle_lock:
+            self.scheduler.stop()
+            self.started = False
+
+    def ring(self, alarm_id, fire_at):
+        alarm = self.store.get(alarm_id)
+        if alarm is not None and not alarm.get("repeat"):
+            self.store.remove(alarm_id)
+        print("[ALARM] Время вставать!")  # отправка в аудио-плеер
+
+    def set_alarm(self, time_str, repeat=None):
+        value = parse_time(time_str)
+        if value is None:
+            raise ValueError(f"не удалось разобрать время: {time_str!r}")
+        alarm_dt = value.resolve(datetime.now())
+
+        alarm_id = uuid.uuid4().hex[:8]
+        period = 86400.0 if repeat == "daily" else None
+        self.store.put(alarm_id, alarm_dt.timestamp(), period)
+        self.notify("Будильник установлен", emotion="happy")
+
+        self.scheduler.schedule(alarm_id, alarm_dt, self.ring, repeat=period)
+        return alarm_id
+
+    def cancel_alarm(self, time_str=None):
+        """
+        Отменяет все будильники или только стоящие на time_str (в любом формате parse_time).
+        Возвращает число отменённых; неразобранное время — ValueError, как в set_alarm.
+        """
+        alarms = self.store.all()
+        if time_str:
+            value = parse_time(time_str)
+            if value is None:
+                raise ValueError(f"не удалось разобрать время: {time_str!r}")
+            target = value.resolve(datetime.now()).strftime("%H:%M")
+            alarms = [a for a in alarms if datetime.fromtimestamp(a["fire_at"]).strftime("%H:%M") == target]
+        ids = [a["id"] for a in alarms]
+        self.store.remove_many(ids)
+        for alarm_id in ids:
+            self.scheduler.cancel(alarm_id)
+        self.notify("Будильник отменён" if ids else "Будильник не найден", emotion="sad")
+        return len(ids)
+
+    def handle(self, intent, entities):
+        self.start()
+        if intent == "set_alarm":
+            time_str = entities.get("time", "07:00")
+            self.set_alarm(time_str, entities.get("repeat"))
+        elif intent == "cancel":
+            self.cancel_alarm(entities.get("time"))
+
+
+def _next_fire_at(alarm, now):
+    fire_at, repeat = alarm["fire_at"], alarm.get("repeat")
+    if repeat and fire_at < now:
+        fire_at += -(-(now - fire_at) // repeat) * repeat
+    return fire_at
@@ -0,0 +1,152 @@
+"""
+{time} slot grammar: «7:30», «в 7 утра», «через 20 минут», «в полседьмого» -> TimeValue.
+
+Stdlib only: skills ship a byte-identical copy in ``handlers/`` (see
+``tools/vendor.py``). Edit this file, then run ``python -m tools.vendor``.
+"""
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import List, NamedTuple, Optional
+
+MEMO_SIZE = 4096
+
+
+class TimeValue(NamedTuple):
+    hour: Optional[int]
+    minute: Optional[int]
+    seconds: Optional[int]  # для относительного времени («через 20 минут»)
+
+    def resolve(self, now: datetime) -> datetime:
+        """Ближайший момент после now."""
+        if self.seconds is not None:
+            return now + timedelta(seconds=self.seconds)
+        at = now.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+        return at if at > now else at + timedelta(days=1)
+
+
+_NUMBER_WORDS = {
+    "ноль": 0, "один": 1, "одна": 1, "одну": 1, "два": 2, "две": 2, "три": 3, "четыре": 4,
+    "пять": 5, "шесть": 6, "семь": 7, "восемь": 8, "девять": 9, "десять": 10,
+    "одиннадцать": 11, "двенадцать": 12, "тринадцать": 13, "четырнадцать": 14,
+    "пятнадцать": 15, "шестнадцать": 16, "семнадцать": 17, "восемнадцать": 18,
+    "девятнадцать": 19, "двадцать": 20, "тридцать": 30, "сорок": 40, "пятьдесят": 50,
+    # родительный падеж: «без пяти восемь», «без двадцати пяти семь»
+    "одной": 1, "двух": 2, "трех": 3, "четырех": 4, "пяти": 5, "шести": 6, "семи": 7,
+    "восьми": 8, "девяти": 9, "десяти": 10, "одиннадцати": 11, "двенадцати": 12,
+    "тринадцати": 13, "четырнадцати": 14, "пятнадцати": 15, "шестнадцати": 16,
+    "семнадцати": 17, "восемнадцати": 18, "девятнадцати": 19, "двадцати": 20,
+    "тридцати": 30, "сорока": 40, "пятидесяти": 50, "четверти": 15,
+}
+# «полседьмого», «четверть восьмого»: порядковое в родительном падеже — следующий час
+_ORDINALS = {
+    "первого": 1, "второго": 2, "третьего": 3, "четвертого": 4, "пятого": 5, "шестого": 6,
+    "седьмого": 7, "восьмого": 8, "девятого": 9, "десятого": 10, "одиннадцатого": 11,
+    "двенадцатого": 12,
+}
+
+_WS = re.compile(r"[\s,]+")
+_REWRITES = [
+    (re.compile(r"\bполчаса\b"), "30 минут"),
+    (re.compile(r"\bполтора часа\b"), "90 минут"),
+    (re.compile(r"\bчетверть часа\b"), "15 минут"),
+    (re.compile(r"\bполночь\b"), "0:00"),
+    (re.compile(r"\bполдень\b"), "12:00"),
+    (re.compile(r"\b(в|к|на) час(а)?\b"), r"\1 1 час"),
+    (re.compile(r"\bпол-?(?=(?:%s)\b)" % "|".join(_ORDINALS)), "пол "),
+]
+_RELATIVE = re.compile(r"через(?: (\d+))? (час\w*|минут\w*|мин)(?: (\d+) (?:минут\w*|мин))?")
+_HALF = re.compile(r"(?:пол|половин\w*) #(\d+)")
+_QUARTER = re.compile(r"четверть #(\d+)")
+_WITHOUT = re.compile(r"без (\d+)(?: минут\w*)? (\d+|час\b)")  # «без пяти час» = 12:55
+_PAST = re.compile(r"(\d+)(?: минут\w*)? #(\d+)")  # «пять минут восьмого» = 7:05
+_CLOCK = re.compile(r"(?<!\d)(\d{1,2})[:.](\d{2})(?!\d)")
+_HOURS = re.compile(r"(?<![\d:])(\d{1,2})(?: час\w*)?(?: (\d{1,2})(?: минут\w*)?)?(?![\d:])")
+_PERIOD = re.compile(r"\b(утра|утром|дня|днем|вечера|вечером|ночи|ночью)\b")
+
+
+def _normalize(text: str) -> str:
+    return _WS.sub(" ", text.casefold().replace("ё", "е")).strip()
+
+
+def _digitize(text: str) -> str:
+    """Числительные словами -> цифры («двадцать пять» -> «25»), порядковые -> «#N»."""
+    out: List[str] = []
+    for word in text.split(" "):
+        if word in _ORDINALS:
+            out.append(f"#{_ORDINALS[word]}")
+            continue
+        value = _NUMBER_WORDS.get(word)
+        if value is None:
+            out.append(word)
+        elif out and value < 10 and out[-1].isdigit() and int(out[-1]) >= 20 and int(out[-1]) % 10 == 0:
+            out[-1] = str(int(out[-1]) + value)
+        else:
+            out.append(str(value))
+    return " ".join(out)
+
+
+def _apply_period(hour: int, period: Optional[str]) -> int:
+    if period is None or hour > 12:
+        return hour
+    if period.startswith("утр"):
+        return 0 if hour == 12 else hour
+    if period.startswith("д"):
+        return hour + 12 if 1 <= hour <= 6 else hour
+    if period.startswith("веч"):
+        return hour + 12 if hour < 12 else hour
+    # ночи: «в 11 ночи» = 23, «в 2 ночи» = 2, «в 12 ночи» = 0
+    if hour == 12:
+        return 0
+    return hour + 12 if hour >= 9 else hour
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _parse_time(text: str) -> Optional[TimeValue]:
+    for pattern, repl in _REWRITES:
+        text = pattern.sub(repl, text)
+    text = _digitize(text)
+
+    m = _RELATIVE.search(text)
+    if m:
+        count = int(m.group(1) or 1)
+        seconds = count * (3600 if m.group(2).startswith("час") else 60) + int(m.group(3) or 0) * 60
+        return TimeValue(None, None, seconds) if seconds else None
+
+    hour = minute = None
+    m = _HALF.search(text) or _QUARTER.search(text)
+    if m:
+        hour, minute = (int(m.group(1)) - 1) % 12, 30 if m.re is _HALF else 15
+    elif _PAST.search(text):
+        m = _PAST.search(text)
+        hour, minute = (int(m.group(2)) - 1) % 12, int(m.group(1))
+        if minute == 0:
+            return None
+    elif _WITHOUT.search(text):
+        m = _WITHOUT.search(text)
+        before = 1 if m.group(2) == "час" else int(m.group(2))
+        # час до 1 — это 12, а не 0: «без пяти час» = 12:55 (ночи — 0:55 через _apply_period)
+        hour, minute = before - 1 if before > 12 else (before - 2) % 12 + 1, 60 - int(m.group(1))
+    elif "#" in text:
+        return None  # порядковое без «пол»/«четверть»/минут: лучше не понять, чем понять неверно
+    else:
+        m = _CLOCK.search(text) or _HOURS.search(text)
+        if m:
+            hour, minute = int(m.group(1)), int(m.group(2) or 0)
+    if hour is None or not (0 <= minute < 60):
+        return None
+
+    period = _PERIOD.search(text)
+    hour = _apply_period(hour, period.group(1) if period else None)
+    if not 0 <= hour < 24:
+        return None
+    return TimeValue(hour, minute, None)
+
+
+def parse_time(text: str) -> Optional[TimeValue]:
+    """«7:30», «в 7 утра», «через 20 минут», «в полседьмого», «пять минут восьмого», «без четверти восемь» -> TimeValue."""
+    return _parse_time(_normalize(text)) if text else None
+
+
+def clear_memo() -> None:
+    _parse_time.cache_clear()
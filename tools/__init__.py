@@ -0,0 +1 @@
+"""Repository-level tooling that works across all skills in this tree."""
@@ -0,0 +1,367 @@
+"""
+Hot reload of individual skills.
+
+A polling watcher notices changes under a skill folder (``skill.yaml``,
+``config.json``, ``handlers/*.py``, ``i18n/*.json``, ``intents/*.intent``)
+and reloads only that skill:
+
+1. the manifest index is refreshed and the new handler module is imported
+   next to the old one (an import error keeps the old version running);
+2. ``@subscribe``/``@tool`` registrations are diffed against the old version;
+3. new events for the skill are deferred and in-flight ones (including
+   ``async`` handlers) are drained;
+4. the old module's ``shutdown()`` hook runs (timers, sessions and files are
+   released before the new version takes them over);
+5. the registry, topic trie, intent matcher and tool schemas are patched for
+   that skill only, the new version is started if the old one was, then
+   deferred events are replayed on it.
+
+Other skills keep their imported modules, caches and connection pools::
+
+    host = HotReloader.from_root()
+    host.registry.start()                         # start() hooks of stateful skills
+    host.start()                                  # background watcher
+    host.dispatch("nlp.intent.weather.get", evt)
+
+    python -m tools.hot_reload                    # watch and print reloads
+"""
+import argparse
+import asyncio
+import inspect
+import logging
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from tools.intent_matcher import IntentMatcher
+from tools.lazy_skills import HANDLER_FILE, LazyRegistry, LazySkill
+from tools.manifest_index import ManifestIndex
+from tools.skills import REPO_ROOT, SKILL_MANIFEST, skill_dirs
+from tools.tool_schemas import ToolSchemas
+from tools.topic_trie import TopicTrie
+
+POLL_INTERVAL = 0.5
+SETTLE_SECONDS = 0.3  # an editor's save may touch several files: wait until the folder is quiet
+DRAIN_TIMEOUT = 10.0
+WATCHED = (SKILL_MANIFEST, "config.json", "handler.py", "handlers/**/*.py", "i18n/*.json", "intents/*.intent")
+
+log = logging.getLogger("adaos.hot_reload")
+
+# rel path -> (mtime_ns, size)
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+def snapshot(skill_dir: Path) -> Snapshot:
+    files: Snapshot = {}
+    for pattern in WATCHED:
+        for f in skill_dir.glob(pattern):
+            if f.is_file() and "__pycache__" not in f.parts:
+                st = f.stat()
+                files[f.relative_to(skill_dir).as_posix()] = (st.st_mtime_ns, st.st_size)
+    return files
+
+
+class SkillWatcher:
+    """Polls skill folders; ``poll()`` returns skills changed, added or removed since the last quiet state."""
+
+    def __init__(self, root: Path = REPO_ROOT, settle: float = SETTLE_SECONDS):
+        self.root = Path(root)
+        self.settle = settle
+        self._known: Dict[str, Snapshot] = {d.name: snapshot(d) for d in skill_dirs(self.root)}
+        self._pending: Dict[str, Tuple[Optional[Snapshot], float]] = {}
+
+    def poll(self, now: Optional[float] = None) -> List[str]:
+        now = time.monotonic() if now is None else now
+        current = {d.name: snapshot(d) for d in skill_dirs(self.root)}
+        ready = []
+        for name in set(current) | set(self._known):
+            snap = current.get(name)
+            if snap == self._known.get(name):
+                self._pending.pop(name, None)
+                continue
+            pending = self._pending.get(name)
+            if pending is None or pending[0] != snap:
+                self._pending[name] = (snap, now)  # still changing: restart the quiet period
+            elif now - pending[1] >= self.settle:
+                del self._pending[name]
+                if snap is None:
+                    self._known.pop(name, None)
+                else:
+                    self._known[name] = snap
+                ready.append(name)
+        return sorted(ready)
+
+
+class _Gate:
+    """In-flight accounting for one skill; while draining, new events are deferred."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self.active = 0
+        self.draining = False
+        self.deferred: List[Tuple[str, Any, Optional[asyncio.AbstractEventLoop]]] = []
+
+    def enter_or_defer(self, item) -> bool:
+        with self._cond:
+            if self.draining:
+                self.deferred.append(item)
+                return False
+            self.active += 1
+            return True
+
+    def enter(self, timeout: Optional[float] = None) -> None:
+        """For synchronous tool calls: waits out a reload instead of deferring; TimeoutError if it takes longer."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: not self.draining, timeout):
+                raise TimeoutError(f"skill is still reloading after {timeout}s")
+            self.active += 1
+
+    def exit(self) -> None:
+        with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    def drain(self, timeout: float) -> bool:
+        with self._cond:
+            self.draining = True
+            return self._cond.wait_for(lambda: self.active == 0, timeout)
+
+    def take_deferred(self) -> List:
+        """Deferred events, or [] after reopening the gate (atomically, so none are lost)."""
+        with self._cond:
+            items, self.deferred = self.deferred, []
+            if not items:
+                self.draining = False
+                self._cond.notify_all()
+            else:
+                self.active += len(items)
+            return items
+
+
+class ReloadReport(NamedTuple):
+    skill: str
+    added: List[str]  # "subscribe:<topic>" / "tool:<name>"
+    removed: List[str]
+    drained: bool
+    replayed: int
+    duration_ms: float
+    error: Optional[str] = None
+
+
+def _registrations(skill: Optional[LazySkill]) -> Set[str]:
+    if skill is None:
+        return set()
+    entries = {f"{kind}:{key}" for kind, key in skill._entries}
+    entries.update(f"subscribe:{t}" for t in skill.topics)
+    entries.update(f"tool:{t}" for t in skill.tools)
+    return entries
+
+
+class HotReloader:
+    def __init__(self, index: ManifestIndex, drain_timeout: float = DRAIN_TIMEOUT):
+        self.root = index.root
+        self.index = index
+        self.drain_timeout = drain_timeout
+        self.registry = LazyRegistry(LazySkill(self.root / name, data["manifest"]) for name, data in sorted(index.skills.items()))
+        self.trie = TopicTrie()
+        self.matcher = IntentMatcher.from_root(self.root)
+        self.schemas = ToolSchemas(index)
+        self._gates: Dict[str, _Gate] = {}
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        for skill in self.registry.skills.values():
+            self._subscribe(skill)
+
+    @classmethod
+    def from_root(cls, root: Path = REPO_ROOT, index_path: Optional[Path] = None, **kwargs) -> "HotReloader":
+        index = ManifestIndex.open(index_path, root)
+        index.refresh()
+        index.save()
+        return cls(index, **kwargs)
+
+    def _gate(self, name: str) -> _Gate:
+        gate = self._gates.get(name)
+        if gate is None:
+            gate = self._gates.setdefault(name, _Gate())
+        return gate
+
+    def _subscribe(self, skill: LazySkill) -> None:
+        # the trie holds only the skill name: the current version is looked up after entering the gate
+        self.trie.remove_skill(skill.name)
+        for topic in skill.topics:
+            self.trie.subscribe(topic, skill.name, topic)
+
+    # --- calls ---
+
+    def dispatch(self, topic: str, evt) -> List:
+        """Like LazyRegistry.dispatch; coroutines are wrapped so they count as in-flight until awaited."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        results = []
+        for name, pattern in self.trie.resolve(topic):
+            gate = self._gate(name)
+            if gate.enter_or_defer((pattern, evt, loop)):
+                results.append(self._run(name, pattern, evt, gate))
+        return results
+
+    def _run(self, name: str, topic: str, evt, gate: _Gate):
+        try:
+            result = self.registry.skills[name].dispatch(topic, evt)
+        except BaseException:
+            gate.exit()
+            raise
+        if inspect.isawaitable(result):
+            return self._tracked(result, gate)
+        gate.exit()
+        return result
+
+    @staticmethod
+    async def _tracked(awaitable, gate: _Gate):
+        try:
+            return await awaitable
+        finally:
+            gate.exit()
+
+    def call_tool(self, name: str, *args, **kwargs):
+        owner = self.registry.tool_owner(name)
+        if owner is None:
+            raise KeyError(f"unknown tool: {name}")
+        gate = self._gate(owner)
+        gate.enter(self.drain_timeout)
+        try:
+            return self.registry.skills[owner].call_tool(name, *args, **kwargs)
+        finally:
+            gate.exit()
+
+    # --- reload ---
+
+    def reload(self, name: str) -> ReloadReport:
+        with self._reload_lock:
+            started = time.perf_counter()
+            old = self.registry.skills.get(name)
+            self.index.refresh()
+            data = self.index.skills.get(name)
+            new = None
+            if data is not None:
+                new = LazySkill(self.root / name, data["manifest"])
+                if (new.skill_dir / HANDLER_FILE).exists():
+                    # importing evicts the old version's modules (package and helpers) from sys.modules
+                    loaded = {n: m for n, m in sys.modules.items() if n == new.package or n.startswith(new.package + ".")}
+                    try:
+                        new.module  # import before the swap: a broken edit keeps the old version
+                    except Exception as e:
+                        for n in [n for n in sys.modules if n == new.package or n.startswith(new.package + ".")]:
+                            del sys.modules[n]
+                        sys.modules.update(loaded)
+                        log.warning("reload %s failed, keeping the running version: %s", name, e)
+                        return ReloadReport(name, [], [], True, 0, (time.perf_counter() - started) * 1000, f"{type(e).__name__}: {e}")
+            before, after = _registrations(old), _registrations(new)
+
+            gate = self._gate(name)
+            drained = gate.drain(self.drain_timeout)
+            if not drained:
+                log.warning("reload %s: %d events still running after %.1fs, swapping anyway", name, gate.active, self.drain_timeout)
+            was_started = old is not None and old.started
+            if was_started:
+                try:
+                    old.shutdown()
+                except Exception:
+                    log.exception("reload %s: shutdown() of the old version failed", name)
+            if new is None:
+                self.registry.remove(name)
+                self.trie.remove_skill(name)
+                self.matcher.remove_skill(name)
+            else:
+                self.registry.replace(new)
+                self._subscribe(new)
+                self.matcher.add_skill(name, IntentMatcher.read_skill_templates(new.skill_dir))
+                if was_started:
+                    try:
+                        new.start()
+                    except Exception:
+                        log.exception("reload %s: start() of the new version failed, retried on the next call", name)
+            self.schemas.load_skill(name)
+            self.index.save()
+            replayed = self._replay(name, gate)
+            return ReloadReport(
+                name, sorted(after - before), sorted(before - after), drained, replayed, (time.perf_counter() - started) * 1000
+            )
+
+    def _replay(self, name: str, gate: _Gate) -> int:
+        """Runs events deferred during the swap on the new version, then reopens the gate."""
+        count = 0
+        while True:
+            items = gate.take_deferred()
+            if not items:
+                return count
+            for topic, evt, loop in items:
+                count += 1
+                if name not in self.registry.skills:
+                    gate.exit()
+                    continue
+                try:
+                    result = self._run(name, topic, evt, gate)
+                except Exception:
+                    log.exception("replayed event %s for %s failed", topic, name)
+                    continue
+                if inspect.isawaitable(result):
+                    if loop is not None and not loop.is_closed():
+                        asyncio.run_coroutine_threadsafe(result, loop)
+                    else:
+                        asyncio.run(result)
+
+    def poll_once(self, watcher: SkillWatcher) -> List[ReloadReport]:
+        return [self.reload(name) for name in watcher.poll()]
+
+    def start(self, interval: float = POLL_INTERVAL) -> threading.Thread:
+        watcher = SkillWatcher(self.root)
+
+        def loop():
+            while not self._stop.wait(interval):
+                for report in self.poll_once(watcher):
+                    log.info("reloaded %s: %s", report.skill, report)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, name="skills-hot-reload", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Watch skill folders and hot-reload changed skills")
+    parser.add_argument("--root", type=Path, default=REPO_ROOT)
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL)
+    args = parser.parse_args(argv)
+
+    host = HotReloader.from_root(args.root)
+    host.registry.start()
+    watcher = SkillWatcher(args.root)
+    print(f"watching {len(host.registry.skills)} skills under {args.root}")
+    try:
+        while True:
+            time.sleep(args.interval)
+            for report in host.poll_once(watcher):
+                if report.error:
+                    print(f"{report.skill}: kept running version ({report.error})")
+                    continue
+                changes = " ".join([f"+{a}" for a in report.added] + [f"-{r}" for r in report.removed]) or "no registration changes"
+                print(f"{report.skill}: reloaded in {report.duration_ms:.1f} ms, {changes}, replayed {report.replayed}")
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        host.registry.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
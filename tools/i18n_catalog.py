@@ -0,0 +1,264 @@
+"""
+Compiled i18n catalog for all skills.
+
+Merges every skill's ``i18n/<locale>.json`` and ``lang_res()`` (from
+``handlers/main.py`` and ``prep/prepare.py``) into one catalog namespaced
+per skill, with format templates parsed once and locale fallback chains
+resolved at build time. The result is saved as a pickle snapshot::
+
+    python -m tools.i18n_catalog --out build/i18n_catalog.pickle
+
+and used at runtime as::
+
+    catalog = load_or_build("build/i18n_catalog.pickle")   # rebuilt if a source changed
+    _ = catalog.translator("weather_skill", "ru-RU")
+    _("prep.weather.success", city="Moscow", temp=3, description="snow")
+
+Precedence inside a skill: ``i18n/<locale>.json`` > handler ``lang_res()``
+> prep ``lang_res()``; disagreements are reported as conflicts.
+
+The snapshot records (mtime, size) of every source file; ``load_or_build``
+rebuilds and saves it when any of them changed, appeared or disappeared.
+"""
+import argparse
+import ast
+import json
+import pickle
+import string
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from tools.skills import REPO_ROOT, skill_dirs
+
+DEFAULT_LOCALE = "en"
+SNAPSHOT_VERSION = 3
+DEFAULT_SNAPSHOT = REPO_ROOT / "build" / "i18n_catalog.pickle"
+LANG_RES_SOURCES = ("handlers/main.py", "prep/prepare.py")
+
+# rel path -> (mtime_ns, size)
+Stamps = Dict[str, Tuple[int, int]]
+# (literal, field, format_spec, conversion) as produced by string.Formatter().parse
+Segment = Tuple[str, Optional[str], str, Optional[str]]
+# (text, segments); no segments means the text has no fields and is returned as is
+Template = Tuple[str, Tuple[Segment, ...]]
+
+_FORMATTER = string.Formatter()
+_CONVERSIONS = {"s": str, "r": repr, "a": ascii}
+
+
+def extract_lang_res(py_file: Path) -> Dict[str, str]:
+    """
+    Literal dict returned by ``lang_res()``, read via AST so the module
+    (and its SDK imports) is never executed.
+    """
+    try:
+        tree = ast.parse(py_file.read_text(encoding="utf-8"))
+    except (OSError, SyntaxError):
+        return {}
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name == "lang_res":
+            for stmt in ast.walk(node):
+                if isinstance(stmt, ast.Return) and isinstance(stmt.value, ast.Dict):
+                    try:
+                        value = ast.literal_eval(stmt.value)
+                    except ValueError:
+                        return {}
+                    return {str(k): str(v) for k, v in value.items()}
+    return {}
+
+
+def compile_template(text: str) -> Template:
+    """Parses the format string once; render() only looks values up and joins."""
+    try:
+        segments = tuple(_FORMATTER.parse(text))
+    except ValueError:
+        return text, ()  # malformed braces: the message is shown as written
+    if all(field is None for _literal, field, _spec, _conv in segments):
+        return text, ()
+    return text, segments
+
+
+def render(template: Template, kwargs: Dict) -> str:
+    """Joins pre-parsed segments; a missing or unformattable value gives the raw text, like before."""
+    text, segments = template
+    if not segments:
+        return text
+    parts = []
+    try:
+        for literal, field, spec, conv in segments:
+            parts.append(literal)
+            if field is None:
+                continue
+            if "{" in spec:  # nested fields in the spec ("{x:{width}}") are rare: let str.format do it
+                return text.format_map(kwargs)
+            if field.isidentifier():
+                value = kwargs[field]
+            else:
+                value = _FORMATTER.get_field(field, (), kwargs)[0]
+            if conv:
+                value = _CONVERSIONS[conv](value)
+            parts.append(format(value, spec))
+    except (KeyError, IndexError, ValueError, AttributeError, TypeError):
+        return text
+    return "".join(parts)
+
+
+def fallback_chain(locale: str, default: str = DEFAULT_LOCALE) -> List[str]:
+    """``ru-RU`` -> ``["ru-RU", "ru", "en"]``."""
+    chain = []
+    parts = locale.replace("_", "-").split("-")
+    for i in range(len(parts), 0, -1):
+        tag = "-".join(parts[:i])
+        if tag and tag not in chain:
+            chain.append(tag)
+    if default not in chain:
+        chain.append(default)
+    return chain
+
+
+def collect_skill_messages(skill_dir: Path) -> Tuple[Dict[str, Dict[str, str]], List[Tuple[str, str, str, str]]]:
+    """
+    Messages of one skill by locale, plus conflicts as (locale, key, kept, dropped).
+    ``lang_res()`` has no locale of its own and is treated as the default locale.
+    """
+    by_locale: Dict[str, Dict[str, str]] = {}
+    conflicts: List[Tuple[str, str, str, str]] = []
+
+    i18n_dir = skill_dir / "i18n"
+    if i18n_dir.is_dir():
+        for path in sorted(i18n_dir.glob("*.json")):
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            by_locale.setdefault(path.stem, {}).update({str(k): str(v) for k, v in data.items()})
+
+    default = by_locale.setdefault(DEFAULT_LOCALE, {})
+    for rel in LANG_RES_SOURCES:
+        for key, text in extract_lang_res(skill_dir / rel).items():
+            if key not in default:
+                default[key] = text
+            elif default[key] != text:
+                conflicts.append((DEFAULT_LOCALE, key, default[key], text))
+    return by_locale, conflicts
+
+
+def source_stamps(root: Path = REPO_ROOT) -> Stamps:
+    """(mtime, size) of every file the catalog is built from."""
+    stamps: Stamps = {}
+    for skill_dir in skill_dirs(root):
+        files = sorted((skill_dir / "i18n").glob("*.json")) + [skill_dir / rel for rel in LANG_RES_SOURCES]
+        for path in files:
+            if path.is_file():
+                st = path.stat()
+                stamps[path.relative_to(root).as_posix()] = (st.st_mtime_ns, st.st_size)
+    return stamps
+
+
+class Catalog:
+    def __init__(self, tables: Dict[str, Dict[str, Dict[str, Template]]], conflicts: Dict[str, list], stamps: Optional[Stamps] = None):
+        # tables[skill][locale] -> {key: template}, already merged along the fallback chain
+        self.tables = tables
+        self.conflicts = conflicts
+        self.stamps = stamps or {}
+        self._resolved: Dict[Tuple[str, str], Dict[str, Template]] = {}
+
+    def table(self, skill: str, locale: Optional[str] = None) -> Dict[str, Template]:
+        """Flat table for a skill and locale; unknown locales are resolved along the chain once."""
+        locale = locale or DEFAULT_LOCALE
+        cached = self._resolved.get((skill, locale))
+        if cached is not None:
+            return cached
+        skill_tables = self.tables.get(skill, {})
+        table = skill_tables.get(locale)
+        if table is None:
+            table = {}
+            for tag in reversed(fallback_chain(locale)):
+                table.update(skill_tables.get(tag, {}))
+        self._resolved[(skill, locale)] = table
+        return table
+
+    def translator(self, skill: str, locale: Optional[str] = None) -> Callable[..., str]:
+        """``_``-compatible callable bound to one skill and locale: a dict hit plus a format."""
+        table = self.table(skill, locale)
+
+        def _(key: str, **kwargs) -> str:
+            template = table.get(key)
+            if template is None:
+                return key
+            return render(template, kwargs)
+
+        return _
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "wb") as f:
+            data = {"version": SNAPSHOT_VERSION, "tables": self.tables, "conflicts": self.conflicts, "stamps": self.stamps}
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "Catalog":
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported i18n catalog version: {data.get('version')}")
+        return cls(data["tables"], data["conflicts"], data["stamps"])
+
+
+def build_catalog(root: Path = REPO_ROOT) -> Catalog:
+    stamps = source_stamps(root)
+    raw: Dict[str, Dict[str, Dict[str, str]]] = {}
+    conflicts: Dict[str, list] = {}
+    for skill_dir in skill_dirs(root):
+        messages, skill_conflicts = collect_skill_messages(skill_dir)
+        raw[skill_dir.name] = messages
+        if skill_conflicts:
+            conflicts[skill_dir.name] = skill_conflicts
+
+    tables: Dict[str, Dict[str, Dict[str, Template]]] = {}
+    for skill, by_locale in raw.items():
+        tables[skill] = {}
+        for locale in by_locale:
+            merged: Dict[str, str] = {}
+            for tag in reversed(fallback_chain(locale)):
+                merged.update(by_locale.get(tag, {}))
+            tables[skill][locale] = {key: compile_template(text) for key, text in merged.items()}
+    return Catalog(tables, conflicts, stamps)
+
+
+def load_or_build(path: Path = DEFAULT_SNAPSHOT, root: Path = REPO_ROOT) -> Catalog:
+    """The saved snapshot if its sources are unchanged; otherwise a fresh build, saved to path."""
+    try:
+        catalog = Catalog.load(path)
+        if catalog.stamps == source_stamps(root):
+            return catalog
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError, ValueError):
+        pass  # missing, corrupt or older snapshot
+    catalog = build_catalog(root)
+    catalog.save(path)
+    return catalog
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build the compiled i18n catalog for all skills")
+    parser.add_argument("--root", type=Path, default=REPO_ROOT)
+    parser.add_argument("--out", type=Path, default=DEFAULT_SNAPSHOT)
+    parser.add_argument("--strict", action="store_true", help="exit 1 if lang_res() and i18n/*.json disagree")
+    args = parser.parse_args(argv)
+
+    catalog = build_catalog(args.root)
+    catalog.save(args.out)
+    keys = sum(len(t) for tables in catalog.tables.values() for t in tables.values())
+    print(f"{len(catalog.tables)} skills, {keys} messages -> {args.out}")
+    for skill, items in catalog.conflicts.items():
+        for locale, key, kept, dropped in items:
+            print(f"conflict {skill} [{locale}] {key}: kept {kept!r}, dropped {dropped!r}", file=sys.stderr)
+    return 1 if args.strict and catalog.conflicts else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
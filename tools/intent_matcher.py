@@ -0,0 +1,297 @@
+"""
+Cross-skill intent matcher.
+
+All installed skills' ``intents/*.intent`` templates (``поставь будильник на {time}``)
+and ``skill.yaml`` voice triggers (``поставь будильник на *``) are compiled into one
+token trie with slot edges. Matching walks the utterance once through the trie, so
+its cost depends on the utterance, not on how many skills are installed::
+
+    matcher = IntentMatcher.from_root()
+    matcher.match("Поставь будильник на 7:30")
+    # Match(skill='alarm_skill4', intent='set', slots={'time': '7:30'}, ...)
+
+Skills are added/removed incrementally (``add_skill``/``remove_skill``);
+``sync()`` re-reads only skills whose intent files changed. With
+``extractors`` (e.g. ``tools.slots.EXTRACTORS``) slot texts are parsed and
+templates whose slots do not parse are skipped.
+
+    python -m tools.intent_matcher --bench
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+import yaml
+
+from tools.skills import REPO_ROOT, SKILL_MANIFEST, skill_dirs
+
+WILDCARD = "*"
+TRIGGER_INTENT = "trigger"
+
+_SLOT = re.compile(r"^\{(\w+)\}$")
+_TOKEN = re.compile(r"\{\w+\}|[^\s,!?;«»\"()]+")
+
+
+class Match(NamedTuple):
+    skill: str
+    intent: str
+    slots: Dict[str, str]
+    template: str
+    score: int  # число совпавших литеральных токенов: чем больше, тем специфичнее шаблон
+    values: Optional[Dict[str, object]] = None  # разобранные значения слотов (см. extractors)
+
+
+def _split(text: str) -> List[str]:
+    return [t.rstrip(".") or t for t in _TOKEN.findall(text)]
+
+
+def tokenize(text: str) -> List[str]:
+    return _split(text.casefold().replace("ё", "е"))
+
+
+class _Node:
+    __slots__ = ("children", "slots", "terminals")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.slots: Dict[str, "_Node"] = {}  # имя слота -> узел после слота
+        self.terminals: List[Tuple[str, str, str, int]] = []  # (skill, intent, template, literals)
+
+
+class IntentMatcher:
+    def __init__(self):
+        self._root = _Node()
+        self._skill_terminals: Dict[str, List[_Node]] = {}
+        self._stamps: Dict[str, Tuple] = {}
+
+    # --- building ---
+
+    def add_template(self, skill: str, intent: str, template: str) -> None:
+        node, literals = self._root, 0
+        for token in tokenize(template):
+            slot = _SLOT.match(token)
+            if slot or token == WILDCARD:
+                name = slot.group(1) if slot else WILDCARD
+                node = node.slots.setdefault(name, _Node())
+            else:
+                node = node.children.setdefault(token, _Node())
+                literals += 1
+        node.terminals.append((skill, intent, template, literals))
+        self._skill_terminals.setdefault(skill, []).append(node)
+
+    def add_skill(self, skill: str, templates: Iterable[Tuple[str, str]]) -> None:
+        """templates — пары (intent, template); ранее добавленные шаблоны навыка заменяются."""
+        self.remove_skill(skill)
+        for intent, template in templates:
+            self.add_template(skill, intent, template)
+
+    def remove_skill(self, skill: str) -> None:
+        # пустые узлы остаются в дереве: на скорость поиска они не влияют
+        for node in self._skill_terminals.pop(skill, []):
+            node.terminals = [t for t in node.terminals if t[0] != skill]
+        self._stamps.pop(skill, None)
+
+    def skills(self) -> List[str]:
+        return sorted(self._skill_terminals)
+
+    # --- loading from skill folders ---
+
+    @staticmethod
+    def read_skill_templates(skill_dir: Path) -> List[Tuple[str, str]]:
+        templates: List[Tuple[str, str]] = []
+        for path in sorted((skill_dir / "intents").glob("*.intent")):
+            for line in path.read_text(encoding="utf-8").splitlines():
+                if line.strip() and not line.lstrip().startswith("#"):
+                    templates.append((path.stem, line.strip()))
+        manifest = yaml.safe_load((skill_dir / SKILL_MANIFEST).read_text(encoding="utf-8")) or {}
+        for trigger in manifest.get("triggers") or []:
+            if isinstance(trigger, dict) and trigger.get("voice"):
+                templates.append((TRIGGER_INTENT, str(trigger["voice"])))
+        return templates
+
+    @staticmethod
+    def _stamp(skill_dir: Path) -> Tuple:
+        files = [skill_dir / SKILL_MANIFEST, *sorted((skill_dir / "intents").glob("*.intent"))]
+        return tuple((f.name, f.stat().st_mtime_ns, f.stat().st_size) for f in files if f.exists())
+
+    def sync(self, root: Path = REPO_ROOT) -> List[str]:
+        """Приводит индекс к содержимому root: добавляет/обновляет изменённые навыки, убирает удалённые."""
+        changed = []
+        present = {}
+        for skill_dir in skill_dirs(root):
+            present[skill_dir.name] = skill_dir
+            stamp = self._stamp(skill_dir)
+            if self._stamps.get(skill_dir.name) != stamp:
+                self.add_skill(skill_dir.name, self.read_skill_templates(skill_dir))
+                self._stamps[skill_dir.name] = stamp
+                changed.append(skill_dir.name)
+        for skill in [s for s in self._skill_terminals if s not in present]:
+            self.remove_skill(skill)
+            changed.append(skill)
+        return changed
+
+    @classmethod
+    def from_root(cls, root: Path = REPO_ROOT) -> "IntentMatcher":
+        matcher = cls()
+        matcher.sync(root)
+        return matcher
+
+    # --- matching ---
+
+    def match(self, utterance: str, extractors: Optional[Mapping[str, Callable[[str], object]]] = None) -> Optional[Match]:
+        matches = self.match_all(utterance, limit=1, extractors=extractors)
+        return matches[0] if matches else None
+
+    def match_all(
+        self,
+        utterance: str,
+        limit: int = 0,
+        extractors: Optional[Mapping[str, Callable[[str], object]]] = None,
+    ) -> List[Match]:
+        """
+        Все совпадения, самые специфичные (больше литеральных токенов) — первыми;
+        при равенстве именованный слот выигрывает у «*» триггера, дальше — по имени
+        навыка и интента, чтобы порядок не зависел от порядка add_skill().
+        """
+        raw = _split(utterance)
+        tokens = tokenize(utterance)
+        found: List[Match] = []
+        self._walk(self._root, tokens, raw, 0, {}, found)
+        if extractors:
+            found = [m for m in (self._extract(m, extractors) for m in found) if m is not None]
+        found.sort(key=lambda m: (-m.score, WILDCARD in m.slots, m.skill, m.intent))
+        return found[:limit] if limit else found
+
+    @staticmethod
+    def _extract(match: Match, extractors: Mapping[str, Callable[[str], object]]) -> Optional[Match]:
+        values = {}
+        for name, text in match.slots.items():
+            extractor = extractors.get(name)
+            if extractor is None:
+                values[name] = text
+                continue
+            value = extractor(text)
+            if value is None:
+                return None
+            values[name] = value
+        return match._replace(values=values)
+
+    def _walk(self, node: _Node, tokens: List[str], raw: List[str], i: int, slots: Dict[str, str], found: List[Match]) -> None:
+        if i == len(tokens):
+            for skill, intent, template, literals in node.terminals:
+                found.append(Match(skill, intent, dict(slots), template, literals))
+            return
+
+        child = node.children.get(tokens[i])
+        if child is not None:
+            self._walk(child, tokens, raw, i + 1, slots, found)
+
+        for name, after in node.slots.items():
+            # слот забирает от одного токена до конца; пробуем, начиная с самого короткого
+            for j in range(i + 1, len(tokens) + 1):
+                if j < len(tokens) and not after.children.get(tokens[j]) and not after.slots:
+                    continue
+                slots[name] = " ".join(raw[i:j])
+                self._walk(after, tokens, raw, j, slots, found)
+                del slots[name]
+
+
+# ---------------------------
+# benchmark
+# ---------------------------
+
+
+def _synthetic_skills(count: int, rnd: random.Random) -> Dict[str, List[Tuple[str, str]]]:
+    verbs = ["поставь", "включи", "покажи", "найди", "запусти", "открой", "отмени", "скажи"]
+    skills = {}
+    for n in range(count):
+        noun = f"объект{n}"
+        skills[f"skill_{n}"] = [
+            ("set", f"{rnd.choice(verbs)} {noun} на {{time}}"),
+            ("get", f"{rnd.choice(verbs)} {noun} в {{city}}"),
+            ("cancel", f"отмени {noun}"),
+            (TRIGGER_INTENT, f"{noun} {rnd.choice(verbs)} *"),
+        ]
+    return skills
+
+
+def _linear_match(compiled: List[Tuple[str, str, "re.Pattern"]], utterance: str) -> Optional[Tuple[str, str]]:
+    text = " ".join(tokenize(utterance))
+    for skill, intent, pattern in compiled:
+        if pattern.fullmatch(text):
+            return skill, intent
+    return None
+
+
+def _compile_linear(skills: Dict[str, List[Tuple[str, str]]]) -> List[Tuple[str, str, "re.Pattern"]]:
+    compiled = []
+    for skill, templates in skills.items():
+        for intent, template in templates:
+            parts = []
+            for token in tokenize(template):
+                slot = _SLOT.match(token)
+                parts.append(f"(?P<{slot.group(1)}>.+?)" if slot else "(.+?)" if token == WILDCARD else re.escape(token))
+            compiled.append((skill, intent, re.compile(" ".join(parts))))
+    return compiled
+
+
+def bench(sizes=(10, 100, 1000), queries: int = 2000) -> None:
+    rnd = random.Random(1)
+    print(f"{'skills':>7} {'trie build ms':>14} {'trie us/match':>14} {'linear us/match':>16}")
+    for size in sizes:
+        skills = _synthetic_skills(size, rnd)
+        started = time.perf_counter()
+        matcher = IntentMatcher()
+        for skill, templates in skills.items():
+            matcher.add_skill(skill, templates)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        utterances = []
+        for _ in range(queries):
+            skill = rnd.choice(list(skills))
+            template = rnd.choice(skills[skill])[1]
+            utterances.append(template.replace("{time}", "7:30").replace("{city}", "москве").replace("*", "громко"))
+
+        started = time.perf_counter()
+        for u in utterances:
+            matcher.match(u)
+        trie_us = (time.perf_counter() - started) / queries * 1e6
+
+        linear = _compile_linear(skills)
+        sample = utterances[: max(50, queries // size)]
+        started = time.perf_counter()
+        for u in sample:
+            _linear_match(linear, u)
+        linear_us = (time.perf_counter() - started) / len(sample) * 1e6
+        print(f"{size:>7} {build_ms:>14.1f} {trie_us:>14.2f} {linear_us:>16.2f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compiled cross-skill intent matcher")
+    parser.add_argument("utterance", nargs="?", help="utterance to route")
+    parser.add_argument("--root", type=Path, default=REPO_ROOT)
+    parser.add_argument("--bench", action="store_true", help="match latency at 10/100/1000 skills")
+    parser.add_argument("--slots", action="store_true", help="parse {time}/{city} slots with tools.slots")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        bench()
+        return 0
+    matcher = IntentMatcher.from_root(args.root)
+    if not args.utterance:
+        print(f"{len(matcher.skills())} skills indexed")
+        return 0
+    extractors = None
+    if args.slots:
+        from tools.slots import EXTRACTORS as extractors
+    for m in matcher.match_all(args.utterance, extractors=extractors):
+        print(f"{m.skill}\t{m.intent}\t{m.values or m.slots}\t{m.template!r}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
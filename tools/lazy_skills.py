@@ -0,0 +1,391 @@
+"""
+Lazy skill handlers and per-skill import profiling.
+
+Topics and tool names are registered from the manifest (``events.subscribe``,
+``tools[].name``); which function serves them is read from the ``@subscribe`` /
+``@tool`` decorators in ``handlers/main.py`` via AST. The handler module itself
+is imported on first dispatch, or ahead of time by ``prewarm()``::
+
+    registry = LazyRegistry.from_root()
+    registry.call_tool("get_weather", "Berlin")         # imports weather_skill now
+    registry.prewarm(["alarm_skill4"])                   # background import
+
+A handler module may define module-level ``start()`` and ``shutdown()``
+hooks (timers, sessions, files). ``start()`` runs once, before the first call
+into the skill, or for every such skill at ``registry.start()``;
+``shutdown()`` runs at ``registry.shutdown()`` or before a hot reload swaps
+the module out. Importing the module must not start anything by itself.
+
+``python -m tools.lazy_skills --report`` imports every skill's handler in a
+fresh interpreter under ``-X importtime`` and prints import time, memory and
+the heaviest imported packages per skill.
+"""
+import argparse
+import ast
+import importlib
+import importlib.machinery
+import importlib.util
+import json
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from tools.manifest_index import ManifestIndex
+from tools.skills import REPO_ROOT
+
+HANDLER_FILE = Path("handlers") / "main.py"
+DECORATORS = ("tool", "subscribe")
+LIFECYCLE_HOOKS = ("start", "shutdown")
+
+
+def _scan(main_py: Path) -> Tuple[Dict[Tuple[str, str], str], Set[str], Set[str]]:
+    try:
+        tree = ast.parse(main_py.read_text(encoding="utf-8"))
+    except (OSError, SyntaxError):
+        return {}, set(), set()
+    entries = {}
+    async_names = set()
+    hooks = set()
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        if isinstance(node, ast.AsyncFunctionDef):
+            async_names.add(node.name)
+        if node.name in LIFECYCLE_HOOKS:
+            hooks.add(node.name)
+        for dec in node.decorator_list:
+            if (
+                isinstance(dec, ast.Call)
+                and isinstance(dec.func, ast.Name)
+                and dec.func.id in DECORATORS
+                and dec.args
+                and isinstance(dec.args[0], ast.Constant)
+                and isinstance(dec.args[0].value, str)
+            ):
+                entries[(dec.func.id, dec.args[0].value)] = node.name
+    return entries, async_names, hooks
+
+
+def import_from_folder(folder: Path, package: str, module: str) -> types.ModuleType:
+    """
+    Imports ``<folder>/<module>.py`` as ``<package>.<module>``, ``<package>``
+    being the folder itself, so helpers next to it are imported relatively
+    (``from .time_slot import parse_time``). Modules left from an earlier
+    import of the package are evicted first: edited helpers run again.
+    """
+    for name in [n for n in sys.modules if n == package or n.startswith(package + ".")]:
+        del sys.modules[name]
+    spec = importlib.machinery.ModuleSpec(package, None, is_package=True)
+    spec.submodule_search_locations = [str(folder)]
+    sys.modules[package] = importlib.util.module_from_spec(spec)
+    return importlib.import_module(f"{package}.{module}")
+
+
+def load_handlers(skill_dir: Path, package: str) -> types.ModuleType:
+    """Imports the skill's ``handlers/main.py`` as ``<package>.main``."""
+    return import_from_folder(skill_dir / HANDLER_FILE.parent, package, HANDLER_FILE.stem)
+
+
+def scan_handlers(main_py: Path) -> Dict[Tuple[str, str], str]:
+    """(decorator, topic or tool name) -> function name, without importing the module."""
+    return _scan(main_py)[0]
+
+
+class LazySkill:
+    def __init__(self, skill_dir: Path, manifest: Dict, autostart: bool = True):
+        self.name = skill_dir.name
+        self.skill_dir = skill_dir
+        self.package = f"adaos_skill_{self.name}"  # handlers/ is imported as this package
+        events = manifest.get("events") or {}
+        self.topics: List[str] = [str(t) for t in events.get("subscribe") or []]
+        self.tools: List[str] = [str(t["name"]) for t in manifest.get("tools") or [] if isinstance(t, dict) and t.get("name")]
+        self._entries, self._async, self._hooks = _scan(skill_dir / HANDLER_FILE)
+        self.autostart = autostart  # False: calls never run the start() hook (e.g. in pool worker processes)
+        self._module: Optional[types.ModuleType] = None
+        self._lock = threading.Lock()
+        self._started = False
+        self.import_seconds: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    @property
+    def stateful(self) -> bool:
+        """Defines a start() or shutdown() hook (from the AST): owns threads, sessions or files."""
+        return bool(self._hooks)
+
+    @property
+    def module(self) -> types.ModuleType:
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    started = time.perf_counter()
+                    module = load_handlers(self.skill_dir, self.package)
+                    self.import_seconds = time.perf_counter() - started
+                    self._module = module
+        return self._module
+
+    def start(self) -> None:
+        """Imports the module and runs its start() hook, once."""
+        module = self.module
+        with self._lock:
+            if self._started:
+                return
+            if "start" in self._hooks:
+                module.start()
+            self._started = True
+
+    def shutdown(self) -> None:
+        """Runs the module's shutdown() hook if the skill was started; the next call starts it again."""
+        with self._lock:
+            if not self._started:
+                return
+            self._started = False
+            if "shutdown" in self._hooks:
+                self._module.shutdown()
+
+    def _ensure_started(self) -> None:
+        if self.autostart and not self._started:
+            self.start()
+
+    def _function(self, kind: str, key: str):
+        name = self._entries.get((kind, key))
+        if name is None:
+            raise KeyError(f"{self.name}: no @{kind}({key!r}) handler")
+        self._ensure_started()
+        return getattr(self.module, name)
+
+    def is_async(self, kind: str, key: str) -> bool:
+        """Whether the @tool/@subscribe function (or "handle" for kind "handle") is ``async def``, from the AST."""
+        return (key if kind == "handle" else self._entries.get((kind, key))) in self._async
+
+    def call_tool(self, name: str, *args, **kwargs):
+        return self._function("tool", name)(*args, **kwargs)
+
+    def dispatch(self, topic: str, evt):
+        return self._function("subscribe", topic)(evt)
+
+    def handle(self, intent: str, entities: Dict):
+        self._ensure_started()
+        return self.module.handle(intent, entities)
+
+
+class LazyRegistry:
+    def __init__(self, skills: Iterable[LazySkill]):
+        self.skills: Dict[str, LazySkill] = {}
+        self._topics: Dict[str, List[LazySkill]] = {}
+        self._tools: Dict[str, LazySkill] = {}
+        for skill in skills:
+            self.skills[skill.name] = skill
+            for topic in skill.topics:
+                self._topics.setdefault(topic, []).append(skill)
+            for tool in skill.tools:
+                self._tools.setdefault(tool, skill)
+
+    @classmethod
+    def from_root(cls, root: Path = REPO_ROOT, index_path: Optional[Path] = None) -> "LazyRegistry":
+        """Manifests come from root's binary manifest index (refreshed, nothing is imported)."""
+        index = ManifestIndex.open(index_path, root)
+        index.refresh()
+        index.save()
+        return cls(LazySkill(root / name, data["manifest"]) for name, data in sorted(index.skills.items()))
+
+    def replace(self, skill: LazySkill) -> Optional[LazySkill]:
+        """Registers a new version of a skill in place of the old one; returns the old version."""
+        old = self.remove(skill.name)
+        self.skills[skill.name] = skill
+        for topic in skill.topics:
+            self._topics.setdefault(topic, []).append(skill)
+        for tool in skill.tools:
+            self._tools.setdefault(tool, skill)
+        return old
+
+    def remove(self, name: str) -> Optional[LazySkill]:
+        old = self.skills.pop(name, None)
+        if old is None:
+            return None
+        for topic in old.topics:
+            subscribers = [s for s in self._topics.get(topic, []) if s is not old]
+            if subscribers:
+                self._topics[topic] = subscribers
+            else:
+                self._topics.pop(topic, None)
+        for tool in old.tools:
+            if self._tools.get(tool) is old:
+                del self._tools[tool]
+        return old
+
+    def tool_owner(self, name: str) -> Optional[str]:
+        skill = self._tools.get(name)
+        return skill.name if skill is not None else None
+
+    def subscribers(self, topic: str) -> List[LazySkill]:
+        return self._topics.get(topic, [])
+
+    def dispatch(self, topic: str, evt) -> List:
+        """Calls every subscriber (coroutines are returned to the caller to await)."""
+        return [skill.dispatch(topic, evt) for skill in self.subscribers(topic)]
+
+    def call_tool(self, name: str, *args, **kwargs):
+        skill = self._tools.get(name)
+        if skill is None:
+            raise KeyError(f"unknown tool: {name}")
+        return skill.call_tool(name, *args, **kwargs)
+
+    def start(self, names: Optional[Iterable[str]] = None) -> None:
+        """Starts stateful skills now (alarms must be scheduled before any call); others start on first call."""
+        for skill in [self.skills[n] for n in names] if names is not None else list(self.skills.values()):
+            if skill.stateful:
+                skill.start()
+
+    def shutdown(self) -> None:
+        for skill in self.skills.values():
+            skill.shutdown()
+
+    def prewarm(self, names: Optional[Iterable[str]] = None, background: bool = True) -> Optional[threading.Thread]:
+        """Imports handlers ahead of the first dispatch; failures are left for dispatch to raise."""
+        skills = [self.skills[n] for n in names] if names is not None else list(self.skills.values())
+
+        def warm():
+            for skill in skills:
+                try:
+                    skill.module
+                except Exception:
+                    pass
+
+        if not background:
+            warm()
+            return None
+        thread = threading.Thread(target=warm, name="skills-prewarm", daemon=True)
+        thread.start()
+        return thread
+
+
+# ---------------------------
+# import-time report
+# ---------------------------
+
+# imports one handler file in a fresh interpreter and prints its own measurements as JSON
+_PROBE = r"""
+import importlib, importlib.machinery, importlib.util, json, os, sys, time
+try:
+    import resource
+    rss = lambda: resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+except ImportError:
+    rss = lambda: 0
+path, name = sys.argv[1], sys.argv[2]
+before_modules, before_rss = len(sys.modules), rss()
+started = time.perf_counter()
+spec = importlib.machinery.ModuleSpec(name, None, is_package=True)
+spec.submodule_search_locations = [os.path.dirname(path)]
+sys.modules[name] = importlib.util.module_from_spec(spec)
+importlib.import_module(name + ".main")
+print(json.dumps({
+    "import_ms": (time.perf_counter() - started) * 1000,
+    "rss_kb": rss() - before_rss,
+    "modules": len(sys.modules) - before_modules,
+}))
+"""
+_IMPORTTIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def _importtime_entries(stderr: str) -> List[Tuple[int, int, int, str]]:
+    """(self_us, cumulative_us, depth, module) for every ``-X importtime`` line."""
+    entries = []
+    for line in stderr.splitlines():
+        m = _IMPORTTIME.match(line)
+        if m:
+            entries.append((int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2, m.group(4)))
+    return entries
+
+
+def _baseline(python: str) -> set:
+    """Modules the interpreter and the probe itself import: the probe run on an empty handler."""
+    with tempfile.TemporaryDirectory() as tmp:
+        empty = Path(tmp) / "main.py"
+        empty.write_text("", encoding="utf-8")
+        proc = subprocess.run([python, "-X", "importtime", "-c", _PROBE, str(empty), "baseline"], capture_output=True, text=True)
+    return {e[3] for e in _importtime_entries(proc.stderr)}
+
+
+def profile_skill(skill_dir: Path, python: str = sys.executable, baseline: Optional[set] = None, top: int = 3) -> Dict:
+    main_py = skill_dir / HANDLER_FILE
+    report = {"skill": skill_dir.name}
+    if not main_py.exists():
+        report["error"] = "no handlers/main.py"
+        return report
+    baseline = baseline if baseline is not None else _baseline(python)
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", _PROBE, str(main_py), f"adaos_skill_{skill_dir.name}"],
+        capture_output=True,
+        text=True,
+        cwd=skill_dir,
+    )
+    entries = [e for e in _importtime_entries(proc.stderr) if e[3] not in baseline]
+    if proc.returncode != 0:
+        errors = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+        report["error"] = errors[-1] if errors else f"exit code {proc.returncode}"
+        return report
+    report.update(json.loads(proc.stdout.strip().splitlines()[-1]))
+    report["imports_ms"] = round(sum(e[0] for e in entries) / 1000, 1)
+    # the heaviest packages imported directly by the handler (shallowest level among new modules)
+    depth = min((e[2] for e in entries), default=0)
+    heavy = sorted((e for e in entries if e[2] == depth), key=lambda e: -e[1])[:top]
+    report["heaviest"] = [{"module": e[3], "cumulative_ms": round(e[1] / 1000, 1)} for e in heavy]
+    report["import_ms"] = round(report["import_ms"], 1)
+    return report
+
+
+def import_report(
+    root: Path = REPO_ROOT, names: Optional[List[str]] = None, python: str = sys.executable, index_path: Optional[Path] = None
+) -> List[Dict]:
+    baseline = _baseline(python)
+    index = ManifestIndex.open(index_path, root)
+    index.refresh()
+    skills = names if names is not None else sorted(index.skills)
+    return [profile_skill(root / name, python, baseline) for name in skills]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Lazy skill handlers: import-time and memory report")
+    parser.add_argument("--root", type=Path, default=REPO_ROOT)
+    parser.add_argument("--skills", nargs="*", help="skill names (default: all)")
+    parser.add_argument("--report", action="store_true", help="profile handler imports per skill")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    if not args.report:
+        registry = LazyRegistry.from_root(args.root)
+        for skill in registry.skills.values():
+            print(f"{skill.name:<24} topics={skill.topics} tools={skill.tools}")
+        return 0
+
+    report = import_report(args.root, args.skills)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    for entry in report:
+        if "error" in entry:
+            print(f"{entry['skill']:<24} error: {entry['error']}")
+            continue
+        heavy = ", ".join(f"{h['module']} {h['cumulative_ms']}ms" for h in entry["heaviest"])
+        print(
+            f"{entry['skill']:<24} {entry['import_ms']:>8.1f} ms {entry['rss_kb'] / 1024:>6.1f} MB "
+            f"{entry['modules']:>4} modules  {heavy}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+Binary manifest index for fast startup.
+
+``skills.yaml`` and, per skill, ``skill.yaml`` (tools, events, triggers),
+``config.json`` and ``i18n/*.json`` are parsed once and stored in one pickle
+file. Startup reads that file with a single read and only ``stat()``s the
+sources; a skill is re-parsed only when one of its files changed (size/mtime
+differ and the content hash differs too)::
+
+    index = ManifestIndex.open()       # <root>/build/manifest_index.pickle
+    changed = index.refresh()          # re-parses changed skills only
+    index.save()
+    index.skills["weather_skill"]["manifest"]["tools"]
+
+    python -m tools.manifest_index            # build/refresh
+    python -m tools.manifest_index --bench    # 10/100/1000 skills vs cold YAML
+"""
+import argparse
+import hashlib
+import json
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+from tools.skills import REPO_ROOT, SKILL_MANIFEST, listed_skills, skill_dirs
+
+INDEX_VERSION = 1
+INDEX_FILE = Path("build") / "manifest_index.pickle"
+DEFAULT_INDEX = REPO_ROOT / INDEX_FILE
+
+# rel path -> (mtime_ns, size, sha256)
+Stamp = Dict[str, Tuple[int, int, str]]
+
+
+def index_file(root: Path = REPO_ROOT) -> Path:
+    """The index of the skills under root: ``<root>/build/manifest_index.pickle``."""
+    return Path(root) / INDEX_FILE
+
+
+def _source_files(skill_dir: Path) -> List[Path]:
+    files = [skill_dir / SKILL_MANIFEST, skill_dir / "config.json"]
+    i18n_dir = skill_dir / "i18n"
+    if i18n_dir.is_dir():
+        files.extend(sorted(i18n_dir.glob("*.json")))
+    return [f for f in files if f.exists()]
+
+
+def _hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _read_json(path: Path) -> Dict:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def parse_skill(skill_dir: Path) -> Dict:
+    """Everything the runtime reads from a skill folder at startup."""
+    manifest = yaml.safe_load((skill_dir / SKILL_MANIFEST).read_text(encoding="utf-8")) or {}
+    config_path = skill_dir / "config.json"
+    i18n_dir = skill_dir / "i18n"
+    return {
+        "manifest": manifest,
+        "config": _read_json(config_path) if config_path.exists() else {},
+        "i18n": {p.stem: _read_json(p) for p in sorted(i18n_dir.glob("*.json"))} if i18n_dir.is_dir() else {},
+    }
+
+
+class ManifestIndex:
+    def __init__(self, path: Optional[Path] = None, root: Path = REPO_ROOT):
+        self.path = Path(path) if path is not None else index_file(root)
+        self.root = Path(root)
+        self.listed: List[str] = []
+        self.skills: Dict[str, Dict] = {}
+        self._stamps: Dict[str, Stamp] = {}
+        self._dirty = False
+
+    @classmethod
+    def open(cls, path: Optional[Path] = None, root: Path = REPO_ROOT) -> "ManifestIndex":
+        """Loads the index file (one read); a missing or incompatible file gives an empty index."""
+        index = cls(path, root)
+        try:
+            data = pickle.loads(index.path.read_bytes())
+            if data.get("version") != INDEX_VERSION or data.get("root") != str(index.root):
+                return index
+            listed, skills, stamps = data["listed"], data["skills"], data["stamps"]
+            if not (isinstance(listed, list) and isinstance(skills, dict) and isinstance(stamps, dict)):
+                return index
+        except (OSError, pickle.UnpicklingError, EOFError, ImportError, AttributeError, KeyError, TypeError, ValueError):
+            return index  # corrupt or foreign file: refresh() rebuilds it
+        index.listed = listed
+        index.skills = skills
+        index._stamps = stamps
+        return index
+
+    def save(self) -> None:
+        if not self._dirty and self.path.exists():
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"version": INDEX_VERSION, "root": str(self.root), "listed": self.listed, "skills": self.skills, "stamps": self._stamps}
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_bytes(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+        tmp.replace(self.path)
+        self._dirty = False
+
+    def _is_current(self, key: str, files: List[Path], base: Path) -> Tuple[bool, Stamp]:
+        old = self._stamps.get(key)
+        new: Stamp = {}
+        current = old is not None and len(old) == len(files)
+        for f in files:
+            rel = f.relative_to(base).as_posix()
+            st = f.stat()
+            prev = old.get(rel) if old else None
+            if prev is not None and prev[0] == st.st_mtime_ns and prev[1] == st.st_size:
+                new[rel] = prev
+                continue
+            digest = _hash(f)
+            new[rel] = (st.st_mtime_ns, st.st_size, digest)
+            if prev is None or prev[2] != digest:
+                current = False
+        if new != old:
+            self._dirty = True  # at least the stamps moved (touched but unchanged files)
+        return current, new
+
+    def refresh(self) -> List[str]:
+        """Re-parses skills whose sources changed, drops removed ones; returns changed names."""
+        changed = []
+        listed_file = self.root / "skills.yaml"
+        files = [listed_file] if listed_file.exists() else []
+        current, stamp = self._is_current("skills.yaml", files, self.root)
+        if not current:
+            self.listed = listed_skills(self.root)
+            self._dirty = True
+        self._stamps["skills.yaml"] = stamp
+
+        present = set()
+        for skill_dir in skill_dirs(self.root):
+            name = skill_dir.name
+            present.add(name)
+            current, stamp = self._is_current(name, _source_files(skill_dir), skill_dir)
+            self._stamps[name] = stamp
+            if not current or name not in self.skills:
+                self.skills[name] = parse_skill(skill_dir)
+                self._dirty = True
+                changed.append(name)
+        for name in [n for n in self.skills if n not in present]:
+            del self.skills[name]
+            self._stamps.pop(name, None)
+            self._dirty = True
+            changed.append(name)
+        return changed
+
+
+def build_index(path: Optional[Path] = None, root: Path = REPO_ROOT) -> Tuple[ManifestIndex, List[str]]:
+    index = ManifestIndex.open(path, root)
+    changed = index.refresh()
+    index.save()
+    return index, changed
+
+
+# ---------------------------
+# benchmark
+# ---------------------------
+
+
+def _make_fleet(target: Path, count: int, template: Path) -> None:
+    names = []
+    for n in range(count):
+        name = f"skill_{n}"
+        skill_dir = target / name
+        skill_dir.mkdir()
+        for f in _source_files(template):
+            dest = skill_dir / f.relative_to(template)
+            dest.parent.mkdir(exist_ok=True)
+            shutil.copyfile(f, dest)
+        names.append(name)
+    (target / "skills.yaml").write_text(yaml.safe_dump({"skills": names}), encoding="utf-8")
+
+
+def _cold_parse(root: Path) -> Tuple[List[str], Dict[str, Dict]]:
+    return listed_skills(root), {d.name: parse_skill(d) for d in skill_dirs(root)}
+
+
+def bench(sizes=(10, 100, 1000), template: Path = REPO_ROOT / "weather_skill") -> None:
+    print(f"{'skills':>7} {'cold yaml ms':>13} {'build ms':>9} {'warm start ms':>14} {'1 changed ms':>13} {'index KB':>9}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            _make_fleet(root, size, template)
+            path = root / "index.pickle"
+
+            started = time.perf_counter()
+            _cold_parse(root)
+            cold = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            build_index(path, root)
+            build = (time.perf_counter() - started) * 1000
+
+            # startup: one read + stat of every source, nothing re-parsed
+            started = time.perf_counter()
+            index = ManifestIndex.open(path, root)
+            index.refresh()
+            warm = (time.perf_counter() - started) * 1000
+
+            manifest = root / "skill_0" / SKILL_MANIFEST
+            manifest.write_text(manifest.read_text(encoding="utf-8") + "\n# changed\n", encoding="utf-8")
+            started = time.perf_counter()
+            build_index(path, root)
+            one = (time.perf_counter() - started) * 1000
+
+            print(f"{size:>7} {cold:>13.1f} {build:>9.1f} {warm:>14.1f} {one:>13.1f} {path.stat().st_size / 1024:>9.0f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build or refresh the binary manifest index")
+    parser.add_argument("--root", type=Path, default=REPO_ROOT)
+    parser.add_argument("--out", type=Path, help="default: <root>/build/manifest_index.pickle")
+    parser.add_argument("--bench", action="store_true", help="startup time at 10/100/1000 skills vs cold YAML parsing")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        bench()
+        return 0
+    index, changed = build_index(args.out, args.root)
+    print(f"{len(index.skills)} skills, {len(changed)} re-parsed -> {index.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
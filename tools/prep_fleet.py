@@ -0,0 +1,182 @@
+"""
+Batch prep for every skill listed in ``skills.yaml``.
+
+All skills are prepared in one process and concurrently, so provisioning a
+node takes as long as the slowest skill rather than the sum. Hypotheses
+shared between skills (``Internet access``) are evaluated once per distinct
+inputs; the skills share one HTTP session. Resources never come from
+``input()``: they are read from an answers file and the environment::
+
+    python -m tools.prep_fleet --answers answers.yaml
+
+    # answers.yaml (or .json)
+    "*":                      # every skill
+      default_city: Moscow
+    weather_skill:
+      api_key: ...
+
+Environment overrides the file: ``ADAOS_PREP_<KEY>`` for every skill,
+``ADAOS_PREP_<SKILL>_<KEY>`` for one skill. One aggregate report is written
+to ``build/prep_report.json``; the exit code is 1 if any skill failed or a
+listed skill is not found.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import types
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional
+
+import requests
+import yaml
+from requests.adapters import HTTPAdapter
+
+from tools.lazy_skills import import_from_folder
+from tools.skills import REPO_ROOT, SKILL_MANIFEST, listed_skills, skill_dirs
+
+ENV_PREFIX = "ADAOS_PREP_"
+PREPARE_FILE = Path("prep") / "prepare.py"
+
+
+class SharedProbes:
+    """
+    Probe cache shared by all skills of one batch: a hypothesis with the same name
+    and the same inputs is checked once; concurrent callers wait for that result.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results: Dict[tuple, Future] = {}
+        self.runs = 0
+        self.hits = 0
+
+    def run(self, hypothesis, resources: Mapping[str, str], check):
+        key = (hypothesis.name, json.dumps({k: resources.get(k) for k in hypothesis.requires}, sort_keys=True))
+        with self._lock:
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                future = self._results[key] = Future()
+                self.runs += 1
+            else:
+                self.hits += 1
+        if owner:
+            try:
+                future.set_result(check())
+            except BaseException as e:
+                future.set_exception(e)
+        return future.result()
+
+
+def load_answers(path: Optional[Path]) -> Dict[str, Dict[str, str]]:
+    if path is None:
+        return {}
+    text = Path(path).read_text(encoding="utf-8")
+    data = json.loads(text) if Path(path).suffix == ".json" else yaml.safe_load(text)
+    return {str(skill): {str(k): str(v) for k, v in (values or {}).items()} for skill, values in (data or {}).items()}
+
+
+def answers_for(skill: str, answers: Mapping[str, Mapping[str, str]], environ: Mapping[str, str] = os.environ) -> Dict[str, str]:
+    """File "*" < file [skill] < ADAOS_PREP_<KEY> < ADAOS_PREP_<SKILL>_<KEY>."""
+    merged = dict(answers.get("*", {}))
+    merged.update(answers.get(skill, {}))
+    skill_prefix = f"{ENV_PREFIX}{skill.upper()}_"
+    own = {}
+    for name, value in environ.items():
+        if name.startswith(skill_prefix):
+            own[name[len(skill_prefix) :].lower()] = value
+        elif name.startswith(ENV_PREFIX):
+            merged[name[len(ENV_PREFIX) :].lower()] = value
+    merged.update(own)
+    return merged
+
+
+def load_prepare(skill_dir: Path) -> types.ModuleType:
+    # prepare.py imports the vendored runner relatively (from .prep_runner import ...)
+    return import_from_folder(skill_dir / PREPARE_FILE.parent, f"adaos_prep_{skill_dir.name}", PREPARE_FILE.stem)
+
+
+def prep_skill(skill_dir: Path, answers: Dict[str, str], session, probes: SharedProbes, force: bool) -> Dict:
+    started = time.perf_counter()
+    entry = {"skill": skill_dir.name}
+    if not (skill_dir / PREPARE_FILE).exists():
+        entry["status"] = "skipped"
+    else:
+        try:
+            result = load_prepare(skill_dir).run_prep(skill_dir, force=force, answers=answers, session=session, probes=probes)
+        except Exception as e:
+            result = {"status": "failed", "reason": f"{type(e).__name__}: {e}", "tested_hypotheses": []}
+        entry["status"] = result.get("status")
+        if result.get("reason"):
+            entry["reason"] = result["reason"]
+        tested = result.get("tested_hypotheses") or []
+        entry["hypotheses"] = [{k: h.get(k) for k in ("name", "result", "critical", "cached", "skipped", "timed_out") if h.get(k) is not None} for h in tested]
+    entry["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return entry
+
+
+def run_fleet(
+    root: Path = REPO_ROOT,
+    names: Optional[List[str]] = None,
+    answers: Optional[Dict[str, Dict[str, str]]] = None,
+    force: bool = False,
+    workers: Optional[int] = None,
+) -> Dict:
+    names = names if names is not None else listed_skills(root)
+    dirs = skill_dirs(root, names)
+    # a listed skill that is not on disk would otherwise be dropped without a word
+    found = {d.name for d in dirs}
+    missing = {name: {"skill": name, "status": "failed", "reason": f"{name}/{SKILL_MANIFEST} not found", "duration_ms": 0.0} for name in names if name not in found}
+    probes = SharedProbes()
+    session = requests.Session()
+    workers = workers or max(1, len(dirs))
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers * 4)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prep-fleet") as pool:
+            futures = [pool.submit(prep_skill, d, answers_for(d.name, answers or {}), session, probes, force) for d in dirs]
+            prepared = {d.name: f.result() for d, f in zip(dirs, futures)}
+    finally:
+        session.close()
+    skills = [prepared.get(name) or missing[name] for name in names]
+    return {
+        "status": "failed" if any(s["status"] == "failed" for s in skills) else "ok",
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        "shared_probes": {"runs": probes.runs, "reused": probes.hits},
+        "skills": skills,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Prepare all skills from skills.yaml in one batch")
+    parser.add_argument("--root", type=Path, default=REPO_ROOT)
+    parser.add_argument("--skills", nargs="*", help="skill names instead of skills.yaml")
+    parser.add_argument("--answers", type=Path, help="YAML/JSON file with resources per skill")
+    parser.add_argument("--force", action="store_true", help="ignore previous prep results")
+    parser.add_argument("--workers", type=int, help="skills prepared concurrently (default: all)")
+    parser.add_argument("--report", type=Path, default=REPO_ROOT / "build" / "prep_report.json")
+    args = parser.parse_args(argv)
+
+    report = run_fleet(args.root, args.skills, load_answers(args.answers), args.force, args.workers)
+    args.report.parent.mkdir(parents=True, exist_ok=True)
+    tmp = args.report.with_name(args.report.name + ".tmp")
+    tmp.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(args.report)
+
+    for entry in report["skills"]:
+        reason = f"  {entry['reason']}" if entry.get("reason") else ""
+        print(f"{entry['skill']:<24} {entry['status']:<8} {entry['duration_ms']:>9.1f} ms{reason}")
+    shared = report["shared_probes"]
+    print(f"{len(report['skills'])} skills in {report['duration_ms']:.1f} ms, shared probes: {shared['runs']} run, {shared['reused']} reused -> {args.report}")
+    return 1 if report["status"] == "failed" else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+"""
+Executor for blocking skill handlers.
+
+Sync entry points (``handle(intent, entities)``, sync ``@tool``/``@subscribe``
+functions) do network and disk I/O; called on the bus loop they stall every
+other skill. ``SkillExecutor`` runs them in a bounded worker pool while
+``async`` subscribers keep running on the loop::
+
+    executor = SkillExecutor(LazyRegistry.from_root(), workers=8, limits={"weather_skill2": 2})
+    await executor.handle("weather_skill2", "get_weather", {"city": "Berlin"})
+    await executor.dispatch("nlp.intent.weather.get", evt)
+    executor.metrics()["skills"]["weather_skill2"]   # waiting, running, max_waiting, latencies
+
+Each skill may hold at most ``limits[skill]`` (default ``DEFAULT_LIMIT``) pool
+workers; further calls wait on the loop, not in the pool queue, so a slow
+skill cannot take every worker from fast ones. ``mode="process"`` uses a
+process pool (arguments and results must then be picklable); a worker imports
+a skill's handler on the first call it gets for that skill and never runs its
+``start()`` hook. Stateful skills, those defining ``start()``/``shutdown()``
+(scheduler threads, journals, sessions), keep running in threads of this
+process even in process mode, so their state exists once.
+
+    python -m tools.skill_executor --bench
+"""
+import argparse
+import asyncio
+import functools
+import statistics
+import sys
+import tempfile
+import time
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from tools.lazy_skills import HANDLER_FILE, LazyRegistry, LazySkill
+
+DEFAULT_WORKERS = 8
+DEFAULT_LIMIT = 2
+MODES = ("thread", "process")
+
+
+class SkillStats:
+    __slots__ = ("waiting", "running", "max_waiting", "completed", "failed", "on_loop", "wait_s", "run_s")
+
+    def __init__(self):
+        self.waiting = self.running = self.max_waiting = 0
+        self.completed = self.failed = self.on_loop = 0
+        self.wait_s = self.run_s = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        done = self.completed + self.failed
+        return {
+            "waiting": self.waiting,
+            "running": self.running,
+            "max_waiting": self.max_waiting,
+            "completed": self.completed,
+            "failed": self.failed,
+            "on_loop": self.on_loop,
+            "avg_wait_ms": round(self.wait_s / done * 1000, 2) if done else 0.0,
+            "avg_run_ms": round(self.run_s / done * 1000, 2) if done else 0.0,
+        }
+
+
+def _call(skill: LazySkill, kind: str, key: str, args: Tuple, kwargs: Dict):
+    if kind == "handle":
+        return skill.handle(*args)
+    if kind == "tool":
+        return skill.call_tool(key, *args, **kwargs)
+    return skill.dispatch(key, *args)
+
+
+# --- process workers: a skill is imported on its first call in that worker ---
+
+_worker_skills: Dict[str, LazySkill] = {}
+
+
+def _init_worker(skill_dirs: List[str]) -> None:
+    for path in skill_dirs:
+        skill = LazySkill(Path(path), {}, autostart=False)
+        _worker_skills[skill.name] = skill
+
+
+def _invoke(name: str, kind: str, key: str, args: Tuple, kwargs: Dict):
+    return _call(_worker_skills[name], kind, key, args, kwargs)
+
+
+def _noop() -> None:
+    return None
+
+
+class SkillExecutor:
+    def __init__(
+        self,
+        registry: LazyRegistry,
+        workers: int = DEFAULT_WORKERS,
+        mode: str = "thread",
+        limits: Optional[Dict[str, int]] = None,
+        default_limit: int = DEFAULT_LIMIT,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        self.registry = registry
+        self.workers = workers
+        self.mode = mode
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self._stats: Dict[str, SkillStats] = {}
+        # a semaphore belongs to the loop it was first awaited on: one set per running loop
+        self._slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+        self._threads: Optional[Executor] = None  # process mode: pool for stateful skills
+        if mode == "process":
+            dirs = [
+                str(s.skill_dir)
+                for s in registry.skills.values()
+                if (s.skill_dir / HANDLER_FILE).exists() and not s.stateful
+            ]
+            self._pool: Executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(dirs,))
+            self._threads = ThreadPoolExecutor(workers, thread_name_prefix="skill-worker")
+        else:
+            self._pool = ThreadPoolExecutor(workers, thread_name_prefix="skill-worker")
+
+    def _in_process(self, skill: LazySkill) -> bool:
+        return self.mode == "process" and not skill.stateful
+
+    def prewarm(self) -> None:
+        """
+        Thread mode: imports handlers in this process. Process mode: spawns the
+        workers (each imports a handler on its first call for that skill) and
+        imports the stateful skills that run here.
+        """
+        if self.mode == "process":
+            for future in [self._pool.submit(_noop) for _ in range(self.workers)]:
+                future.result()
+            self.registry.prewarm([n for n, s in self.registry.skills.items() if s.stateful], background=False)
+        else:
+            self.registry.prewarm(background=False)
+
+    def close(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+        if self._threads is not None:
+            self._threads.shutdown(wait=wait)
+
+    def _stat(self, skill: str) -> SkillStats:
+        stats = self._stats.get(skill)
+        if stats is None:
+            stats = self._stats[skill] = SkillStats()
+        return stats
+
+    def _slot(self, skill: str) -> asyncio.Semaphore:
+        slots = self._slots.setdefault(asyncio.get_running_loop(), {})
+        slot = slots.get(skill)
+        if slot is None:
+            slot = slots[skill] = asyncio.Semaphore(min(self.limits.get(skill, self.default_limit), self.workers))
+        return slot
+
+    async def _submit(self, name: str, kind: str, key: str, args: Tuple = (), kwargs: Optional[Dict] = None):
+        skill = self.registry.skills[name]
+        kwargs = kwargs or {}
+        stats = self._stat(name)
+        if skill.is_async(kind, key):
+            stats.on_loop += 1
+            return await _call(skill, kind, key, args, kwargs)
+
+        if self._in_process(skill):
+            pool = self._pool
+            fn = functools.partial(_invoke, name, kind, key, args, kwargs)
+        else:
+            pool = self._threads or self._pool
+            fn = functools.partial(_call, skill, kind, key, args, kwargs)
+        queued = time.perf_counter()
+        stats.waiting += 1
+        stats.max_waiting = max(stats.max_waiting, stats.waiting)
+        async with self._slot(name):
+            started = time.perf_counter()
+            stats.waiting -= 1
+            stats.running += 1
+            stats.wait_s += started - queued
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(pool, fn)
+            except BaseException:
+                stats.failed += 1
+                raise
+            finally:
+                stats.running -= 1
+                stats.run_s += time.perf_counter() - started
+        stats.completed += 1
+        return result
+
+    async def handle(self, skill: str, intent: str, entities: Dict):
+        return await self._submit(skill, "handle", "handle", (intent, entities))
+
+    async def call_tool(self, name: str, *args, **kwargs):
+        owner = self.registry.tool_owner(name)
+        if owner is None:
+            raise KeyError(f"unknown tool: {name}")
+        return await self._submit(owner, "tool", name, args, kwargs)
+
+    async def dispatch(self, topic: str, evt) -> List:
+        """Runs all subscribers concurrently; a subscriber's exception is returned in its place."""
+        calls = [self._submit(skill.name, "subscribe", topic, (evt,)) for skill in self.registry.subscribers(topic)]
+        return list(await asyncio.gather(*calls, return_exceptions=True))
+
+    def metrics(self) -> Dict[str, Any]:
+        skills = {name: stats.snapshot() for name, stats in sorted(self._stats.items())}
+        busy = sum(s.running for s in self._stats.values())
+        return {
+            "pool": {
+                "mode": self.mode,
+                "workers": self.workers,
+                "busy": min(busy, self.workers),
+                "queued": max(0, busy - self.workers),
+                "waiting": sum(s.waiting for s in self._stats.values()),
+            },
+            "skills": skills,
+        }
+
+
+# ---------------------------
+# benchmark
+# ---------------------------
+
+_BENCH_HANDLER = """
+import time
+
+def handle(intent, entities):
+    time.sleep({delay})
+    return intent
+"""
+
+
+def _bench_registry(root: Path) -> LazyRegistry:
+    skills = []
+    for name, delay in (("slow_skill", 0.2), ("fast_skill", 0.002)):
+        (root / name / "handlers").mkdir(parents=True)
+        (root / name / HANDLER_FILE).write_text(_BENCH_HANDLER.format(delay=delay), encoding="utf-8")
+        skills.append(LazySkill(root / name, {}))
+    return LazyRegistry(skills)
+
+
+async def _scenario(call, slow: int = 20, fast: int = 50) -> List[float]:
+    """Floods the slow skill, then measures latency of fast-skill calls issued meanwhile."""
+
+    async def timed_fast(i):
+        due = origin + i * 0.01  # latency counts from when the event was due, so loop stalls show up
+        await asyncio.sleep(i * 0.01)
+        await call("fast_skill", "ping", {})
+        return (time.perf_counter() - due) * 1000
+
+    origin = time.perf_counter()
+    slow_calls = [call("slow_skill", "load", {}) for _ in range(slow)]
+    results = await asyncio.gather(*slow_calls, *[timed_fast(i) for i in range(fast)])
+    return results[slow:]
+
+
+def bench(workers: int = DEFAULT_WORKERS, mode: str = "thread") -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = _bench_registry(Path(tmp))
+        registry.prewarm(background=False)
+
+        async def inline(skill, intent, entities):
+            return registry.skills[skill].handle(intent, entities)
+
+        rows = [("inline on loop", inline, None)]
+        for label, limit in (("pool, no limit", workers), ("pool, limit 2", 2)):
+            rows.append((label, None, SkillExecutor(registry, workers, mode, default_limit=limit)))
+
+        print(f"{'variant':<16} {'fast p50 ms':>12} {'fast p95 ms':>12} {'slow max waiting':>17}")
+        for label, call, executor in rows:
+            if executor is not None:
+                executor.prewarm()
+                call = executor.handle
+            latencies = asyncio.run(_scenario(call))
+            quantiles = statistics.quantiles(latencies, n=20)
+            waiting = executor.metrics()["skills"]["slow_skill"]["max_waiting"] if executor is not None else "-"
+            print(f"{label:<16} {statistics.median(latencies):>12.1f} {quantiles[18]:>12.1f} {waiting:>17}")
+            if executor is not None:
+                executor.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run blocking skill handlers in a bounded worker pool")
+    parser.add_argument("--bench", action="store_true", help="fast-skill latency while a slow skill is flooded")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--mode", choices=MODES, default="thread")
+    args = parser.parse_args(argv)
+    if args.bench:
+        bench(args.workers, args.mode)
+        return 0
+    executor = SkillExecutor(LazyRegistry.from_root(), args.workers, args.mode)
+    try:
+        executor.prewarm()
+        for name, skill in sorted(executor.registry.skills.items()):
+            print(f"{name:<24} limit={executor.limits.get(name, executor.default_limit)} topics={skill.topics}")
+    finally:
+        executor.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
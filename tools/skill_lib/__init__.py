@@ -0,0 +1,9 @@
+"""
+Stdlib-only modules that skills ship inside their own ``handlers/`` or ``prep/``
+folder.
+
+A skill is installed on its own, so its handlers cannot import ``tools``.
+Each module here is the single source; ``tools/vendor.py`` copies it into
+the skills that use it, where it is imported relatively
+(``from .time_slot import parse_time``).
+"""
@@ -0,0 +1,27 @@
+"""Discovery of skill folders in the repository."""
+from pathlib import Path
+from typing import List, Optional
+
+import yaml
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_MANIFEST = "skill.yaml"
+
+
+def listed_skills(root: Path = REPO_ROOT) -> List[str]:
+    """Names from skills.yaml (the set provisioned on a node)."""
+    path = root / "skills.yaml"
+    if not path.exists():
+        return []
+    data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    return [str(name) for name in data.get("skills") or []]
+
+
+def skill_dirs(root: Path = REPO_ROOT, names: Optional[List[str]] = None) -> List[Path]:
+    """
+    Skill folders under root: every direct child with a skill.yaml,
+    or only the given names (in that order) when names is set.
+    """
+    if names is not None:
+        return [root / name for name in names if (root / name / SKILL_MANIFEST).exists()]
+    return sorted(p for p in root.iterdir() if p.is_dir() and (p / SKILL_MANIFEST).exists())
@@ -0,0 +1,153 @@
+"""
+Slot extractors for ``{time}`` and ``{city}``.
+
+The grammars live in ``tools/skill_lib`` (``time_slot``, ``city_slot``) and
+are vendored into the skills that need them; this module is the host side:
+a registry for the intent matcher, batch extraction and a benchmark.
+Grammars are compiled once at import; results are memoized per normalized
+phrase (LRU), so repeated utterances cost a dict lookup::
+
+    parse_time("в полседьмого")      # TimeValue(hour=6, minute=30, seconds=None)
+    parse_time("через 20 минут")     # TimeValue(hour=None, minute=None, seconds=1200)
+    extract_city("в Нижнем Новгороде")   # CityValue(id=520555, name='Nizhniy Novgorod', country='RU')
+    extract_city("Paris, Texas")         # CityValue(id=None, name='Paris, Texas', country=None)
+
+A slot resolves to an id when it matches a name, alias or case form exactly
+(optionally with a country code after a comma), or when a name of at least
+``FUZZY_MIN_LEN`` letters is one edit away from exactly one city; anything
+else is passed through as typed, so the weather API resolves it by name.
+
+``EXTRACTORS`` plugs into the intent matcher::
+
+    matcher.match("разбуди меня в 7 утра", extractors=EXTRACTORS).values
+    # {'time': TimeValue(hour=7, minute=0, seconds=None)}
+
+    python -m tools.slots time "без четверти восемь вечера"
+    python -m tools.slots --bench
+"""
+import argparse
+import random
+import sys
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+# re-exported: tools.slots stays the host-side entry point for both slots
+from tools.skill_lib.city_slot import CityIndex, CityValue, city_forms, normalize_city
+from tools.skill_lib.time_slot import MEMO_SIZE, TimeValue, parse_time
+from tools.skill_lib.time_slot import clear_memo as clear_time_memo
+
+# not tools.skills.REPO_ROOT: this module must not need yaml
+CITIES_FILE = Path(__file__).resolve().parents[1] / "weather_skill" / "data" / "cities.json"
+
+
+class CityExtractor:
+    """CityIndex lookup with a memo; a slot not in the city list comes back as CityValue(None, text)."""
+
+    def __init__(self, cities_file: Path = CITIES_FILE, memo_size: int = MEMO_SIZE):
+        self._index = CityIndex.from_file(cities_file)
+        self._memo = lru_cache(maxsize=memo_size)(self._extract)
+
+    def __call__(self, text: str) -> Optional[CityValue]:
+        text = " ".join(text.split()) if text else ""
+        return self._memo(text) if text else None
+
+    def _extract(self, text: str) -> CityValue:
+        return self._index.lookup(text) or CityValue(None, text)
+
+
+_city_extractor: Optional[CityExtractor] = None
+
+
+def extract_city(text: str) -> Optional[CityValue]:
+    global _city_extractor
+    if _city_extractor is None:
+        _city_extractor = CityExtractor()
+    return _city_extractor(text)
+
+
+def clear_memo() -> None:
+    clear_time_memo()
+    if _city_extractor is not None:
+        _city_extractor._memo.cache_clear()
+
+
+# ---------------------------
+# registry and batch
+# ---------------------------
+
+EXTRACTORS: Dict[str, Callable[[str], object]] = {
+    "time": parse_time,
+    "city": extract_city,
+}
+
+
+def extract_many(slot: str, texts: Iterable[str]) -> List[object]:
+    """Разбор пачки фраз: каждая уникальная фраза разбирается один раз."""
+    extractor = EXTRACTORS[slot]
+    seen: Dict[str, object] = {}
+    out = []
+    for text in texts:
+        if text not in seen:
+            seen[text] = extractor(text)
+        out.append(seen[text])
+    return out
+
+
+# ---------------------------
+# benchmark
+# ---------------------------
+
+_BENCH_TIMES = [
+    "7:30", "в 7 утра", "через 20 минут", "в полседьмого", "без четверти восемь вечера",
+    "в 11 ночи", "через полтора часа", "в двадцать три тридцать", "к 9", "в полдень",
+]
+_BENCH_CITIES = [
+    "Москва", "в Москве", "в Питере", "Нижнем Новгороде", "Berlin", "в Санкт-Петербурге",
+    "London, GB", "Новосибирск", "в Екатеринбурге", "в городе которого нет",
+]
+
+
+def bench(count: int = 100_000) -> None:
+    rnd = random.Random(1)
+    for slot, phrases in (("time", _BENCH_TIMES), ("city", _BENCH_CITIES)):
+        extractor = EXTRACTORS[slot]
+        extractor(phrases[0])  # сборка грамматики не входит в замер
+
+        # холодный разбор: мемо сбрасывается перед каждой фразой
+        cold = [rnd.choice(phrases) for _ in range(count // 20)]
+        started = time.perf_counter()
+        for text in cold:
+            clear_memo()
+            extractor(text)
+        cold_us = (time.perf_counter() - started) / len(cold) * 1e6
+
+        warm = [rnd.choice(phrases) for _ in range(count)]
+        started = time.perf_counter()
+        extract_many(slot, warm)
+        batch_rate = count / (time.perf_counter() - started)
+        started = time.perf_counter()
+        for text in warm:
+            extractor(text)
+        memo_rate = count / (time.perf_counter() - started)
+        print(f"{slot:<5} cold {cold_us:7.1f} us/phrase   memo {memo_rate:>10,.0f}/s   batch {batch_rate:>10,.0f}/s")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Slot extractors for {time} and {city}")
+    parser.add_argument("slot", nargs="?", choices=sorted(EXTRACTORS))
+    parser.add_argument("text", nargs="*")
+    parser.add_argument("--bench", action="store_true", help="extraction throughput")
+    args = parser.parse_args(argv)
+
+    if args.bench or not args.slot:
+        bench()
+        return 0
+    value = EXTRACTORS[args.slot](" ".join(args.text))
+    print(value)
+    return 0 if value is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
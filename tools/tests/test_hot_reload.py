@@ -0,0 +1,127 @@
+import sys
+import textwrap
+import threading
+import time
+import types
+
+import pytest
+
+from tools.hot_reload import HotReloader, _Gate
+
+MAIN = textwrap.dedent(
+    """
+    import hot_reload_probe as probe
+
+    from .version import VERSION
+
+
+    def subscribe(topic):
+        return lambda f: f
+
+
+    def tool(name):
+        return lambda f: f
+
+
+    @subscribe("demo.ping")
+    def on_ping(evt):
+        probe.calls.append((VERSION, evt))
+        if evt == "slow":
+            probe.entered.set()
+            probe.release.wait(5)
+        return VERSION
+
+
+    @tool("version")
+    def version():
+        return VERSION
+
+
+    def shutdown():
+        probe.calls.append((VERSION, "shutdown"))
+    """
+)
+
+MANIFEST = """
+name: demo
+events:
+  subscribe: ["demo.ping"]
+tools:
+  - name: version
+"""
+
+
+@pytest.fixture
+def probe(monkeypatch):
+    module = types.ModuleType("hot_reload_probe")
+    module.calls, module.entered, module.release = [], threading.Event(), threading.Event()
+    monkeypatch.setitem(sys.modules, "hot_reload_probe", module)
+    yield module
+    module.release.set()
+
+
+@pytest.fixture
+def host(tmp_path, probe):
+    skill = tmp_path / "root" / "demo"
+    (skill / "handlers").mkdir(parents=True)
+    (skill / "skill.yaml").write_text(MANIFEST, encoding="utf-8")
+    (skill / "handlers" / "main.py").write_text(MAIN, encoding="utf-8")
+    (skill / "handlers" / "version.py").write_text("VERSION = 1\n", encoding="utf-8")
+    host = HotReloader.from_root(tmp_path / "root", index_path=tmp_path / "index.pkl", drain_timeout=5)
+    yield host
+    host.registry.shutdown()
+    for name in [n for n in sys.modules if n.startswith("adaos_skill_demo")]:
+        del sys.modules[name]
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def test_reload_drains_defers_and_replays_on_the_new_version(host, probe, tmp_path):
+    assert host.dispatch("demo.ping", "first") == [1]
+
+    slow = threading.Thread(target=host.dispatch, args=("demo.ping", "slow"))
+    slow.start()
+    assert probe.entered.wait(5)
+
+    # a helper module changed: it must be imported again, not taken from sys.modules
+    (tmp_path / "root" / "demo" / "handlers" / "version.py").write_text("VERSION = 2\n", encoding="utf-8")
+    reports = []
+    reload = threading.Thread(target=lambda: reports.append(host.reload("demo")))
+    reload.start()
+    wait_until(lambda: host._gate("demo").draining)
+
+    assert host.dispatch("demo.ping", "during") == []  # deferred, not run on either version yet
+    assert (2, "during") not in probe.calls and (1, "during") not in probe.calls
+
+    probe.release.set()
+    slow.join(5)
+    reload.join(5)
+    report = reports[0]
+    assert report.drained and report.replayed == 1 and report.error is None
+    assert probe.calls == [(1, "first"), (1, "slow"), (1, "shutdown"), (2, "during")]
+    assert host.call_tool("version") == 2
+    assert host.dispatch("demo.ping", "after") == [2]
+
+
+def test_broken_edit_keeps_the_running_version(host, tmp_path):
+    assert host.call_tool("version") == 1
+    (tmp_path / "root" / "demo" / "handlers" / "main.py").write_text("def broken(:\n", encoding="utf-8")
+
+    report = host.reload("demo")
+    assert report.error.startswith("SyntaxError")
+    assert host.call_tool("version") == 1
+    assert sys.modules["adaos_skill_demo.version"].VERSION == 1  # the old version's modules are put back
+
+
+def test_tool_call_times_out_while_a_reload_is_draining():
+    gate = _Gate()
+    gate.active = 1
+    assert gate.drain(0.01) is False
+    with pytest.raises(TimeoutError):
+        gate.enter(0.01)
+    assert gate.active == 1
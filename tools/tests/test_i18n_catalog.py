@@ -0,0 +1,87 @@
+import json
+import os
+
+import pytest
+
+from tools import i18n_catalog
+from tools.i18n_catalog import Catalog, compile_template, fallback_chain, load_or_build, render
+
+
+class Point:
+    x = 3
+
+
+@pytest.mark.parametrize(
+    "text, kwargs, expected",
+    [
+        ("plain text", {}, "plain text"),
+        ("{city}: {temp}°", {"city": "Moscow", "temp": 3}, "Moscow: 3°"),
+        ("{temp:.1f}", {"temp": 2.345}, "2.3"),
+        ("{temp:>5}|", {"temp": 7}, "    7|"),
+        ("{city!r}", {"city": "Oslo"}, "'Oslo'"),
+        ("{items[0]} and {p.x}", {"items": ["a"], "p": Point()}, "a and 3"),
+        ("{{literal}} {n}", {"n": 1}, "{literal} 1"),
+        ("{n:{width}}", {"n": 1, "width": 3}, "  1"),  # nested spec falls back to str.format
+        ("{city} {missing}", {"city": "Moscow"}, "{city} {missing}"),  # like before: the raw text
+        ("{temp:d}", {"temp": "warm"}, "{temp:d}"),
+        ("{unclosed", {}, "{unclosed"),
+    ],
+)
+def test_render_matches_format(text, kwargs, expected):
+    assert render(compile_template(text), kwargs) == expected
+
+
+def test_fallback_chain():
+    assert fallback_chain("ru_RU") == ["ru-RU", "ru", "en"]
+    assert fallback_chain("en") == ["en"]
+
+
+@pytest.fixture
+def root(tmp_path):
+    skill = tmp_path / "root" / "demo"
+    (skill / "i18n").mkdir(parents=True)
+    (skill / "skill.yaml").write_text("name: demo\n", encoding="utf-8")
+    (skill / "i18n" / "en.json").write_text(json.dumps({"hello": "Hello, {name}", "bye": "Bye"}), encoding="utf-8")
+    (skill / "i18n" / "ru.json").write_text(json.dumps({"hello": "Привет, {name}"}), encoding="utf-8")
+    (skill / "handlers").mkdir()
+    (skill / "handlers" / "main.py").write_text("def lang_res():\n    return {'only.code': 'from code', 'bye': 'Later'}\n", encoding="utf-8")
+    return tmp_path / "root"
+
+
+def test_translator_uses_fallbacks_and_reports_conflicts(root):
+    catalog = i18n_catalog.build_catalog(root)
+    ru = catalog.translator("demo", "ru-RU")
+    assert ru("hello", name="Аня") == "Привет, Аня"
+    assert ru("bye") == "Bye"  # i18n/en.json wins over lang_res()
+    assert ru("only.code") == "from code"
+    assert ru("unknown.key") == "unknown.key"
+    assert catalog.conflicts == {"demo": [("en", "bye", "Bye", "Later")]}
+
+
+def test_snapshot_is_rebuilt_when_a_source_changes(root, tmp_path, monkeypatch):
+    snapshot = tmp_path / "catalog.pickle"
+    builds = []
+    real = i18n_catalog.build_catalog
+    monkeypatch.setattr(i18n_catalog, "build_catalog", lambda r: builds.append(r) or real(r))
+
+    assert load_or_build(snapshot, root).translator("demo", "ru")("hello", name="A") == "Привет, A"
+    assert load_or_build(snapshot, root).translator("demo", "ru")("hello", name="A") == "Привет, A"
+    assert len(builds) == 1
+
+    ru_json = root / "demo" / "i18n" / "ru.json"
+    ru_json.write_text(json.dumps({"hello": "Здравствуйте, {name}"}), encoding="utf-8")
+    st = ru_json.stat()
+    os.utime(ru_json, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert load_or_build(snapshot, root).translator("demo", "ru")("hello", name="A") == "Здравствуйте, A"
+
+    (root / "demo" / "i18n" / "de.json").write_text(json.dumps({"hello": "Hallo, {name}"}), encoding="utf-8")
+    assert load_or_build(snapshot, root).translator("demo", "de")("hello", name="A") == "Hallo, A"
+    assert len(builds) == 3
+    assert Catalog.load(snapshot).stamps == i18n_catalog.source_stamps(root)
+
+
+def test_corrupt_snapshot_is_rebuilt(root, tmp_path):
+    snapshot = tmp_path / "catalog.pickle"
+    snapshot.write_bytes(b"garbage")
+    assert load_or_build(snapshot, root).translator("demo")("bye") == "Bye"
+    assert Catalog.load(snapshot).tables["demo"]["en"]["bye"] == ("Bye", ())
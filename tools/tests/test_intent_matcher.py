@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from tools.intent_matcher import IntentMatcher, tokenize
+from tools.slots import EXTRACTORS, TimeValue
+
+
+@pytest.fixture
+def matcher():
+    matcher = IntentMatcher()
+    matcher.add_skill("alarm", [("set", "поставь будильник на {time}"), ("cancel", "отмени будильник"), ("trigger", "поставь будильник на *")])
+    matcher.add_skill("weather", [("get", "какая погода в {city}"), ("get", "погода")])
+    return matcher
+
+
+def test_tokenize_normalizes_case_yo_and_punctuation():
+    assert tokenize("Поставь будильник на 7:30, пожалуйста!") == ["поставь", "будильник", "на", "7:30", "пожалуйста"]
+    assert tokenize("Ещё.") == ["еще"]
+
+
+def test_match_captures_slots_from_the_raw_text(matcher):
+    match = matcher.match("Поставь будильник на 7:30")
+    assert (match.skill, match.intent, match.slots, match.score) == ("alarm", "set", {"time": "7:30"}, 3)
+    assert matcher.match("какая погода в Нижнем Новгороде").slots == {"city": "Нижнем Новгороде"}
+    assert matcher.match("отмени будильник").intent == "cancel"
+    assert matcher.match("отмени будильник завтра") is None
+    assert matcher.match("") is None
+
+
+def test_more_literal_tokens_win(matcher):
+    matcher.add_skill("news", [("get", "{topic} погода")])
+    assert [(m.skill, m.score) for m in matcher.match_all("погода")] == [("weather", 1)]
+    assert [(m.skill, m.score) for m in matcher.match_all("какая погода в Москве")] == [("weather", 3)]
+    assert [m.skill for m in matcher.match_all("завтра погода")] == ["news"]
+
+
+def test_ties_prefer_named_slots_then_names_regardless_of_insertion_order(matcher):
+    assert [m.intent for m in matcher.match_all("поставь будильник на 7:30")] == ["set", "trigger"]
+
+    other = IntentMatcher()
+    other.add_skill("zeta", [("play", "включи {song}")])
+    other.add_skill("alpha", [("play", "включи {what}"), ("all", "включи *")])
+    assert [(m.skill, m.intent) for m in other.match_all("включи джаз")] == [("alpha", "play"), ("zeta", "play"), ("alpha", "all")]
+
+
+def test_add_skill_replaces_and_remove_skill_drops(matcher):
+    matcher.add_skill("alarm", [("set", "разбуди меня в {time}")])
+    assert matcher.match("поставь будильник на 7:30") is None
+    assert matcher.match("разбуди меня в 7 утра").slots == {"time": "7 утра"}
+
+    matcher.remove_skill("alarm")
+    assert matcher.match("разбуди меня в 7 утра") is None
+    assert matcher.skills() == ["weather"]
+    matcher.remove_skill("never_added")
+
+
+def test_extractors_skip_unparsable_slots(matcher):
+    assert matcher.match("поставь будильник на 7 утра", extractors=EXTRACTORS).values == {"time": TimeValue(7, 0, None)}
+    # «когда-нибудь» is not a time: the named slot is skipped, the wildcard trigger still matches
+    match = matcher.match("поставь будильник на когда-нибудь", extractors=EXTRACTORS)
+    assert (match.intent, match.values) == ("trigger", {"*": "когда-нибудь"})
+
+
+def test_sync_reloads_changed_skills_only(tmp_path):
+    skill = tmp_path / "alarm"
+    (skill / "intents").mkdir(parents=True)
+    (skill / "skill.yaml").write_text("name: alarm\ntriggers:\n  - voice: \"будильник *\"\n", encoding="utf-8")
+    (skill / "intents" / "set.intent").write_text("# comment\nпоставь будильник на {time}\n", encoding="utf-8")
+
+    matcher = IntentMatcher.from_root(tmp_path)
+    assert matcher.match("будильник утром").intent == "trigger"
+    assert matcher.sync(tmp_path) == []
+
+    intent = skill / "intents" / "set.intent"
+    intent.write_text("заведи будильник на {time}\n", encoding="utf-8")
+    st = intent.stat()
+    os.utime(intent, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert matcher.sync(tmp_path) == ["alarm"]
+    assert matcher.match("заведи будильник на 8").intent == "set"
+    assert matcher.match("поставь будильник на 8") is None
+
+    (skill / "skill.yaml").unlink()
+    assert matcher.sync(tmp_path) == ["alarm"] and matcher.skills() == []
@@ -0,0 +1,87 @@
+import sys
+import textwrap
+
+import pytest
+
+from tools.lazy_skills import LazyRegistry, scan_handlers
+from tools.manifest_index import index_file
+
+MAIN = textwrap.dedent(
+    """
+    import lazy_probe_heavy  # stands in for requests/aiohttp: must not load at registry start
+
+    from .helper import answer
+
+    started = []
+
+
+    def subscribe(topic):
+        return lambda f: f
+
+
+    def tool(name):
+        return lambda f: f
+
+
+    def start():
+        started.append(True)
+
+
+    @subscribe("demo.ping")
+    def on_ping(evt):
+        return answer(evt)
+
+
+    @tool("echo")
+    def echo(text):
+        return text
+    """
+)
+
+MANIFEST = """
+name: demo
+events:
+  subscribe: ["demo.ping"]
+tools:
+  - name: echo
+"""
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    root = tmp_path / "root"
+    (root / "demo" / "handlers").mkdir(parents=True)
+    (root / "demo" / "skill.yaml").write_text(MANIFEST, encoding="utf-8")
+    (root / "demo" / "handlers" / "main.py").write_text(MAIN, encoding="utf-8")
+    (root / "demo" / "handlers" / "helper.py").write_text("def answer(evt):\n    return f'pong {evt}'\n", encoding="utf-8")
+    (tmp_path / "lazy_probe_heavy.py").write_text("", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield root
+    for name in [n for n in sys.modules if n.startswith("adaos_skill_demo") or n == "lazy_probe_heavy"]:
+        del sys.modules[name]
+
+
+def test_nothing_is_imported_until_the_first_call(root):
+    registry = LazyRegistry.from_root(root)
+    skill = registry.skills["demo"]
+    assert index_file(root).exists()
+    assert (skill.topics, skill.tools, skill.stateful) == (["demo.ping"], ["echo"], True)
+    assert not skill.loaded
+    assert "lazy_probe_heavy" not in sys.modules and "adaos_skill_demo.main" not in sys.modules
+
+    assert registry.call_tool("echo", "hi") == "hi"
+    assert skill.loaded and skill.started and skill.module.started == [True]
+    assert "lazy_probe_heavy" in sys.modules
+    assert registry.dispatch("demo.ping", 1) == ["pong 1"]
+
+
+def test_prewarm_imports_without_starting(root):
+    registry = LazyRegistry.from_root(root)
+    registry.prewarm(background=False)
+    skill = registry.skills["demo"]
+    assert skill.loaded and not skill.started and skill.module.started == []
+
+
+def test_handlers_are_found_without_importing(root):
+    assert scan_handlers(root / "demo" / "handlers" / "main.py") == {("subscribe", "demo.ping"): "on_ping", ("tool", "echo"): "echo"}
+    assert "lazy_probe_heavy" not in sys.modules
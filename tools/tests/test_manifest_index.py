@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from tools import manifest_index
+from tools.manifest_index import ManifestIndex, build_index, index_file
+
+
+def make_skill(root, name, description="v1"):
+    (root / name).mkdir(parents=True, exist_ok=True)
+    (root / name / "skill.yaml").write_text(f"name: {name}\ndescription: {description}\n", encoding="utf-8")
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "root"
+    for name in ("alpha", "beta"):
+        make_skill(root, name)
+    (root / "skills.yaml").write_text("skills: [alpha]\n", encoding="utf-8")
+    return root
+
+
+def test_index_lives_under_its_root(root):
+    index, changed = build_index(root=root)
+    assert index.path == index_file(root) == root / "build" / "manifest_index.pickle"
+    assert index.path.exists() and changed == ["alpha", "beta"]
+    assert ManifestIndex.open(root=root).listed == ["alpha"]
+
+
+def test_only_changed_skills_are_parsed_again(root, monkeypatch):
+    build_index(root=root)
+    parsed = []
+    real = manifest_index.parse_skill
+    monkeypatch.setattr(manifest_index, "parse_skill", lambda d: parsed.append(d.name) or real(d))
+
+    # touched without a content change: the stamp moves, nothing is re-parsed
+    manifest = root / "alpha" / "skill.yaml"
+    st = manifest.stat()
+    os.utime(manifest, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    index, changed = build_index(root=root)
+    assert changed == [] and parsed == []
+
+    make_skill(root, "beta", "v2")
+    index, changed = build_index(root=root)
+    assert changed == ["beta"] and parsed == ["beta"]
+    assert index.skills["beta"]["manifest"]["description"] == "v2"
+
+    (root / "alpha" / "skill.yaml").unlink()
+    index, changed = build_index(root=root)
+    assert changed == ["alpha"] and sorted(index.skills) == ["beta"]
+
+
+@pytest.mark.parametrize("content", [b"", b"not a pickle", b"\x80\x04K\x01."])  # the last one is pickle.dumps(1)
+def test_corrupt_index_is_rebuilt(root, content):
+    path = index_file(root)
+    path.parent.mkdir(parents=True)
+    path.write_bytes(content)
+
+    index = ManifestIndex.open(root=root)
+    assert index.skills == {}
+    assert index.refresh() == ["alpha", "beta"]
+    index.save()
+    assert sorted(ManifestIndex.open(root=root).skills) == ["alpha", "beta"]
+
+
+def test_index_of_another_root_is_not_used(root, tmp_path):
+    build_index(tmp_path / "index.pickle", root)
+    assert ManifestIndex.open(tmp_path / "index.pickle", tmp_path).skills == {}
@@ -0,0 +1,23 @@
+from tools import prep_fleet
+
+
+def test_listed_skill_missing_on_disk_is_an_error(tmp_path):
+    (tmp_path / "skills.yaml").write_text("skills: [present, gone]\n", encoding="utf-8")
+    (tmp_path / "present").mkdir()
+    (tmp_path / "present" / "skill.yaml").write_text("name: present\n", encoding="utf-8")
+
+    report = prep_fleet.run_fleet(tmp_path)
+    assert report["status"] == "failed"
+    assert [(s["skill"], s["status"]) for s in report["skills"]] == [("present", "skipped"), ("gone", "failed")]
+    assert report["skills"][1]["reason"] == "gone/skill.yaml not found"
+
+    out = tmp_path / "report.json"
+    assert prep_fleet.main(["--root", str(tmp_path), "--report", str(out)]) == 1
+    assert prep_fleet.main(["--root", str(tmp_path), "--skills", "present", "--report", str(out)]) == 0
+
+
+def test_answers_for_layers_file_and_environment():
+    answers = {"*": {"default_city": "Moscow", "api_key": "all"}, "weather_skill": {"api_key": "file"}}
+    environ = {"ADAOS_PREP_DEFAULT_CITY": "Berlin", "ADAOS_PREP_WEATHER_SKILL_API_KEY": "env"}
+    assert prep_fleet.answers_for("weather_skill", answers, environ) == {"default_city": "Berlin", "api_key": "env"}
+    assert prep_fleet.answers_for("other", answers, {}) == {"default_city": "Moscow", "api_key": "all"}
@@ -0,0 +1,158 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+from tools.prep_fleet import SharedProbes
+from tools.skill_lib.prep_runner import Hypothesis, HypothesisRunner, Resource, fingerprint, is_fresh, prepare
+
+
+def run(items, previous=None, provide=(), **kwargs):
+    records = []
+    runner = HypothesisRunner(items, None, records.append, previous, **kwargs).start()
+    for key, value in provide:
+        runner.provide(key, value)
+    return runner.wait(), {r["name"]: r for r in records}
+
+
+def passes(res, session, timeout):
+    return True
+
+
+def fails(res, session, timeout):
+    return False
+
+
+def test_dependencies_run_in_order_and_pass():
+    seen = []
+    items = [
+        Hypothesis("b", lambda res, s, t: seen.append("b") or True, depends_on=("a",), requires=("key",)),
+        Hypothesis("a", lambda res, s, t: seen.append("a") or True),
+    ]
+    failed, records = run(items, provide=[("key", "1")])
+    assert failed is None
+    assert seen == ["a", "b"]
+    assert records["a"]["result"] and records["b"]["result"]
+
+
+def test_timeout_fails_the_hypothesis_without_waiting_for_it():
+    release = threading.Event()
+    items = [Hypothesis("slow", lambda res, s, t: release.wait(5), timeout=0.05)]
+    started = time.monotonic()
+    failed, records = run(items)
+    release.set()
+    assert time.monotonic() - started < 1
+    assert failed.name == "slow"
+    assert records["slow"]["timed_out"] and not records["slow"]["result"]
+
+
+def test_failed_dependency_skips_dependants():
+    items = [
+        Hypothesis("a", fails, critical=False),
+        Hypothesis("b", passes, depends_on=("a",), critical=False),
+        Hypothesis("c", passes),
+    ]
+    failed, records = run(items)
+    assert failed is None
+    assert records["b"] == {"name": "b", "result": False, "critical": False, "skipped": True}
+    assert records["c"]["result"]
+
+
+def test_failed_critical_hypothesis_stops_the_run():
+    items = [Hypothesis("a", fails), Hypothesis("b", passes, requires=("never",))]
+    failed, records = run(items)
+    assert failed.name == "a"
+    assert records["b"]["skipped"]
+
+
+def test_exception_in_check_counts_as_failure():
+    items = [Hypothesis("boom", lambda res, s, t: 1 / 0, critical=False)]
+    failed, records = run(items)
+    assert failed is None and records["boom"]["result"] is False
+
+
+def test_fresh_previous_result_is_reused_until_inputs_or_code_change():
+    calls = []
+    h = Hypothesis("api", lambda res, s, t: calls.append(res["key"]) or True, requires=("key",), ttl=60)
+    _, first = run([h], provide=[("key", "k1")], code="v1")
+    previous = {"api": first["api"]}
+
+    _, again = run([h], previous, provide=[("key", "k1")], code="v1")
+    assert again["api"]["cached"] and calls == ["k1"]
+
+    _, other_key = run([h], previous, provide=[("key", "k2")], code="v1")
+    _, other_code = run([h], previous, provide=[("key", "k1")], code="v2")
+    assert "cached" not in other_key["api"] and "cached" not in other_code["api"]
+    assert calls == ["k1", "k2", "k1"]
+    assert fingerprint(h, {"key": "k1"}, "v1") != fingerprint(h, {"key": "k1", "other": "x"}, "v2")
+
+
+def test_is_fresh_honours_ttl():
+    h = Hypothesis("api", passes, ttl=60)
+    fp = fingerprint(h, {}, "v1")
+    checked_at = datetime(2024, 1, 1, 12, 0)
+    record = {"name": "api", "result": True, "fingerprint": fp, "checked_at": checked_at.isoformat(), "ttl": 60}
+    assert is_fresh(record, fp, checked_at + timedelta(seconds=59))
+    assert not is_fresh(record, fp, checked_at + timedelta(seconds=60))
+    assert not is_fresh(dict(record, ttl=0), fp, checked_at)
+    assert not is_fresh(dict(record, result=False), fp, checked_at)
+    assert not is_fresh(dict(record, checked_at="yesterday"), fp, checked_at)
+
+
+def test_shared_probes_check_each_input_once():
+    probes = SharedProbes()
+    h = Hypothesis("Internet access", passes, requires=("host",))
+    gate = threading.Event()
+    calls = []
+
+    def check():
+        calls.append(1)
+        gate.wait(5)
+        return True
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(probes.run(h, {"host": "a"}, check))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    while probes.runs + probes.hits < 5:
+        time.sleep(0.001)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert results == [True] * 5 and len(calls) == 1
+    assert (probes.runs, probes.hits) == (1, 4)
+
+    assert probes.run(h, {"host": "b"}, check) and len(calls) == 2
+
+
+def test_prepare_collects_answers_and_reuses_them(tmp_path):
+    items = [Hypothesis("api", lambda res, s, t: res["key"] == "good", requires=("key",), ttl=60)]
+    wanted = [Resource("key", "prep.ask_key"), Resource("url", None, "https://example.com")]
+
+    result = prepare(tmp_path, items, wanted, None, answers={"key": "good"})
+    assert result["status"] == "ok"
+    assert result["resources"] == {"key": "good", "url": "https://example.com"}
+
+    again = prepare(tmp_path, items, wanted, None, answers={})
+    assert again["status"] == "ok" and again["tested_hypotheses"][0]["cached"]
+
+    missing = prepare(tmp_path, items, wanted, None, force=True, answers={})
+    assert missing["status"] == "failed" and missing["reason"] == "prep.missing_resource: key"
+
+
+def test_only_a_successful_run_replaces_prep_result(tmp_path):
+    items = [Hypothesis("api", lambda res, s, t: res["key"] == "good", requires=("key",))]
+    wanted = [Resource("key", "prep.ask_key")]
+    result_path = tmp_path / "prep_result.json"
+
+    prepare(tmp_path, items, wanted, None, answers={"key": "good"})
+    ok = result_path.read_text(encoding="utf-8")
+
+    failed = prepare(tmp_path, items, wanted, None, force=True, answers={"key": "rejected"})
+    assert failed["status"] == "failed"
+    assert result_path.read_text(encoding="utf-8") == ok
+    assert json.loads((tmp_path / "prep_result.failed.json").read_text(encoding="utf-8"))["resources"] == {"key": "rejected"}
+    assert not (tmp_path / "prep_result.running.json").exists()
+
+    prepare(tmp_path, items, wanted, None, force=True, answers={"key": "good"})
+    assert not (tmp_path / "prep_result.failed.json").exists()
@@ -0,0 +1,113 @@
+import asyncio
+import os
+import textwrap
+
+import pytest
+
+from tools.lazy_skills import HANDLER_FILE, LazyRegistry, LazySkill
+from tools.skill_executor import SkillExecutor
+
+COUNTING = """
+import threading
+import time
+
+_lock = threading.Lock()
+active = peak = 0
+
+
+def handle(intent, entities):
+    global active, peak
+    with _lock:
+        active += 1
+        peak = max(peak, active)
+    time.sleep(0.05)
+    with _lock:
+        active -= 1
+    return intent
+"""
+
+STATEFUL = """
+import os
+
+
+def start():
+    pass
+
+
+def handle(intent, entities):
+    return os.getpid()
+"""
+
+SUBSCRIBER = """
+def subscribe(topic):
+    return lambda f: f
+
+
+@subscribe("demo.evt")
+{prefix}def on_evt(evt):
+    {body}
+"""
+
+
+def make_skill(root, name, code, manifest=None):
+    (root / name / "handlers").mkdir(parents=True)
+    (root / name / HANDLER_FILE).write_text(textwrap.dedent(code), encoding="utf-8")
+    return LazySkill(root / name, manifest or {})
+
+
+@pytest.fixture
+def executor_for():
+    executors = []
+
+    def make(skills, **kwargs):
+        executors.append(SkillExecutor(LazyRegistry(skills), **kwargs))
+        return executors[-1]
+
+    yield make
+    for executor in executors:
+        executor.close()
+
+
+def test_per_skill_limit_holds_across_event_loops(tmp_path, executor_for):
+    skill = make_skill(tmp_path, "slow", COUNTING)
+    executor = executor_for([skill], workers=8, limits={"slow": 2})
+
+    async def flood():
+        return await asyncio.gather(*[executor.handle("slow", f"i{n}", {}) for n in range(6)])
+
+    # the semaphores of the first loop must not be reused (and fail) on the second
+    assert asyncio.run(flood()) == [f"i{n}" for n in range(6)]
+    assert asyncio.run(flood()) == [f"i{n}" for n in range(6)]
+    assert skill.module.peak == 2
+    stats = executor.metrics()["skills"]["slow"]
+    assert stats["completed"] == 12 and stats["max_waiting"] >= 4
+
+
+def test_process_mode_keeps_stateful_skills_in_this_process(tmp_path, executor_for):
+    stateless = make_skill(tmp_path, "stateless", STATEFUL.replace("def start():\n    pass\n", ""))
+    stateful = make_skill(tmp_path, "stateful", STATEFUL)
+    executor = executor_for([stateless, stateful], workers=2, mode="process")
+
+    async def pids():
+        return await executor.handle("stateful", "pid", {}), await executor.handle("stateless", "pid", {})
+
+    here, worker = asyncio.run(pids())
+    assert here == os.getpid()
+    assert worker != os.getpid()
+    assert stateful.started and not stateless.loaded
+
+
+def test_dispatch_returns_exceptions_in_place(tmp_path, executor_for):
+    manifest = {"events": {"subscribe": ["demo.evt"]}}
+    skills = [
+        make_skill(tmp_path, "ok", SUBSCRIBER.format(prefix="", body="return evt"), manifest),
+        make_skill(tmp_path, "broken", SUBSCRIBER.format(prefix="", body="raise ValueError(evt)"), manifest),
+        make_skill(tmp_path, "on_loop", SUBSCRIBER.format(prefix="async ", body="return evt * 2"), manifest),
+    ]
+    executor = executor_for(skills)
+
+    ok, broken, on_loop = asyncio.run(executor.dispatch("demo.evt", "x"))
+    assert ok == "x" and on_loop == "xx"
+    assert isinstance(broken, ValueError) and broken.args == ("x",)
+    stats = executor.metrics()["skills"]
+    assert stats["broken"]["failed"] == 1 and stats["on_loop"]["on_loop"] == 1
@@ -0,0 +1,96 @@
+from datetime import datetime
+
+import pytest
+
+from tools.slots import CityValue, TimeValue, extract_city, parse_time
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("7:30", (7, 30)),
+        ("в 7 утра", (7, 0)),
+        ("в 11 ночи", (23, 0)),
+        ("в 12 ночи", (0, 0)),
+        ("в 3 дня", (15, 0)),
+        ("в двадцать три тридцать", (23, 30)),
+        ("в полседьмого", (6, 30)),
+        ("в пол-седьмого", (6, 30)),
+        ("четверть восьмого", (7, 15)),
+        ("без четверти восемь вечера", (19, 45)),
+        ("без двадцати пяти семь", (6, 35)),
+        ("без пяти час", (12, 55)),
+        ("без пяти час ночи", (0, 55)),
+        ("без четверти час дня", (12, 45)),
+        ("без пяти 3", (2, 55)),
+        ("без десяти двенадцать", (11, 50)),
+        ("без пяти 20", (19, 55)),
+        ("в пять минут восьмого", (7, 5)),
+        ("двадцать минут восьмого вечера", (19, 20)),
+        ("10 минут первого", (0, 10)),
+        ("в полдень", (12, 0)),
+        ("в полночь", (0, 0)),
+        ("в час", (1, 0)),
+        ("В Семь Утра", (7, 0)),
+    ],
+)
+def test_time_of_day(text, expected):
+    value = parse_time(text)
+    assert (value.hour, value.minute, value.seconds) == (*expected, None)
+
+
+@pytest.mark.parametrize(
+    "text, seconds",
+    [("через 20 минут", 1200), ("через полчаса", 1800), ("через полтора часа", 5400), ("через час", 3600), ("через 1 час 5 минут", 3900)],
+)
+def test_relative(text, seconds):
+    assert parse_time(text) == TimeValue(None, None, seconds)
+
+
+@pytest.mark.parametrize("text", ["", "когда-нибудь", "в восьмого", "в 25:00", "7:75", "через 0 минут", "ноль минут восьмого"])
+def test_rejected(text):
+    assert parse_time(text) is None
+
+
+def test_resolve_next_occurrence():
+    now = datetime(2024, 1, 1, 8, 0)
+    assert TimeValue(7, 5, None).resolve(now) == datetime(2024, 1, 2, 7, 5)
+    assert TimeValue(9, 0, None).resolve(now) == datetime(2024, 1, 1, 9, 0)
+    assert TimeValue(None, None, 90).resolve(now) == datetime(2024, 1, 1, 8, 1, 30)
+
+
+@pytest.mark.parametrize(
+    "text, city_id",
+    [("Москва", 524901), ("в Нижнем Новгороде", 520555), ("в Питере", 498817), ("Санкт-Петербург", 498817), ("London, GB", 2643743)],
+)
+def test_city_exact(text, city_id):
+    assert extract_city(text).id == city_id
+
+
+@pytest.mark.parametrize(
+    "text, city_id",
+    [("Новосибирк", 1496747), ("в Новосибирке", 1496747), ("Мосвка", 524901), ("Berlni", 2950159), ("Новосибирк, RU", 1496747)],
+)
+def test_city_one_typo(text, city_id):
+    assert extract_city(text).id == city_id
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Paris, Texas",
+        "London, Ontario",
+        "погода в Москве",
+        "Москвабад",  # two edits away
+        "Tomsk",  # one edit from Omsk, but too short to guess
+        "Томск",
+        "murich",  # one edit from both Munich and Zurich
+        "Новосибирк, US",
+    ],
+)
+def test_city_passthrough(text):
+    assert extract_city(text) == CityValue(None, text)
+
+
+def test_city_empty():
+    assert extract_city("") is None
@@ -0,0 +1,81 @@
+import pytest
+
+from tools import tool_schemas
+from tools.tool_schemas import SchemaError, compile_schema, compile_tool
+
+WEATHER_MANY = {
+    "type": "object",
+    "required": ["cities"],
+    "additionalProperties": False,
+    "properties": {
+        "cities": {"type": "array", "minItems": 1, "maxItems": 3, "items": {"type": "string", "minLength": 1}},
+        "units": {"enum": ["metric", "imperial"]},
+    },
+}
+
+
+def test_valid_input_passes():
+    validate = compile_schema(WEATHER_MANY)
+    validate({"cities": ["Berlin", "Moscow"], "units": "metric"})
+
+
+@pytest.mark.parametrize(
+    "value, path, message",
+    [
+        ([], "", "expected object"),
+        ({}, "", "missing required property 'cities'"),
+        ({"cities": []}, ".cities", "expected at least 1 items"),
+        ({"cities": ["a", "b", "c", "d"]}, ".cities", "expected at most 3 items"),
+        ({"cities": ["a", 1]}, ".cities[1]", "expected string"),
+        ({"cities": [""]}, ".cities[0]", "shorter than 1"),
+        ({"cities": ["a"], "units": "kelvin"}, ".units", "must be one of"),
+        ({"cities": ["a"], "extra": 1}, "", "unexpected property 'extra'"),
+    ],
+)
+def test_invalid_input_reports_path(value, path, message):
+    with pytest.raises(SchemaError) as err:
+        compile_schema(WEATHER_MANY)(value)
+    assert err.value.path == path
+    assert message in err.value.message
+
+
+@pytest.mark.parametrize(
+    "schema, good, bad",
+    [
+        ({"type": "integer"}, 3, True),
+        ({"type": "number", "minimum": 0, "exclusiveMaximum": 10}, 9.5, 10),
+        ({"type": ["string", "null"]}, None, 1),
+        ({"type": "boolean"}, False, 0),
+        ({"const": "ok"}, "ok", "ko"),
+        ({"type": "string", "pattern": "^[A-Z]{2}$"}, "GB", "gb"),
+        ({"additionalProperties": {"type": "integer"}}, {"a": 1}, {"a": "1"}),
+    ],
+)
+def test_keywords(schema, good, bad):
+    validate = compile_schema(schema)
+    validate(good)
+    with pytest.raises(SchemaError):
+        validate(bad)
+
+
+def test_empty_schema_accepts_anything():
+    compile_schema(None)(object())
+    compile_schema({})([1, "x"])
+
+
+def test_cache_is_shared_by_hash_and_bounded(monkeypatch):
+    monkeypatch.setattr(tool_schemas, "CACHE_SIZE", 4)
+    monkeypatch.setattr(tool_schemas, "_cache", type(tool_schemas._cache)())
+    compile_schema({"type": "string"})
+    compile_schema({"type": "string"})
+    assert len(tool_schemas._cache) == 1
+    for n in range(10):
+        compile_schema({"type": "string", "maxLength": n})
+    assert len(tool_schemas._cache) == 4
+
+
+def test_serialize_output_validates_first():
+    tool = compile_tool("weather_skill", {"name": "t", "output_schema": {"type": "object", "required": ["ok"]}})
+    assert tool.serialize_output({"ok": True, "city": "Москва"}) == '{"ok":true,"city":"Москва"}'
+    with pytest.raises(SchemaError):
+        tool.serialize_output({})
@@ -0,0 +1,71 @@
+from tools.topic_trie import TopicTrie
+
+
+def notify(evt):
+    return "notify"
+
+
+def any_ui(evt):
+    return "any"
+
+
+def test_exact_and_wildcards():
+    trie = TopicTrie()
+    trie.subscribe("nlp.intent.weather.get", "weather", "exact")
+    trie.subscribe("nlp.intent.*.get", "logger", "star")
+    trie.subscribe("nlp.#", "audit", "hash")
+
+    assert trie.resolve("nlp.intent.weather.get") == (("audit", "hash"), ("weather", "exact"), ("logger", "star"))
+    assert trie.resolve("nlp.intent.alarm.get") == (("audit", "hash"), ("logger", "star"))
+    assert trie.resolve("nlp") == (("audit", "hash"),)  # "#" matches zero segments
+    assert trie.resolve("nlp.intent.get") == (("audit", "hash"),)  # "*" needs exactly one
+    assert trie.resolve("ui.notify") == ()
+
+
+def test_overlapping_patterns_keep_each_handler():
+    trie = TopicTrie()
+    trie.subscribe("ui.notify", "ui_skill", notify)
+    trie.subscribe("ui.#", "ui_skill", any_ui)
+
+    assert trie.resolve("ui.notify") == (("ui_skill", any_ui), ("ui_skill", notify))
+    assert sorted(trie.dispatch("ui.notify", {})) == ["any", "notify"]
+    assert trie.resolve("ui.button") == (("ui_skill", any_ui),)
+
+
+def test_same_pattern_twice_adds_second_handler_and_dedupes_repeats():
+    trie = TopicTrie()
+    trie.subscribe("ui.notify", "ui_skill", notify)
+    trie.subscribe("ui.notify", "ui_skill", any_ui)
+    trie.subscribe("ui.notify", "ui_skill", notify)  # repeated (skill, handler): still one call
+
+    assert trie.resolve("ui.notify") == (("ui_skill", notify), ("ui_skill", any_ui))
+
+
+def test_same_handler_via_two_patterns_runs_once():
+    trie = TopicTrie()
+    trie.add_skill("ui_skill", ["ui.notify", "ui.#", "*.notify"], notify)
+
+    assert trie.resolve("ui.notify") == (("ui_skill", notify),)
+
+
+def test_remove_skill_prunes_and_invalidates_cache():
+    trie = TopicTrie()
+    trie.subscribe("ui.notify", "a", notify)
+    trie.subscribe("ui.#", "a", any_ui)
+    trie.subscribe("ui.notify", "b", notify)
+    assert len(trie.resolve("ui.notify")) == 3
+
+    trie.remove_skill("a")
+    assert trie.resolve("ui.notify") == (("b", notify),)
+    assert trie.skills() == ["b"]
+    trie.remove_skill("b")
+    assert trie.resolve("ui.notify") == ()
+    assert trie._root.children == {}
+
+
+def test_add_skill_replaces_previous_subscriptions():
+    trie = TopicTrie()
+    trie.add_skill("a", ["x.y"], notify)
+    trie.add_skill("a", ["x.z"], notify)
+    assert trie.resolve("x.y") == ()
+    assert trie.resolve("x.z") == (("a", notify),)
@@ -0,0 +1,20 @@
+
+from tools import vendor
+
+
+def test_vendored_copies_are_current():
+    assert vendor.stale() == []
+
+
+def test_sync_rewrites_stale_copies(tmp_path):
+    for src, dest in vendor.copies(tmp_path):
+        dest.parent.mkdir(parents=True, exist_ok=True)
+    first = vendor.copies(tmp_path)[0][1]
+    assert len(vendor.sync(tmp_path)) == len(vendor.copies(tmp_path))
+    assert vendor.stale(tmp_path) == []
+
+    first.write_text("# edited in the skill\n", encoding="utf-8")
+    assert vendor.stale(tmp_path) == [first]
+    assert vendor.main(["--root", str(tmp_path), "--check"]) == 1
+    assert vendor.sync(tmp_path) == [first]
+    assert first.read_bytes() == (vendor.LIB_DIR / first.name).read_bytes()
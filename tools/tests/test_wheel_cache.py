@@ -0,0 +1,93 @@
+import os
+import zipfile
+
+import pytest
+
+pytest.importorskip("packaging")
+
+from tools import wheel_cache
+from tools.wheel_cache import WheelCache, satisfied_by
+
+
+def make_wheel(directory, name="pkg-1.0-py3-none-any.whl", members=None):
+    path = directory / name
+    with zipfile.ZipFile(path, "w") as whl:
+        for member, data in (members or {"pkg/__init__.py": "VALUE = 1\n"}).items():
+            whl.writestr(zipfile.ZipInfo(member), data)
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return WheelCache(tmp_path / "cache")
+
+
+def test_unpack_keeps_purelib_and_skips_scripts(cache, tmp_path):
+    members = {
+        "pkg/__init__.py": "VALUE = 1\n",
+        "pkg-1.0.data/purelib/extra/mod.py": "",
+        "pkg-1.0.data/scripts/run": "#!/bin/sh\n",
+    }
+    sha = cache.add_wheel(make_wheel(tmp_path, members=members))
+    target = cache._unpacked(sha)
+    assert sorted(str(p.relative_to(target)) for p in target.rglob("*.py")) == ["extra/mod.py", "pkg/__init__.py"]
+    assert not (target / "run").exists()
+
+
+@pytest.mark.parametrize("member", ["../evil.py", "pkg/../../evil.py", "/tmp/adaos-evil.py", "pkg-1.0.data/purelib/../../../evil.py"])
+def test_unpack_rejects_members_outside_the_target(cache, tmp_path, member):
+    sha = cache.add_wheel(make_wheel(tmp_path, members={"pkg/__init__.py": "", member: "boom"}))
+    with pytest.raises(ValueError, match="escapes"):
+        cache._unpacked(sha)
+    assert list((cache.path / "unpacked").iterdir()) == []
+    assert not (tmp_path / "evil.py").exists() and not os.path.exists("/tmp/adaos-evil.py")
+
+
+def test_same_content_is_stored_once(cache, tmp_path):
+    first = make_wheel(tmp_path)
+    (tmp_path / "copy").mkdir()
+    second = tmp_path / "copy" / first.name
+    second.write_bytes(first.read_bytes())
+    renamed = tmp_path / "pkg_alias-1.0-py3-none-any.whl"
+    renamed.write_bytes(first.read_bytes())
+
+    shas = {cache.add_wheel(first), cache.add_wheel(second), cache.add_wheel(renamed)}
+    assert len(shas) == 1
+    assert [p.name for p in (cache.path / "blobs").iterdir()] == list(shas)
+    assert sorted(p.name for p in (cache.path / "wheels").iterdir()) == [first.name, renamed.name]
+
+
+def test_wheels_are_rehashed_only_when_they_change(cache, tmp_path, monkeypatch):
+    wheelhouse = tmp_path / "wheelhouse"
+    wheelhouse.mkdir()
+    wheel = make_wheel(wheelhouse)
+    hashed = []
+    real = wheel_cache._sha256
+    monkeypatch.setattr(wheel_cache, "_sha256", lambda path: hashed.append(path.name) or real(path))
+
+    cache.import_dir(wheelhouse)
+    cache.import_dir(wheelhouse)
+    WheelCache(cache.path).import_dir(wheelhouse)  # the hashes survive in hashes.json
+    assert hashed == [wheel.name]
+
+    make_wheel(wheelhouse, members={"pkg/__init__.py": "VALUE = 2\n"})
+    stat = wheel.stat()
+    os.utime(wheel, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    cache.import_dir(wheelhouse)
+    assert hashed == [wheel.name, wheel.name]
+    assert len(list((cache.path / "blobs").iterdir())) == 2
+
+
+@pytest.mark.parametrize(
+    "requirements, expected",
+    [
+        (["requests>=2"], True),
+        (["Requests==2.31.0"], True),
+        (["requests<2"], False),
+        (["requests[socks]>=2"], False),  # the pins do not say whether socks' dependencies are in
+        (["urllib3"], False),
+        (['urllib3; python_version < "3"'], True),
+    ],
+)
+def test_satisfied_by(requirements, expected):
+    assert satisfied_by(requirements, {"requests": "2.31.0"}) is expected
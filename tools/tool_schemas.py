@@ -0,0 +1,369 @@
+"""
+Precompiled validators and serializers for ``@tool`` schemas.
+
+Each tool's ``input_schema``/``output_schema`` from ``skill.yaml`` is compiled
+once into a tree of specialized closures (one per schema node, with constants
+such as required keys and bounds bound at compile time), so a call runs plain
+type checks and comparisons instead of interpreting the schema. Compiled
+validators are kept in a bounded LRU keyed by schema hash (identical schemas
+share one validator) and recompiled only when a skill's manifest changes::
+
+    tools = ToolSchemas.from_root()
+    tool = tools.get("get_weather")
+    tool.validate_input({"city": "Berlin"})          # raises SchemaError on mismatch
+    tool.serialize_output({"ok": True, "temp": 3})   # validated JSON text
+
+Supported keywords: type, enum, const, required, properties,
+additionalProperties, items, minItems, maxItems, minLength, maxLength,
+pattern, minimum, maximum, exclusiveMinimum, exclusiveMaximum. Others are ignored.
+
+    python -m tools.tool_schemas --bench
+"""
+import argparse
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from tools.manifest_index import ManifestIndex
+from tools.skills import REPO_ROOT
+
+Validator = Callable[[Any, str], None]
+
+CACHE_SIZE = 1024  # distinct schemas; edited manifests leave old hashes behind, the LRU drops them
+
+
+class SchemaError(ValueError):
+    def __init__(self, path: str, message: str):
+        super().__init__(f"{path or '$'}: {message}")
+        self.path = path
+        self.message = message
+
+
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "boolean": lambda v: isinstance(v, bool),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+# fast path: exact Python types per JSON type (bool is excluded from numbers)
+_EXACT_TYPES = {
+    "object": (dict,),
+    "array": (list,),
+    "string": (str,),
+    "boolean": (bool,),
+    "integer": (int,),
+    "number": (int, float),
+    "null": (type(None),),
+}
+
+
+def schema_hash(schema: Any) -> str:
+    return hashlib.sha256(json.dumps(schema, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def _compile(schema: Dict) -> Validator:
+    if not isinstance(schema, dict) or not schema:
+        return lambda value, path: None
+    checks: List[Validator] = []
+
+    types = schema.get("type")
+    if types is not None:
+        names = [types] if isinstance(types, str) else list(types)
+        exact = tuple(t for name in names for t in _EXACT_TYPES.get(name, ()))
+        bool_ok = "boolean" in names
+        expected = "/".join(names)
+
+        def check_type(value, path, exact=exact, bool_ok=bool_ok, expected=expected):
+            if type(value) not in exact and not (isinstance(value, exact) and (bool_ok or not isinstance(value, bool))):
+                raise SchemaError(path, f"expected {expected}")
+
+        checks.append(check_type)
+
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+
+        def check_enum(value, path, allowed=allowed):
+            if value not in allowed:
+                raise SchemaError(path, f"must be one of {allowed}")
+
+        checks.append(check_enum)
+
+    if "const" in schema:
+        const = schema["const"]
+
+        def check_const(value, path, const=const):
+            if value != const:
+                raise SchemaError(path, f"must be {const!r}")
+
+        checks.append(check_const)
+
+    # object
+    required = tuple(schema.get("required") or ())
+    properties = {key: _compile(sub) for key, sub in (schema.get("properties") or {}).items()}
+    additional = schema.get("additionalProperties", True)
+    if required or properties or additional is not True:
+        extra = None if additional is True else False if additional is False else _compile(additional)
+        props = tuple(properties.items())
+
+        def check_object(value, path, required=required, props=props, known=frozenset(properties), extra=extra):
+            if not isinstance(value, dict):
+                return
+            for key in required:
+                if key not in value:
+                    raise SchemaError(path, f"missing required property {key!r}")
+            for key, validate in props:
+                if key in value:
+                    validate(value[key], f"{path}.{key}")
+            if extra is not None:
+                for key in value:
+                    if key not in known:
+                        if extra is False:
+                            raise SchemaError(path, f"unexpected property {key!r}")
+                        extra(value[key], f"{path}.{key}")
+
+        checks.append(check_object)
+
+    # array
+    items = _compile(schema["items"]) if isinstance(schema.get("items"), dict) else None
+    min_items, max_items = schema.get("minItems"), schema.get("maxItems")
+    if items is not None or min_items is not None or max_items is not None:
+
+        def check_array(value, path, items=items, lo=min_items, hi=max_items):
+            if not isinstance(value, list):
+                return
+            if lo is not None and len(value) < lo:
+                raise SchemaError(path, f"expected at least {lo} items")
+            if hi is not None and len(value) > hi:
+                raise SchemaError(path, f"expected at most {hi} items")
+            if items is not None:
+                for i, item in enumerate(value):
+                    items(item, f"{path}[{i}]")
+
+        checks.append(check_array)
+
+    # string
+    min_len, max_len = schema.get("minLength"), schema.get("maxLength")
+    pattern = re.compile(schema["pattern"]) if "pattern" in schema else None
+    if min_len is not None or max_len is not None or pattern is not None:
+
+        def check_string(value, path, lo=min_len, hi=max_len, pattern=pattern):
+            if not isinstance(value, str):
+                return
+            if lo is not None and len(value) < lo:
+                raise SchemaError(path, f"shorter than {lo}")
+            if hi is not None and len(value) > hi:
+                raise SchemaError(path, f"longer than {hi}")
+            if pattern is not None and not pattern.search(value):
+                raise SchemaError(path, f"does not match {pattern.pattern!r}")
+
+        checks.append(check_string)
+
+    # number
+    bounds = [(schema.get(k), k) for k in ("minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum")]
+    if any(b is not None for b, _k in bounds):
+        (lo, _), (hi, _), (xlo, _), (xhi, _) = bounds
+
+        def check_number(value, path, lo=lo, hi=hi, xlo=xlo, xhi=xhi):
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                return
+            if (lo is not None and value < lo) or (xlo is not None and value <= xlo):
+                raise SchemaError(path, "below minimum")
+            if (hi is not None and value > hi) or (xhi is not None and value >= xhi):
+                raise SchemaError(path, "above maximum")
+
+        checks.append(check_number)
+
+    if not checks:
+        return lambda value, path: None
+    if len(checks) == 1:
+        return checks[0]
+    checks_t = tuple(checks)
+
+    def check_all(value, path, checks=checks_t):
+        for check in checks:
+            check(value, path)
+
+    return check_all
+
+
+_cache: "OrderedDict[str, Validator]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def compile_schema(schema: Optional[Dict]) -> Callable[[Any], None]:
+    """Validator for schema (LRU-cached by schema hash); raises SchemaError."""
+    key = schema_hash(schema or {})
+    with _cache_lock:
+        validate = _cache.get(key)
+        if validate is not None:
+            _cache.move_to_end(key)
+    if validate is None:
+        validate = _compile(schema or {})
+        with _cache_lock:
+            _cache[key] = validate
+            if len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+    return lambda value, _validate=validate: _validate(value, "")
+
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+class CompiledTool(NamedTuple):
+    name: str
+    skill: str
+    schema_hash: str
+    validate_input: Callable[[Any], None]
+    validate_output: Callable[[Any], None]
+
+    def serialize_output(self, value: Any) -> str:
+        """Validated JSON text of a tool result (C encoder, compact separators)."""
+        self.validate_output(value)
+        return _encode(value)
+
+
+def compile_tool(skill: str, tool: Dict) -> CompiledTool:
+    return CompiledTool(
+        name=str(tool["name"]),
+        skill=skill,
+        schema_hash=schema_hash([tool.get("input_schema"), tool.get("output_schema")]),
+        validate_input=compile_schema(tool.get("input_schema")),
+        validate_output=compile_schema(tool.get("output_schema")),
+    )
+
+
+class ToolSchemas:
+    """Compiled schemas of all installed tools, kept in sync with the manifest index."""
+
+    def __init__(self, index: ManifestIndex):
+        self._index = index
+        self._tools: Dict[str, CompiledTool] = {}
+        self._skill_tools: Dict[str, List[str]] = {}
+        for skill in index.skills:
+            self.load_skill(skill)
+
+    @classmethod
+    def from_root(cls, root=REPO_ROOT, index_path=None) -> "ToolSchemas":
+        index = ManifestIndex.open(index_path, root)
+        index.refresh()
+        index.save()
+        return cls(index)
+
+    def load_skill(self, skill: str) -> None:
+        """(Re)compiles one skill's tools from the index; a skill missing from the index is dropped."""
+        for name in self._skill_tools.pop(skill, []):
+            self._tools.pop(name, None)
+        data = self._index.skills.get(skill)
+        if data is None:
+            return
+        names = []
+        for tool in data["manifest"].get("tools") or []:
+            if isinstance(tool, dict) and tool.get("name"):
+                compiled = compile_tool(skill, tool)
+                self._tools[compiled.name] = compiled
+                names.append(compiled.name)
+        self._skill_tools[skill] = names
+
+    def refresh(self) -> List[str]:
+        """Recompiles tools of skills whose manifest changed; unchanged schemas hit the hash cache."""
+        changed = self._index.refresh()
+        for skill in changed:
+            self.load_skill(skill)
+        return changed
+
+    def get(self, name: str) -> CompiledTool:
+        return self._tools[name]
+
+    def names(self) -> List[str]:
+        return sorted(self._tools)
+
+
+# ---------------------------
+# benchmark
+# ---------------------------
+
+
+def _interpret(schema: Dict, value: Any, path: str = "") -> None:
+    """Generic per-call interpretation of the same keyword subset: the baseline."""
+    types = schema.get("type")
+    if types is not None:
+        names = [types] if isinstance(types, str) else types
+        if not any(_TYPE_CHECKS[n](value) for n in names):
+            raise SchemaError(path, f"expected {'/'.join(names)}")
+    if "enum" in schema and value not in schema["enum"]:
+        raise SchemaError(path, "enum")
+    if isinstance(value, dict):
+        for key in schema.get("required") or ():
+            if key not in value:
+                raise SchemaError(path, f"missing required property {key!r}")
+        for key, sub in (schema.get("properties") or {}).items():
+            if key in value:
+                _interpret(sub, value[key], f"{path}.{key}")
+    if isinstance(value, list):
+        if "minItems" in schema and len(value) < schema["minItems"]:
+            raise SchemaError(path, "minItems")
+        if "maxItems" in schema and len(value) > schema["maxItems"]:
+            raise SchemaError(path, "maxItems")
+        if isinstance(schema.get("items"), dict):
+            for i, item in enumerate(value):
+                _interpret(schema["items"], item, f"{path}[{i}]")
+    if isinstance(value, str):
+        if "minLength" in schema and len(value) < schema["minLength"]:
+            raise SchemaError(path, "minLength")
+        if "maxLength" in schema and len(value) > schema["maxLength"]:
+            raise SchemaError(path, "maxLength")
+
+
+def bench(calls: int = 200_000) -> None:
+    tools = ToolSchemas.from_root()
+    samples = {
+        "get_weather": ({"city": "Berlin"}, {"ok": True, "city": "Berlin", "temp": 3.5, "description": "snow"}),
+        "get_weather_many": (
+            {"cities": ["Berlin", "Moscow", "Paris"]},
+            {"ok": True, "results": [{"ok": True, "city": c, "temp": 1.0, "description": "rain"} for c in ("Berlin", "Moscow", "Paris")]},
+        ),
+    }
+    print(f"{'tool':<18} {'compiled in us':>15} {'interpreted in us':>18} {'compiled out us':>16} {'serialize us':>13}")
+    for name, (args, result) in samples.items():
+        if name not in tools.names():
+            continue
+        tool = tools.get(name)
+        manifest_tool = next(t for t in tools._index.skills[tool.skill]["manifest"]["tools"] if t["name"] == name)
+        rows = []
+        for fn in (
+            lambda: tool.validate_input(args),
+            lambda: _interpret(manifest_tool["input_schema"], args),
+            lambda: tool.validate_output(result),
+            lambda: tool.serialize_output(result),
+        ):
+            started = time.perf_counter()
+            for _ in range(calls):
+                fn()
+            rows.append((time.perf_counter() - started) / calls * 1e6)
+        print(f"{name:<18} {rows[0]:>15.2f} {rows[1]:>18.2f} {rows[2]:>16.2f} {rows[3]:>13.2f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compiled validators for tool schemas")
+    parser.add_argument("--bench", action="store_true", help="per-call validation overhead")
+    args = parser.parse_args(argv)
+    if args.bench:
+        bench()
+        return 0
+    tools = ToolSchemas.from_root()
+    for name in tools.names():
+        tool = tools.get(name)
+        print(f"{tool.skill:<20} {name:<20} {tool.schema_hash[:12]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
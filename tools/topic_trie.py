@@ -0,0 +1,220 @@
+"""
+Topic-trie event dispatch index.
+
+All ``events.subscribe`` patterns of installed skills are compiled into one
+trie over dotted segments. ``*`` matches exactly one segment and ``#`` matches
+zero or more (``nlp.intent.*.get``, ``ui.#``). Resolving a topic walks at most
+one trie path per wildcard branch, so its cost depends on the topic's length,
+not on the number of skills; resolved subscriber lists are cached per concrete
+topic until the next subscribe/unsubscribe.
+
+A skill may subscribe several handlers, and overlapping patterns
+(``ui.notify`` and ``ui.#``) each keep their own handler; a topic resolves to
+every distinct ``(skill, handler)`` pair once, in the order the trie finds them::
+
+    trie = TopicTrie()
+    trie.add_skill("weather_skill", ["nlp.intent.weather.get"], handler)
+    trie.resolve("nlp.intent.weather.get")      # (("weather_skill", handler),)
+
+``TopicTrie.from_registry(LazyRegistry.from_root())`` wires it to lazily
+imported handlers. ``python -m tools.topic_trie --bench`` runs the dispatch
+microbenchmark (1000 topics x 1000 subscribers).
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+STAR = "*"
+HASH = "#"
+CACHE_SIZE = 4096
+
+Subscriber = Tuple[str, Any]  # (skill, handler); handlers must be hashable (functions, topic names)
+
+
+class _Node:
+    __slots__ = ("children", "subs")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.subs: Dict[str, List[Any]] = {}  # skill -> handlers subscribed to this pattern
+
+
+class TopicTrie:
+    def __init__(self, cache_size: int = CACHE_SIZE):
+        self._root = _Node()
+        self._patterns: Dict[str, List[str]] = {}  # skill -> patterns
+        self._cache: "OrderedDict[str, Tuple[Subscriber, ...]]" = OrderedDict()
+        self._cache_size = cache_size
+
+    # --- building ---
+
+    def subscribe(self, pattern: str, skill: str, handler: Any = None) -> None:
+        node = self._root
+        for segment in pattern.split("."):
+            node = node.children.setdefault(segment, _Node())
+        handlers = node.subs.setdefault(skill, [])
+        if handler not in handlers:
+            handlers.append(handler)
+        patterns = self._patterns.setdefault(skill, [])
+        if pattern not in patterns:
+            patterns.append(pattern)
+        self._cache.clear()
+
+    def add_skill(self, skill: str, patterns: Iterable[str], handler: Any = None) -> None:
+        """Subscribes a skill (replacing its previous subscriptions)."""
+        self.remove_skill(skill)
+        for pattern in patterns:
+            self.subscribe(pattern, skill, handler)
+
+    def remove_skill(self, skill: str) -> None:
+        for pattern in self._patterns.pop(skill, []):
+            self._unsubscribe(pattern.split("."), skill)
+        self._cache.clear()
+
+    def _unsubscribe(self, segments: List[str], skill: str) -> None:
+        path = [self._root]
+        for segment in segments:
+            node = path[-1].children.get(segment)
+            if node is None:
+                return
+            path.append(node)
+        path[-1].subs.pop(skill, None)
+        # prune now-empty branches so the trie does not grow with skill churn
+        for parent, segment, node in zip(reversed(path[:-1]), reversed(segments), reversed(path[1:])):
+            if node.subs or node.children:
+                break
+            del parent.children[segment]
+
+    def skills(self) -> List[str]:
+        return sorted(self._patterns)
+
+    # --- resolving ---
+
+    def resolve(self, topic: str) -> Tuple[Subscriber, ...]:
+        cached = self._cache.get(topic)
+        if cached is not None:
+            self._cache.move_to_end(topic)
+            return cached
+        found: Dict[Subscriber, None] = {}  # ordered set: the same (skill, handler) via two patterns runs once
+        self._match(self._root, topic.split("."), 0, found)
+        result = tuple(found)
+        self._cache[topic] = result
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def _match(self, node: _Node, segments: List[str], i: int, found: Dict[Subscriber, None]) -> None:
+        hash_node = node.children.get(HASH)
+        if hash_node is not None:
+            # "#" swallows zero or more segments
+            for j in range(i, len(segments) + 1):
+                self._match(hash_node, segments, j, found)
+        if i == len(segments):
+            for skill, handlers in node.subs.items():
+                for handler in handlers:
+                    found.setdefault((skill, handler))
+            return
+        child = node.children.get(segments[i])
+        if child is not None:
+            self._match(child, segments, i + 1, found)
+        star = node.children.get(STAR)
+        if star is not None:
+            self._match(star, segments, i + 1, found)
+
+    def dispatch(self, topic: str, evt, call: Optional[Callable[[str, Any, str, Any], Any]] = None) -> List:
+        """Calls each subscriber: handler(evt), or call(skill, handler, topic, evt) when given."""
+        results = []
+        for skill, handler in self.resolve(topic):
+            results.append(call(skill, handler, topic, evt) if call is not None else handler(evt))
+        return results
+
+    @classmethod
+    def from_registry(cls, registry) -> "TopicTrie":
+        """Trie over a tools.lazy_skills.LazyRegistry; dispatch imports the handler on first event."""
+        trie = cls()
+        for skill in registry.skills.values():
+            for topic in skill.topics:
+                trie.subscribe(topic, skill.name, lambda evt, _skill=skill, _topic=topic: _skill.dispatch(_topic, evt))
+        return trie
+
+
+# ---------------------------
+# benchmark
+# ---------------------------
+
+
+def _pattern_regex(pattern: str) -> "re.Pattern":
+    parts = []
+    for segment in pattern.split("."):
+        parts.append(r"[^.]+" if segment == STAR else r".*" if segment == HASH else re.escape(segment))
+    return re.compile(r"\.".join(parts).replace(r"\..*", r"(?:\..*)?"))
+
+
+def _workload(topics: int, subscribers: int, rnd: random.Random):
+    names = [f"svc{i % 50}.obj{i}.evt{i % 7}" for i in range(topics)]
+    subs = []
+    for j in range(subscribers):
+        roll = rnd.random()
+        if roll < 0.05:
+            pattern = f"svc{rnd.randrange(50)}.*.evt{rnd.randrange(7)}"
+        elif roll < 0.06:
+            pattern = f"svc{rnd.randrange(50)}.#"
+        else:
+            pattern = rnd.choice(names)
+        subs.append((f"skill_{j}", pattern))
+    return names, subs
+
+
+def bench(topics: int = 1000, subscriber_counts=(10, 100, 1000), events: int = 100_000) -> None:
+    rnd = random.Random(1)
+    print(f"{'subscribers':>11} {'build ms':>9} {'trie cold us':>13} {'trie cached us':>15} {'linear us':>10}")
+    for count in subscriber_counts:
+        names, subs = _workload(topics, count, rnd)
+        started = time.perf_counter()
+        trie = TopicTrie(cache_size=topics)
+        for skill, pattern in subs:
+            trie.subscribe(pattern, skill)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        stream = [rnd.choice(names) for _ in range(events)]
+        started = time.perf_counter()
+        for topic in names:
+            trie.resolve(topic)
+        cold_us = (time.perf_counter() - started) / len(names) * 1e6
+        started = time.perf_counter()
+        for topic in stream:
+            trie.resolve(topic)
+        cached_us = (time.perf_counter() - started) / len(stream) * 1e6
+
+        compiled = [(skill, _pattern_regex(p)) for skill, p in subs]
+        sample = stream[:1000]
+        started = time.perf_counter()
+        for topic in sample:
+            [skill for skill, rx in compiled if rx.fullmatch(topic)]
+        linear_us = (time.perf_counter() - started) / len(sample) * 1e6
+        print(f"{count:>11} {build_ms:>9.1f} {cold_us:>13.2f} {cached_us:>15.2f} {linear_us:>10.1f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Topic-trie event dispatch index")
+    parser.add_argument("topic", nargs="?", help="topic to resolve against installed skills")
+    parser.add_argument("--bench", action="store_true", help="1000 topics x 10/100/1000 subscribers")
+    args = parser.parse_args(argv)
+
+    if args.bench or not args.topic:
+        bench()
+        return 0
+    from tools.lazy_skills import LazyRegistry
+
+    trie = TopicTrie.from_registry(LazyRegistry.from_root())
+    for skill in dict.fromkeys(skill for skill, _handler in trie.resolve(args.topic)):
+        print(skill)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
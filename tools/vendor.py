@@ -0,0 +1,71 @@
+"""
+Vendored copies of ``tools/skill_lib`` modules inside skills.
+
+Skills cannot import ``tools`` (each skill is installed on its own), so code
+they share lives once in ``tools/skill_lib`` and a byte-identical copy is
+kept in ``<skill>/handlers/`` (or ``<skill>/prep/``), imported relatively::
+
+    from .time_slot import TimeValue, parse_time
+
+Edit the module in ``tools/skill_lib``, then refresh the copies; the test
+suite fails while a copy is stale::
+
+    python -m tools.vendor            # rewrite stale copies
+    python -m tools.vendor --check    # list stale copies, exit 1 if any
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from tools.skills import REPO_ROOT
+
+LIB_DIR = Path(__file__).resolve().parent / "skill_lib"
+
+PREP_SKILLS = [
+    "demo_skill_test", "demo_skill_test_2", "demo_skill_test_4", "demo_skill_test_5",
+    "demo_skill_test_6", "telegram_notifier", "weather_skill", "weather_skill2",
+]
+
+# module in tools/skill_lib -> (folder inside the skill, skills that ship it)
+VENDORED: Dict[str, Tuple[str, List[str]]] = {
+    "time_slot.py": ("handlers", ["alarm_skill4", "test_skill2", "test_skill3", "test_skill4"]),
+    "alarms.py": ("handlers", ["alarm_skill4", "test_skill2", "test_skill3", "test_skill4"]),
+    "city_slot.py": ("handlers", ["weather_skill"]),
+    "prep_runner.py": ("prep", PREP_SKILLS),
+}
+
+
+def copies(root: Path = REPO_ROOT) -> List[Tuple[Path, Path]]:
+    """(source, copy) for every vendored module."""
+    return [(LIB_DIR / module, root / skill / folder / module) for module, (folder, skills) in VENDORED.items() for skill in skills]
+
+
+def stale(root: Path = REPO_ROOT) -> List[Path]:
+    """Copies that are missing or differ from their source."""
+    return [dest for src, dest in copies(root) if not dest.exists() or dest.read_bytes() != src.read_bytes()]
+
+
+def sync(root: Path = REPO_ROOT) -> List[Path]:
+    """Rewrites stale copies; returns them."""
+    changed = stale(root)
+    for src, dest in copies(root):
+        if dest in changed:
+            dest.write_bytes(src.read_bytes())
+    return changed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Copy tools/skill_lib modules into the skills that ship them")
+    parser.add_argument("--root", type=Path, default=REPO_ROOT)
+    parser.add_argument("--check", action="store_true", help="only list stale copies; exit 1 if any")
+    args = parser.parse_args(argv)
+
+    paths = stale(args.root) if args.check else sync(args.root)
+    for path in paths:
+        print(f"{'stale' if args.check else 'updated'}: {path.relative_to(args.root)}")
+    return 1 if args.check and paths else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
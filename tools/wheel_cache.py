@@ -0,0 +1,366 @@
+"""
+Node-local, content-addressed cache of skill dependencies.
+
+``dependencies`` from every ``skill.yaml`` are installed into shared
+environments instead of once per skill::
+
+    <cache>/blobs/<sha256>                    every wheel, stored once by content
+    <cache>/wheels/<file>.whl                 hardlinks to blobs (the --find-links dir for pip)
+    <cache>/unpacked/<sha256>/                each wheel extracted once
+    <cache>/resolutions/<hash>.json           requirement set -> pinned wheels (memoized)
+    <cache>/envs/<hash>/site-packages/        hardlinks into unpacked/, one per distinct wheel set
+    <cache>/skills.json                       skill -> env
+    <cache>/hashes.json                       sha256 of --find-links wheels by (path, mtime, size)
+
+A skill whose requirements are already satisfied by an existing environment
+shares it: no resolver run and no new files. Otherwise the requirement set is
+resolved once by ``pip install --dry-run --report`` against the cache and
+``--find-links`` directories only (``--no-index``), so installation works
+fully offline; ``--online`` first downloads missing wheels with ``pip download``.
+
+    python -m tools.wheel_cache --find-links ./wheelhouse         # all skills from skills.yaml
+    python -m tools.wheel_cache --stats
+
+Only wheels are supported. Their purelib/platlib contents are installed, while
+``.data/scripts`` and headers are not: skills import packages, they do not run
+console scripts.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import sysconfig
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from urllib.parse import unquote, urlparse
+from urllib.request import url2pathname
+
+import yaml
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.utils import canonicalize_name
+
+from tools.skills import REPO_ROOT, SKILL_MANIFEST, listed_skills, skill_dirs
+
+CACHE_ENV = "ADAOS_WHEEL_CACHE"
+DEFAULT_CACHE = Path(os.environ.get(CACHE_ENV) or Path.home() / ".cache" / "adaos" / "wheels")
+# wheels and resolutions are only valid for one interpreter and platform
+TARGET = f"{sys.implementation.cache_tag}-{sysconfig.get_platform()}"
+
+
+class EnvInfo(NamedTuple):
+    key: str
+    path: Path  # the site-packages directory
+    pins: Dict[str, str]  # canonical name -> version
+    reused: bool
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _key(data) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+
+
+def _write_json(path: Path, data) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
+    tmp.replace(path)
+
+
+def _read_json(path: Path, default):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return default
+
+
+def _link(src: Path, dest: Path) -> None:
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copy2(src, dest)  # another filesystem: no hardlinks there
+
+
+def skill_requirements(skill_dir: Path) -> List[str]:
+    manifest = yaml.safe_load((skill_dir / SKILL_MANIFEST).read_text(encoding="utf-8")) or {}
+    return sorted({str(Requirement(str(r))) for r in manifest.get("dependencies") or []})
+
+
+def satisfied_by(requirements: Iterable[str], pins: Dict[str, str]) -> bool:
+    """
+    Whether an environment with these pins covers the requirements. A requirement
+    with extras ("pkg[socks]") never matches: the pins do not say which extras'
+    dependencies went in, so it is resolved (memoized) instead.
+    """
+    for text in requirements:
+        req = Requirement(text)
+        if req.marker is not None and not req.marker.evaluate():
+            continue
+        if req.extras:
+            return False
+        version = pins.get(canonicalize_name(req.name))
+        if version is None or not req.specifier.contains(version, prereleases=True):
+            return False
+    return True
+
+
+class WheelCache:
+    def __init__(self, path: Path = DEFAULT_CACHE, find_links: Iterable[Path] = (), python: str = sys.executable):
+        self.path = Path(path)
+        self.find_links = [Path(p) for p in find_links]
+        self.python = python
+        self._hashes: Optional[Dict[str, list]] = None  # path -> [mtime_ns, size, sha256]
+        for sub in ("blobs", "wheels", "unpacked", "resolutions", "envs"):
+            (self.path / sub).mkdir(parents=True, exist_ok=True)
+
+    # --- wheels ---
+
+    def _hash(self, wheel: Path) -> str:
+        """sha256 of a wheel, re-read only when its path, mtime or size changed."""
+        if self._hashes is None:
+            self._hashes = _read_json(self.path / "hashes.json", {})
+        st = wheel.stat()
+        key = str(wheel.resolve())
+        known = self._hashes.get(key)
+        if known is not None and known[:2] == [st.st_mtime_ns, st.st_size]:
+            return known[2]
+        sha = _sha256(wheel)
+        self._hashes[key] = [st.st_mtime_ns, st.st_size, sha]
+        return sha
+
+    def _save_hashes(self) -> None:
+        if self._hashes is not None:
+            _write_json(self.path / "hashes.json", self._hashes)
+
+    def add_wheel(self, wheel: Path) -> str:
+        """Stores a wheel by content; returns its sha256. Re-adding the same file stores nothing."""
+        sha = self._hash(wheel)
+        blob = self.path / "blobs" / sha
+        if not blob.exists():
+            tmp = blob.with_name(sha + ".tmp")
+            shutil.copyfile(wheel, tmp)
+            tmp.replace(blob)
+        named = self.path / "wheels" / wheel.name
+        if not named.exists():
+            _link(blob, named)
+        return sha
+
+    def import_dir(self, directory: Path) -> int:
+        count = sum(1 for wheel in sorted(Path(directory).glob("*.whl")) if self.add_wheel(wheel))
+        self._save_hashes()
+        return count
+
+    def fetch(self, requirements: List[str]) -> None:
+        """Online mode: downloads wheels for requirements into the cache."""
+        with tempfile.TemporaryDirectory() as tmp:
+            subprocess.run(
+                [self.python, "-m", "pip", "download", "-q", "--only-binary=:all:", "-d", tmp, *requirements],
+                check=True,
+            )
+            self.import_dir(Path(tmp))
+
+    def _unpacked(self, sha: str) -> Path:
+        target = self.path / "unpacked" / sha
+        if target.exists():
+            return target
+        tmp = Path(tempfile.mkdtemp(prefix=sha[:12], dir=self.path / "unpacked"))
+        root = tmp.resolve()
+        try:
+            with zipfile.ZipFile(self.path / "blobs" / sha) as whl:
+                for member in whl.infolist():
+                    name = member.filename
+                    parts = name.split("/")
+                    if parts[0].endswith(".data"):
+                        if len(parts) < 3 or parts[1] not in ("purelib", "platlib"):
+                            continue
+                        name = "/".join(parts[2:])
+                    if member.is_dir() or not name:
+                        continue
+                    dest = (tmp / name).resolve()
+                    if root not in dest.parents:  # "../" or an absolute path: zip-slip
+                        raise ValueError(f"wheel {sha[:12]}: member {member.filename!r} escapes the install directory")
+                    dest.parent.mkdir(parents=True, exist_ok=True)
+                    with whl.open(member) as src, dest.open("wb") as out:
+                        shutil.copyfileobj(src, out)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        try:
+            tmp.rename(target)
+        except OSError:
+            shutil.rmtree(tmp)  # extracted concurrently by another install
+        return target
+
+    # --- resolution ---
+
+    def resolve(self, requirements: List[str]) -> List[Dict[str, str]]:
+        """Pinned wheels for a requirement set, memoized by its hash; pip only runs on a miss."""
+        memo = self.path / "resolutions" / f"{_key([TARGET, requirements])}.json"
+        pinned = _read_json(memo, None)
+        if pinned is not None and all((self.path / "blobs" / w["sha256"]).exists() for w in pinned):
+            return pinned
+        for directory in self.find_links:
+            self.import_dir(directory)
+        with tempfile.TemporaryDirectory() as tmp:
+            report = Path(tmp) / "report.json"
+            cmd = [self.python, "-m", "pip", "install", "-q", "--dry-run", "--ignore-installed", "--no-index"]
+            cmd += ["--only-binary=:all:", "--find-links", str(self.path / "wheels"), "--report", str(report), *requirements]
+            subprocess.run(cmd, check=True, capture_output=True, text=True)
+            data = json.loads(report.read_text(encoding="utf-8"))
+        pinned = []
+        for item in data.get("install") or []:
+            url = item["download_info"]["url"]
+            wheel = Path(url2pathname(unquote(urlparse(url).path)))
+            pinned.append(
+                {
+                    "name": canonicalize_name(item["metadata"]["name"]),
+                    "version": item["metadata"]["version"],
+                    "sha256": self.add_wheel(wheel),
+                }
+            )
+        pinned.sort(key=lambda w: w["name"])
+        self._save_hashes()
+        _write_json(memo, pinned)
+        return pinned
+
+    # --- environments ---
+
+    def envs(self) -> Dict[str, Dict]:
+        found = {}
+        for env_dir in (self.path / "envs").iterdir():
+            info = _read_json(env_dir / "env.json", None)
+            if info is not None and info.get("target") == TARGET:
+                found[env_dir.name] = info
+        return found
+
+    def _build_env(self, pinned: List[Dict[str, str]]) -> str:
+        key = _key([TARGET, sorted(w["sha256"] for w in pinned)])
+        env_dir = self.path / "envs" / key
+        if env_dir.exists():
+            return key
+        tmp = Path(tempfile.mkdtemp(prefix=key[:12], dir=self.path / "envs"))
+        site = tmp / "site-packages"
+        for wheel in pinned:
+            src_root = self._unpacked(wheel["sha256"])
+            for src in src_root.rglob("*"):
+                dest = site / src.relative_to(src_root)
+                if src.is_dir():
+                    dest.mkdir(parents=True, exist_ok=True)
+                elif not dest.exists():
+                    dest.parent.mkdir(parents=True, exist_ok=True)
+                    _link(src, dest)
+        _write_json(tmp / "env.json", {"target": TARGET, "pins": {w["name"]: w["version"] for w in pinned}, "wheels": pinned})
+        try:
+            tmp.rename(env_dir)
+        except OSError:
+            shutil.rmtree(tmp)
+        return key
+
+    def install(self, skill: str, requirements: List[str]) -> Optional[EnvInfo]:
+        """Assigns the skill an environment: the smallest existing one that satisfies it, else a new one."""
+        assignments = _read_json(self.path / "skills.json", {})
+        if not requirements:
+            assignments.pop(skill, None)
+            _write_json(self.path / "skills.json", assignments)
+            return None
+        envs = self.envs()
+        candidates = [(len(info["pins"]), key) for key, info in envs.items() if satisfied_by(requirements, info["pins"])]
+        reused = bool(candidates)
+        if reused:
+            key = min(candidates)[1]
+        else:
+            key = self._build_env(self.resolve(requirements))
+            envs[key] = _read_json(self.path / "envs" / key / "env.json", {})
+        assignments[skill] = {"env": key, "requirements": requirements}
+        _write_json(self.path / "skills.json", assignments)
+        return EnvInfo(key, self.path / "envs" / key / "site-packages", envs[key]["pins"], reused)
+
+    def site_packages(self, skill: str) -> Optional[Path]:
+        """The directory to put on sys.path before importing the skill's handlers."""
+        entry = _read_json(self.path / "skills.json", {}).get(skill)
+        return self.path / "envs" / entry["env"] / "site-packages" if entry else None
+
+    def stats(self) -> Dict[str, int]:
+        def size(sub):
+            # hardlinked files are counted once, by inode
+            seen = {}
+            for f in (self.path / sub).rglob("*"):
+                if f.is_file():
+                    st = f.stat()
+                    seen[(st.st_dev, st.st_ino)] = st.st_size
+            return seen
+
+        files = {}
+        for sub in ("blobs", "unpacked", "envs"):
+            files.update(size(sub))
+        return {
+            "wheels": sum(1 for _ in (self.path / "blobs").iterdir()),
+            "envs": len(self.envs()),
+            "skills": len(_read_json(self.path / "skills.json", {})),
+            "disk_kb": sum(files.values()) // 1024,
+        }
+
+
+def install_skills(cache: WheelCache, root: Path = REPO_ROOT, names: Optional[List[str]] = None, online: bool = False) -> List[Dict]:
+    results = []
+    for skill_dir in skill_dirs(root, names if names is not None else listed_skills(root)):
+        started = time.perf_counter()
+        entry = {"skill": skill_dir.name}
+        try:
+            requirements = skill_requirements(skill_dir)
+            if online and requirements:
+                cache.fetch(requirements)
+            env = cache.install(skill_dir.name, requirements)
+        except (InvalidRequirement, subprocess.CalledProcessError, OSError) as e:
+            detail = getattr(e, "stderr", None) or str(e)
+            entry["error"] = detail.strip().splitlines()[-1] if detail.strip() else type(e).__name__
+        else:
+            entry["env"] = env.key if env else None
+            entry["reused"] = env.reused if env else None
+        entry["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        results.append(entry)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Install skill dependencies into shared, content-addressed environments")
+    parser.add_argument("--root", type=Path, default=REPO_ROOT)
+    parser.add_argument("--cache", type=Path, default=DEFAULT_CACHE)
+    parser.add_argument("--skills", nargs="*", help="skill names instead of skills.yaml")
+    parser.add_argument("--find-links", type=Path, action="append", default=[], help="local wheel directory (repeatable)")
+    parser.add_argument("--online", action="store_true", help="download missing wheels with pip first")
+    parser.add_argument("--stats", action="store_true", help="print cache size and exit")
+    args = parser.parse_args(argv)
+
+    cache = WheelCache(args.cache, args.find_links)
+    if not args.stats:
+        failed = False
+        for entry in install_skills(cache, args.root, args.skills, args.online):
+            if "error" in entry:
+                failed = True
+                print(f"{entry['skill']:<24} error: {entry['error']}")
+            elif entry["env"] is None:
+                print(f"{entry['skill']:<24} no dependencies")
+            else:
+                how = "shared" if entry["reused"] else "built"
+                print(f"{entry['skill']:<24} {how} env {entry['env'][:12]} in {entry['duration_ms']:.1f} ms")
+        if failed:
+            return 1
+    print(json.dumps(cache.stats()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,12 @@
 from __future__ import annotations
 
-from handlers.main import handle  # noqa: F401
+import importlib
+
+__all__ = ["handle"]
+
+
+def __getattr__(name: str):
+    # handlers.main pulls in requests and the SDK: import it on first use, not with this module
+    if name in __all__:
+        return getattr(importlib.import_module("handlers.main"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
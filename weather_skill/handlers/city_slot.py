@@ -0,0 +1,165 @@
+"""
+{city} slot grammar: an offline city list (OpenWeatherMap ids) with aliases and
+Russian case forms, so «в Нижнем Новгороде» resolves by an exact dict lookup.
+
+Stdlib only: skills ship a byte-identical copy in ``handlers/`` (see
+``tools/vendor.py``). Edit this file, then run ``python -m tools.vendor``.
+"""
+import itertools
+import json
+import re
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+
+class CityValue(NamedTuple):
+    id: Optional[int]  # None: город не из справочника, name — текст как есть
+    name: str
+    country: Optional[str] = None
+
+
+_CITY_PUNCT = re.compile(r"[\s\-.,'’`]+")
+_CYRILLIC = re.compile(r"[а-я]")
+_INDECLINABLE = frozenset({"санкт", "на", "дону", "де", "ла", "лос", "нью", "сан"})
+_CITY_PREPOSITIONS = frozenset({"в", "во", "для", "на", "по", "из"})
+# опечатка исправляется только в длинных названиях: «Томск» в одной правке от «Омск»
+FUZZY_MIN_LEN = 6
+
+# окончания по падежам (род., дат., вин., твор., предл.); несколько вариантов — твёрдая/мягкая основа
+_ADJECTIVE_ENDINGS = {
+    "ий": (("ого", "его"), ("ому", "ему"), ("ий",), ("им",), ("ом", "ем")),
+    "ый": (("ого",), ("ому",), ("ый",), ("ым",), ("ом",)),
+    "ой": (("ого",), ("ому",), ("ой",), ("ым",), ("ом",)),
+    "ая": (("ой",), ("ой",), ("ую",), ("ой",), ("ой",)),
+}
+_NOUN_ENDINGS = {
+    "а": (("ы", "и"), ("е",), ("у",), ("ой",), ("е",)),
+    "я": (("и",), ("е",), ("ю",), ("ей",), ("е",)),
+    "ь": (("и", "я"), ("и", "ю"), ("ь",), ("ью", "ем"), ("и", "е")),
+    "й": (("я",), ("ю",), ("й",), ("ем",), ("е",)),
+}
+_CONSONANT_ENDINGS = (("а",), ("у",), ("",), ("ом",), ("е",))
+
+
+def _strip_latin_accents(ch: str) -> str:
+    # «й» не трогаем: иначе «нижний» превращается в «нижнии» и ломает падежные окончания
+    if ch < "\x80" or not unicodedata.name(ch, "").startswith("LATIN"):
+        return ch
+    return unicodedata.normalize("NFKD", ch)[0]
+
+
+def normalize_city(text: str) -> str:
+    """Нормализация для сравнения: регистр, ё/е, диакритика, дефисы и лишние пробелы."""
+    text = "".join(_strip_latin_accents(ch) for ch in text.casefold().replace("ё", "е"))
+    return _CITY_PUNCT.sub(" ", text).strip()
+
+
+def _word_cases(word: str, noun_done: bool):
+    """Формы слова по падежам или None, если слово не склоняется."""
+    if word in _INDECLINABLE or not _CYRILLIC.search(word):
+        return None, noun_done
+    for ending, cases in _ADJECTIVE_ENDINGS.items():
+        if word.endswith(ending) and len(word) > 4:
+            return [[word[: -len(ending)] + e for e in case] for case in cases], noun_done
+    if noun_done:
+        return None, noun_done
+    for ending, cases in _NOUN_ENDINGS.items():
+        if word.endswith(ending):
+            return [[word[: -len(ending)] + e for e in case] for case in cases], True
+    if word[-1] in "оеиуыэю":
+        return None, True  # «Сочи», «Осло»
+    return [[word + e for e in case] for case in _CONSONANT_ENDINGS], True
+
+
+def city_forms(key: str) -> List[str]:
+    """Падежные формы нормализованного названия: «нижний новгород» -> «нижнем новгороде», ..."""
+    words = key.split(" ")
+    per_word = []
+    noun_done = False
+    for word in words:
+        cases, noun_done = _word_cases(word, noun_done)
+        per_word.append(cases)
+    if all(cases is None for cases in per_word):
+        return []
+    forms = []
+    for case in range(len(_CONSONANT_ENDINGS)):
+        options = [[w] if cases is None else cases[case] for w, cases in zip(words, per_word)]
+        forms.extend(" ".join(combo) for combo in itertools.product(*options))
+    return [f for f in dict.fromkeys(forms) if f != key]
+
+
+def _one_edit(a: str, b: str) -> bool:
+    """Ровно одна правка: замена, вставка, удаление буквы или перестановка соседних."""
+    if a == b or abs(len(a) - len(b)) > 1:
+        return False
+    i = 0
+    while i < len(a) and i < len(b) and a[i] == b[i]:
+        i += 1
+    if len(a) > len(b):
+        return a[i + 1 :] == b[i:]
+    if len(a) < len(b):
+        return a[i:] == b[i + 1 :]
+    if a[i + 1 :] == b[i + 1 :]:
+        return True
+    return i + 1 < len(a) and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2 :] == b[i + 2 :]
+
+
+class CityIndex:
+    """
+    Справочник городов: названия, синонимы и их падежные формы (dict).
+
+    Слот (без предлога) должен совпасть целиком или, для названий от FUZZY_MIN_LEN
+    букв, отличаться одной правкой ровно от одного города («Новосибирк»). После
+    запятой допускается только код страны города («London, GB»). Иначе lookup()
+    возвращает None, и город передаётся в API текстом как есть.
+    """
+
+    def __init__(self, cities: List[list]):
+        self.name_by_id: Dict[int, str] = {}
+        forms: Dict[str, CityValue] = {}
+        for row in cities:
+            city_id, name, country, aliases = int(row[0]), row[1], row[2], row[3]
+            value = CityValue(city_id, name, country)
+            self.name_by_id[city_id] = name
+            for alias in [name, *aliases]:
+                forms.setdefault(normalize_city(alias), value)
+        # формы добавляются после всех названий, чтобы не перекрыть чужой синоним
+        for key, value in list(forms.items()):
+            for form in city_forms(key):
+                forms.setdefault(form, value)
+        self._forms = forms
+        self._by_len: Dict[int, List[str]] = {}
+        for key in forms:
+            self._by_len.setdefault(len(key), []).append(key)
+
+    @classmethod
+    def from_file(cls, path: Path) -> "CityIndex":
+        return cls(json.loads(Path(path).read_text(encoding="utf-8")).get("cities", []))
+
+    def lookup(self, text: str) -> Optional[CityValue]:
+        head, _sep, qualifier = text.partition(",")
+        words = normalize_city(head).split(" ")
+        while len(words) > 1 and words[0] in _CITY_PREPOSITIONS:  # «в Питере», «для Казани»
+            words.pop(0)
+        key = " ".join(words)
+        value = self._forms.get(key)
+        if value is None:
+            value = self._fuzzy(key)
+        if value is None:
+            return None
+        qualifier = normalize_city(qualifier)
+        if qualifier and qualifier != value.country.casefold():
+            return None  # «Paris, Texas» — не Париж из справочника
+        return value
+
+    def _fuzzy(self, key: str) -> Optional[CityValue]:
+        if len(key) < FUZZY_MIN_LEN:
+            return None
+        found = {
+            self._forms[other]
+            for n in (len(key) - 1, len(key), len(key) + 1)
+            for other in self._by_len.get(n, ())
+            if _one_edit(key, other)
+        }
+        return found.pop() if len(found) == 1 else None  # два города рядом — не угадываем
@@ -1,7 +1,26 @@
+import asyncio
+import atexit
+import bisect
+import contextlib
+import contextvars
+import functools
 import json
-from typing import Dict, Optional, Tuple
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import aiohttp
+except ImportError:  # без aiohttp асинхронный путь уходит в поток
+    aiohttp = None
 
 from adaos.sdk.skills.i18n import _
 from adaos.sdk.data.context import get_current_skill
@@ -10,6 +29,9 @@ from adaos.sdk.data.bus import emit
 from adaos.sdk.data.skill_memory import get as get_env, set as set_env
 from adaos.services.agent_context import get_ctx
 
+# справочник городов и падежные формы — копия tools/skill_lib/city_slot.py (python -m tools.vendor)
+from .city_slot import CityIndex, CityValue, normalize_city
+
 """   ```
 
   Example:
@@ -23,11 +45,130 @@ from adaos.sdk.data.skill_memory import get, set
 # helpers: config & api calls
 # ---------------------------
 
+_UNITS = "metric"
+_LANG = "en"
+
+# значения по умолчанию для кэша ответов (переопределяются через env)
+_CACHE_TTL = 600.0  # сек: ответ считается свежим
+_CACHE_STALE_WHILE_REVALIDATE = 600.0  # сек после ttl: отдаём старое и обновляем в фоне
+_CACHE_STALE_IF_ERROR = 6 * 3600.0  # сек после ttl: отдаём старое, если API недоступен
+_CACHE_MAX_ENTRIES = 256
+
+# HTTP-клиент (переопределяются через env: http_pool_size, http_keepalive, http_retries, http_backoff)
+_HTTP_TIMEOUT = 6.0
+_HTTP_POOL_SIZE = 20  # макс. соединений в пуле к одному хосту
+_HTTP_KEEPALIVE = 30.0  # сек: сколько держать простаивающее соединение (aiohttp)
+_HTTP_RETRIES = 2
+_HTTP_BACKOFF = 0.3
+
+# circuit breaker (env: breaker_error_rate, breaker_open_seconds)
+_BREAKER_WINDOW = 60.0  # сек: скользящее окно статистики
+_BREAKER_MIN_CALLS = 10  # меньше вызовов в окне — не размыкаем
+_BREAKER_ERROR_RATE = 0.5
+_BREAKER_SLOW_CALL = 3.0  # сек: вызов считается медленным
+_BREAKER_SLOW_RATE = 0.8
+_BREAKER_OPEN_SECONDS = 30.0
+_HTTP_TIMEOUT_MIN = 1.0  # нижняя граница адаптивного таймаута
+
+# get_weather_many: сколько городов за вызов и сколько запросов параллельно (env: batch_concurrency)
+_BATCH_MAX_CITIES = 20
+_BATCH_CONCURRENCY = 5
+
+# офлайн-справочник городов (id OpenWeatherMap, каноническое имя, синонимы)
+_CITIES_FILE = Path(__file__).resolve().parents[1] / "data" / "cities.json"
+_GROUP_MAX_IDS = 20  # лимит /data/2.5/group
+
+# гистограммы задержек по этапам (env: metrics_enabled), границы корзин в секундах
+_METRICS_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# как часто (сек) проверять mtime .skill_env.json / prep_result.json
+_CONFIG_CHECK_INTERVAL = 2.0
+
 
 def output(txt: str):
     print(txt)
 
 
+def _env_number(name: str, default: float) -> float:
+    try:
+        value = get_env(name)
+        return float(value) if value is not None else default
+    except (TypeError, ValueError):
+        return default
+
+
+# ---------------------------
+# shared http session
+# ---------------------------
+
+_http_session: Optional[requests.Session] = None
+_http_lock = threading.Lock()
+
+
+def _get_http_session() -> requests.Session:
+    """
+    Один пул keep-alive соединений на процесс навыка: TCP/TLS-рукопожатие
+    платится один раз, а не на каждый запрос.
+    """
+    global _http_session
+    if _http_session is None:
+        with _http_lock:
+            if _http_session is None:
+                # повторяются только ответы 429/5xx: повтор таймаутов соединения/чтения
+                # умножал бы ожидание на число попыток в обход таймаута размыкателя
+                retry = Retry(
+                    total=int(_env_number("http_retries", _HTTP_RETRIES)),
+                    connect=0,
+                    read=0,
+                    backoff_factor=_env_number("http_backoff", _HTTP_BACKOFF),
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=frozenset({"GET"}),
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=int(_env_number("http_pool_size", _HTTP_POOL_SIZE)),
+                    max_retries=retry,
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _http_session = session
+                _close_at_exit()
+    return _http_session
+
+
+def _close_at_exit() -> None:
+    # ровно одна регистрация на версию модуля; shutdown() её снимает, поэтому
+    # после горячей перезагрузки atexit не держит выгруженный модуль
+    atexit.unregister(shutdown)
+    atexit.register(shutdown)
+
+
+def shutdown() -> None:
+    """
+    Закрывает HTTP-пулы навыка. Вызывается при выгрузке навыка (и при выходе процесса).
+    """
+    global _http_session
+    atexit.unregister(shutdown)
+    with _http_lock:
+        if _http_session is not None:
+            _http_session.close()
+            _http_session = None
+        sessions = list(_aio_sessions.items())
+        _aio_sessions.clear()
+
+    for loop, session in sessions:
+        if session.closed:
+            continue
+        if loop.is_closed():
+            _discard_aio_session(session)
+        elif loop.is_running():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+        else:
+            loop.run_until_complete(session.close())
+
+
 def _load_and_cache_config() -> Tuple[Optional[str], Optional[str], Optional[str]]:
     """
     Возвращает (api_key, api_entry_point, default_city), беря сперва из env,
@@ -45,7 +186,8 @@ def _load_and_cache_config() -> Tuple[Optional[str], Optional[str], Optional[str
         prep_file = get_current_skill().path / "prep" / "prep_result.json"
         if prep_file.exists():
             data = json.loads(prep_file.read_text(encoding="utf-8"))
-            res = data.get("resources", {}) or {}
+            # ресурсы неудачного prep (неверный ключ и т.п.) не используем
+            res = (data.get("resources", {}) or {}) if data.get("status") == "ok" else {}
             api_key = api_key or res.get("api_key")
             api_entry_point = api_entry_point or res.get("api_entry_point")
             default_city = default_city or res.get("default_city")
@@ -63,6 +205,221 @@ def _load_and_cache_config() -> Tuple[Optional[str], Optional[str], Optional[str
     return api_key, api_entry_point, default_city
 
 
+# ---------------------------
+# per-stage latency metrics
+# ---------------------------
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count", "exemplar")
+
+    def __init__(self):
+        self.counts = [0] * (len(_METRICS_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.exemplar: Optional[Tuple[str, float]] = None  # (trace_id, seconds) последнего замера
+
+    def observe(self, seconds: float, trace_id: Optional[str]) -> None:
+        self.counts[bisect.bisect_left(_METRICS_BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+        if trace_id:
+            self.exemplar = (trace_id, seconds)
+
+
+class _Metrics:
+    """
+    Гистограммы задержек по (точка входа, этап): config, memory, cache, http, decode, i18n, emit, total.
+    Выключены по умолчанию; в выключенном состоянии _span отдаёт общий no-op контекст.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._hist: Dict[Tuple[str, str], _Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, entry: str, stage: str, seconds: float, trace_id: Optional[str]) -> None:
+        with self._lock:
+            hist = self._hist.get((entry, stage))
+            if hist is None:
+                hist = self._hist[(entry, stage)] = _Histogram()
+            hist.observe(seconds, trace_id)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hist.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict]]:
+        with self._lock:
+            items = [(k, list(h.counts), h.sum, h.count, h.exemplar) for k, h in self._hist.items()]
+        out: Dict[str, Dict[str, Dict]] = {}
+        for (entry, stage), counts, total, count, exemplar in sorted(items):
+            out.setdefault(entry, {})[stage] = {
+                "count": count,
+                "sum": total,
+                "buckets": dict(zip([*map(str, _METRICS_BUCKETS), "+Inf"], counts)),
+                "exemplar": {"trace_id": exemplar[0], "seconds": exemplar[1]} if exemplar else None,
+            }
+        return out
+
+    def prometheus(self) -> str:
+        lines = [
+            "# HELP weather_skill_stage_seconds Latency of weather_skill handler stages.",
+            "# TYPE weather_skill_stage_seconds histogram",
+        ]
+        for entry, stages in self.snapshot().items():
+            for stage, h in stages.items():
+                labels = f'entry="{entry}",stage="{stage}"'
+                cumulative = 0
+                for le, n in h["buckets"].items():
+                    cumulative += n
+                    line = f'weather_skill_stage_seconds_bucket{{{labels},le="{le}"}} {cumulative}'
+                    lines.append(line)
+                ex = h["exemplar"]
+                if ex:
+                    lines[-1] += f' # {{trace_id="{ex["trace_id"]}"}} {ex["seconds"]:.6f}'
+                lines.append(f"weather_skill_stage_seconds_sum{{{labels}}} {h['sum']:.6f}")
+                lines.append(f"weather_skill_stage_seconds_count{{{labels}}} {h['count']}")
+        return "\n".join(lines) + "\n"
+
+
+_metrics = _Metrics()
+# (точка входа, trace_id) текущего запроса; фоновые обновления кэша идут как "background"
+_trace_ctx: contextvars.ContextVar = contextvars.ContextVar("weather_skill_trace", default=("background", None))
+_NOOP_SPAN = contextlib.nullcontext()
+
+
+class _Span:
+    __slots__ = ("stage", "started")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        entry, trace_id = _trace_ctx.get()
+        _metrics.observe(entry, self.stage, time.perf_counter() - self.started, trace_id)
+        return False
+
+
+class _EntrySpan(_Span):
+    __slots__ = ("entry", "trace_id", "token")
+
+    def __init__(self, entry: str, trace_id: Optional[str]):
+        super().__init__("total")
+        self.entry = entry
+        self.trace_id = trace_id
+
+    def __enter__(self):
+        self.token = _trace_ctx.set((self.entry, self.trace_id))
+        return super().__enter__()
+
+    def __exit__(self, *exc):
+        super().__exit__(*exc)
+        _trace_ctx.reset(self.token)
+        return False
+
+
+def _span(stage: str):
+    return _Span(stage) if _metrics.enabled else _NOOP_SPAN
+
+
+def _observe(stage: str, seconds: float) -> None:
+    """Замер, снятый вручную (там, где этап не оборачивается в with)."""
+    if _metrics.enabled:
+        entry, trace_id = _trace_ctx.get()
+        _metrics.observe(entry, stage, seconds, trace_id)
+
+
+def _entry_span(entry: str, trace_id: Optional[str] = None):
+    return _EntrySpan(entry, trace_id) if _metrics.enabled else _NOOP_SPAN
+
+
+def enable_metrics(enabled: bool = True) -> None:
+    _metrics.enabled = enabled
+
+
+def metrics_snapshot() -> Dict[str, Dict[str, Dict]]:
+    """Гистограммы этапов: {entry: {stage: {count, sum, buckets, exemplar}}}."""
+    return _metrics.snapshot()
+
+
+def metrics_prometheus() -> str:
+    """Те же гистограммы в текстовом формате Prometheus (с exemplar trace_id)."""
+    return _metrics.prometheus()
+
+
+# ---------------------------
+# config snapshot
+# ---------------------------
+
+
+class _Config(NamedTuple):
+    api_key: Optional[str]
+    api_entry_point: Optional[str]
+    default_city: Optional[str]
+    batch_concurrency: int
+
+
+_config: Optional[_Config] = None
+_config_stamp: Optional[Tuple] = None
+_config_checked_at = 0.0
+_config_lock = threading.Lock()
+
+
+def _config_stamp_now() -> Optional[Tuple]:
+    """
+    (inode, mtime, size) файлов, из которых собирается конфиг; None — путь навыка неизвестен.
+    """
+    try:
+        root = get_current_skill().path
+    except Exception:
+        return None
+    stamp = []
+    for path in (Path(root) / ".skill_env.json", Path(root) / "prep" / "prep_result.json"):
+        try:
+            st = path.stat()
+            stamp.append((st.st_ino, st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+def _get_config() -> _Config:
+    """
+    Неизменяемый снимок конфига. Перечитывается, только если изменились
+    .skill_env.json или prep/prep_result.json (проверка не чаще _CONFIG_CHECK_INTERVAL),
+    поэтому на горячем пути обращений к диску нет.
+    """
+    global _config, _config_stamp, _config_checked_at
+    now = time.monotonic()
+    config = _config
+    if config is not None and now - _config_checked_at < _CONFIG_CHECK_INTERVAL:
+        return config
+
+    with _config_lock:
+        if _config is not None and now - _config_checked_at < _CONFIG_CHECK_INTERVAL:
+            return _config
+        stamp = _config_stamp_now()
+        if _config is None or (stamp is not None and stamp != _config_stamp):
+            api_key, api_entry_point, default_city = _load_and_cache_config()
+            _config = _Config(
+                api_key=api_key,
+                api_entry_point=api_entry_point,
+                default_city=default_city,
+                batch_concurrency=int(_env_number("batch_concurrency", _BATCH_CONCURRENCY)),
+            )
+            if get_env("metrics_enabled"):
+                _metrics.enabled = True
+            # _load_and_cache_config мог дописать env — берём отметку после загрузки
+            _config_stamp = _config_stamp_now()
+        _config_checked_at = now
+        return _config
+
+
 def _resolve_city(payload_city: Optional[str] = None) -> Optional[str]:
     """
     Выбираем город по приоритету:
@@ -70,33 +427,216 @@ def _resolve_city(payload_city: Optional[str] = None) -> Optional[str]:
     2) last_city (skill_memory),
     3) default_city (env).
     """
-    city = payload_city or get("last_city") or get_env("default_city")
-    if city:
-        set("last_city", city)
+    with _span("memory"):
+        city = payload_city or get("last_city") or _get_config().default_city
+        if city:
+            set("last_city", city)
     return city
 
 
+# ---------------------------
+# offline city index
+# ---------------------------
+
+_city_index: Optional[CityIndex] = None
+
+
+def _get_city_index() -> CityIndex:
+    global _city_index
+    if _city_index is None:
+        try:
+            _city_index = CityIndex.from_file(_CITIES_FILE)
+        except (OSError, ValueError):
+            _city_index = CityIndex([])
+    return _city_index
+
+
+@functools.lru_cache(maxsize=2048)
+def _lookup_city(city: str) -> Optional[CityValue]:
+    """(id OpenWeatherMap, каноническое имя, страна) или None, если город не найден в справочнике."""
+    return _get_city_index().lookup(city)
+
+
+def _weather_query(city: str) -> Tuple[Dict[str, str], str]:
+    """
+    Параметры запроса и имя для ответа: id= для точно найденных в справочнике городов,
+    иначе q= с исходным текстом (уточнение страны/региона передаётся как есть).
+    """
+    match = _lookup_city(city)
+    if match is None:
+        return {"q": city}, city
+    return {"id": str(match.id)}, match.name
+
+
+# ---------------------------
+# circuit breaker
+# ---------------------------
+
+
+class _CircuitBreaker:
+    """
+    Размыкатель цепи для погодного API.
+
+    closed -> open: в скользящем окне доля ошибок (или медленных вызовов) выше порога;
+    open -> half_open: через open_seconds пропускается один пробный запрос;
+    half_open -> closed/open: по результату пробы.
+    Таймаут запроса подстраивается под p99 задержки успешных вызовов.
+
+    Каждая смена состояния начинает новое поколение; allow() выдаёт номер текущего,
+    и record()/release() с номером прошлого поколения игнорируются: поздний ответ
+    на запрос, начатый до размыкания, не закроет half-open и не продлит open.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, error_rate: float, open_seconds: float):
+        self.error_rate = error_rate
+        self.open_seconds = open_seconds
+        self.state = self.CLOSED
+        self._calls: deque = deque(maxlen=512)  # (ts, ok, latency)
+        self._opened_at = 0.0
+        self._generation = 1
+        self._probe_in_flight = False
+        self._timeout = _HTTP_TIMEOUT
+        self._timeout_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> Optional[int]:
+        """Номер поколения для record()/release(), если вызов разрешён, иначе None."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return self._generation
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    return None
+                self._set_state(self.HALF_OPEN)
+                self._probe_in_flight = False
+            if self._probe_in_flight:
+                return None
+            self._probe_in_flight = True
+            return self._generation
+
+    def record(self, ok: bool, latency: float, generation: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._calls.append((now, ok, latency))
+            if self.state == self.HALF_OPEN:
+                self._probe_in_flight = False
+                if ok:
+                    self._set_state(self.CLOSED)
+                    self._calls.clear()
+                else:
+                    self._open(now)
+                return
+
+            while self._calls and now - self._calls[0][0] > _BREAKER_WINDOW:
+                self._calls.popleft()
+            total = len(self._calls)
+            if total < _BREAKER_MIN_CALLS:
+                return
+            errors = sum(1 for _ts, call_ok, _lat in self._calls if not call_ok)
+            slow = sum(1 for _ts, _ok, lat in self._calls if lat >= _BREAKER_SLOW_CALL)
+            if errors / total >= self.error_rate or slow / total >= _BREAKER_SLOW_RATE:
+                self._open(now)
+
+    def release(self, generation: int) -> None:
+        """
+        Вызов, пропущенный allow(), закончился без record() (отмена, BaseException).
+        В half-open освобождает слот пробного запроса; в остальных состояниях ничего не делает.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN and generation == self._generation:
+                self._probe_in_flight = False
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        self._generation += 1
+
+    def _open(self, now: float) -> None:
+        self._set_state(self.OPEN)
+        self._opened_at = now
+
+    def timeout(self) -> float:
+        """
+        Адаптивный таймаут: 2 x p99 успешных вызовов в окне, в пределах
+        [_HTTP_TIMEOUT_MIN, _HTTP_TIMEOUT]; пересчитывается не чаще раза в секунду.
+        """
+        now = time.monotonic()
+        if now - self._timeout_at < 1.0:
+            return self._timeout
+        with self._lock:
+            latencies = sorted(lat for _ts, ok, lat in self._calls if ok)
+        if len(latencies) >= 20:
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            self._timeout = min(_HTTP_TIMEOUT, max(_HTTP_TIMEOUT_MIN, p99 * 2))
+        else:
+            self._timeout = _HTTP_TIMEOUT
+        self._timeout_at = now
+        return self._timeout
+
+
+_breaker: Optional[_CircuitBreaker] = None
+
+
+def _get_breaker() -> _CircuitBreaker:
+    global _breaker
+    if _breaker is None:
+        with _http_lock:
+            if _breaker is None:
+                _breaker = _CircuitBreaker(
+                    error_rate=_env_number("breaker_error_rate", _BREAKER_ERROR_RATE),
+                    open_seconds=_env_number("breaker_open_seconds", _BREAKER_OPEN_SECONDS),
+                )
+    return _breaker
+
+
+def _upstream_ok(status: int) -> bool:
+    """Для размыкателя ошибка — это 5xx/429; 4xx (например, неизвестный город) — нормальный ответ."""
+    return status < 500 and status != 429
+
+
 def _fetch_weather(api_entry_point: str, api_key: str, city: str) -> Tuple[bool, Dict]:
     """
     Делает запрос к погодному API. Возвращает (ok, data_or_error).
+    При разомкнутом размыкателе сразу возвращает ошибку circuit_open.
     """
+    query, name = _weather_query(city)
+    breaker = _get_breaker()
+    generation = breaker.allow()
+    if generation is None:
+        return False, {"error": "circuit_open"}
+
+    started = time.monotonic()
+    r = None
     try:
-        r = requests.get(
-            api_entry_point,
-            params={"q": city, "appid": api_key, "units": "metric", "lang": "en"},
-            timeout=6,
-        )
+        with _span("http"):
+            r = _get_http_session().get(
+                api_entry_point,
+                params={**query, "appid": api_key, "units": _UNITS, "lang": _LANG},
+                timeout=breaker.timeout(),
+            )
     except Exception as e:
+        breaker.record(False, time.monotonic() - started, generation)
         return False, {"error": f"request_error: {e!s}"}
+    finally:
+        if r is None:
+            breaker.release(generation)
+    breaker.record(_upstream_ok(r.status_code), time.monotonic() - started, generation)
 
     if r.status_code != 200:
         return False, {"error": f"api_status_{r.status_code}"}
 
-    try:
-        d = r.json()
-    except Exception:
-        return False, {"error": "invalid_json"}
+    with _span("decode"):
+        try:
+            d = r.json()
+        except Exception:
+            return False, {"error": "invalid_json"}
+        return _parse_weather(name, d)
 
+
+def _parse_weather(city: str, d: Dict) -> Tuple[bool, Dict]:
     temp = (d.get("main") or {}).get("temp")
     desc = (d.get("weather") or [{}])[0].get("description", "")
 
@@ -106,11 +646,416 @@ def _fetch_weather(api_entry_point: str, api_key: str, city: str) -> Tuple[bool,
     return True, {"city": city, "temp": temp, "description": desc}
 
 
+def _group_url(api_entry_point: str) -> str:
+    """
+    Адрес /group рядом с настроенной точкой входа: меняется только последний сегмент пути,
+    схема, хост, порт и query (например, токен прокси) остаются как в конфиге.
+    """
+    parts = urlsplit(api_entry_point)
+    base = parts.path.rstrip("/").rsplit("/", 1)[0]
+    return urlunsplit(parts._replace(path=base + "/group", fragment=""))
+
+
+def _fetch_group(api_entry_point: str, api_key: str, ids: List[int]) -> Dict[int, Tuple[bool, Dict]]:
+    """
+    Погода для нескольких городов одним запросом к /data/2.5/group (только по id).
+    При любой ошибке возвращает {} — вызывающий код опрашивает города по одному.
+    """
+    breaker = _get_breaker()
+    generation = breaker.allow() if ids else None
+    if generation is None:
+        return {}
+
+    name_by_id = _get_city_index().name_by_id
+    names = {city_id: name_by_id[city_id] for city_id in ids if city_id in name_by_id}
+    started = time.monotonic()
+    r = None
+    try:
+        r = _get_http_session().get(
+            _group_url(api_entry_point),
+            params={"id": ",".join(map(str, ids)), "appid": api_key, "units": _UNITS, "lang": _LANG},
+            timeout=breaker.timeout(),
+        )
+    except Exception:
+        breaker.record(False, time.monotonic() - started, generation)
+        return {}
+    finally:
+        if r is None:
+            breaker.release(generation)
+    breaker.record(_upstream_ok(r.status_code), time.monotonic() - started, generation)
+    if r.status_code != 200:
+        return {}
+
+    try:
+        items = r.json().get("list") or []
+    except Exception:
+        return {}
+
+    result: Dict[int, Tuple[bool, Dict]] = {}
+    for item in items:
+        city_id = item.get("id")
+        if city_id in names:
+            result[city_id] = _parse_weather(names[city_id], item)
+    return result
+
+
+# ---------------------------
+# async api calls (event bus)
+# ---------------------------
+
+# сессия aiohttp привязана к своему event loop: по одной на каждый живой loop
+_aio_sessions: Dict[asyncio.AbstractEventLoop, Any] = {}
+
+
+def _discard_aio_session(session) -> None:
+    """Сессия закрытого loop'а: await close() там уже невозможен — отцепляем и гасим транспорты синхронно."""
+    connector = session.connector
+    session.detach()
+    if connector is not None:
+        with contextlib.suppress(Exception):
+            connector._close()
+
+
+def _get_aio_session():
+    """
+    Общая aiohttp-сессия с пулом соединений для текущего event loop.
+    Сессии уже закрытых loop'ов освобождаются при следующем обращении.
+    """
+    loop = asyncio.get_running_loop()
+    session = _aio_sessions.get(loop)
+    if session is not None and not session.closed:
+        return session
+    with _http_lock:
+        for old_loop in [l for l in _aio_sessions if l.is_closed()]:
+            _discard_aio_session(_aio_sessions.pop(old_loop))
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit_per_host=int(_env_number("http_pool_size", _HTTP_POOL_SIZE)),
+                keepalive_timeout=_env_number("http_keepalive", _HTTP_KEEPALIVE),
+                ttl_dns_cache=300,
+            ),
+            timeout=aiohttp.ClientTimeout(total=_HTTP_TIMEOUT),
+        )
+        _aio_sessions[loop] = session
+        _close_at_exit()
+    return session
+
+
+async def _fetch_weather_async(api_entry_point: str, api_key: str, city: str) -> Tuple[bool, Dict]:
+    """
+    Асинхронный вариант _fetch_weather: не блокирует event loop шины.
+    """
+    if aiohttp is None:
+        return await asyncio.to_thread(_fetch_weather, api_entry_point, api_key, city)
+
+    query, name = _weather_query(city)
+    breaker = _get_breaker()
+    generation = breaker.allow()
+    if generation is None:
+        return False, {"error": "circuit_open"}
+
+    started = time.monotonic()
+    status = None
+    try:
+        session = _get_aio_session()
+        async with session.get(
+            api_entry_point,
+            params={**query, "appid": api_key, "units": _UNITS, "lang": _LANG},
+            timeout=aiohttp.ClientTimeout(total=breaker.timeout()),
+        ) as r:
+            status = r.status
+            latency = time.monotonic() - started
+            breaker.record(_upstream_ok(status), latency, generation)
+            _observe("http", latency)
+            if r.status != 200:
+                return False, {"error": f"api_status_{r.status}"}
+            with _span("decode"):
+                try:
+                    d = await r.json(content_type=None)
+                except Exception:
+                    return False, {"error": "invalid_json"}
+                return _parse_weather(name, d)
+    except Exception as e:
+        if status is None:
+            breaker.record(False, time.monotonic() - started, generation)
+        return False, {"error": f"request_error: {e!s}"}
+    finally:
+        if status is None:
+            # отмена (CancelledError) до ответа: иначе half-open навсегда ждёт результата пробы
+            breaker.release(generation)
+
+
+# ---------------------------
+# single-flight (coalescing)
+# ---------------------------
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _SingleFlight:
+    """
+    Склеивает одновременные вызовы с одинаковым ключом (потоки):
+    upstream-запрос делает только первый, остальные ждут и получают его результат или ошибку.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Any, _Call] = {}
+
+    def do(self, key: Any, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+
+class _AsyncSingleFlight:
+    """
+    То же для корутин: одна задача на ключ, ожидающие подключаются через shield,
+    поэтому отмена одного из ждущих не отменяет запрос для остальных.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Any, "asyncio.Future"] = {}
+
+    async def do(self, key: Any, fn: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        task = self._calls.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(fn(*args))
+            self._calls[key] = task
+            task.add_done_callback(lambda t, k=key: self._calls.pop(k, None) if self._calls.get(k) is t else None)
+        return await asyncio.shield(task)
+
+
+_flight = _SingleFlight()
+_aflight = _AsyncSingleFlight()
+
+
+# ---------------------------
+# response cache (TTL + LRU)
+# ---------------------------
+
+
+class _WeatherCache:
+    """
+    Потокобезопасный LRU-кэш успешных ответов погодного API.
+
+    Запись хранится ttl + max(stale_while_revalidate, stale_if_error) секунд,
+    решение «свежая/устаревшая» принимает вызывающий код по возрасту записи.
+    """
+
+    def __init__(self, ttl: float, stale_while_revalidate: float, stale_if_error: float, max_entries: int):
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_if_error = stale_if_error
+        self.max_entries = max(1, max_entries)
+        self._max_age = ttl + max(stale_while_revalidate, stale_if_error)
+        self._data: "OrderedDict[Tuple[str, str, str], Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # ключи, для которых уже идёт фоновое обновление (dict: `set` здесь — skill_memory.set)
+        self._refreshing: Dict[Tuple[str, str, str], bool] = {}
+
+    def get(self, key: Tuple[str, str, str]) -> Tuple[Optional[Dict], float]:
+        """
+        Возвращает (data, age). data=None, если записи нет или она протухла окончательно.
+        """
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None, 0.0
+            stored_at, data = item
+            age = now - stored_at
+            if age > self._max_age:
+                del self._data[key]
+                return None, 0.0
+            self._data.move_to_end(key)
+            return data, age
+
+    def put(self, key: Tuple[str, str, str], data: Dict) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic(), data)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def begin_refresh(self, key: Tuple[str, str, str]) -> bool:
+        """Помечает ключ как обновляемый; False — обновление уже идёт."""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing[key] = True
+            return True
+
+    def end_refresh(self, key: Tuple[str, str, str]) -> None:
+        with self._lock:
+            self._refreshing.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_cache: Optional[_WeatherCache] = None
+_cache_lock = threading.Lock()
+
+
+def _get_cache() -> _WeatherCache:
+    """
+    Ленивая инициализация кэша; параметры берутся из env:
+    cache_ttl, cache_stale_while_revalidate, cache_stale_if_error, cache_max_entries.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = _WeatherCache(
+                    ttl=_env_number("cache_ttl", _CACHE_TTL),
+                    stale_while_revalidate=_env_number("cache_stale_while_revalidate", _CACHE_STALE_WHILE_REVALIDATE),
+                    stale_if_error=_env_number("cache_stale_if_error", _CACHE_STALE_IF_ERROR),
+                    max_entries=int(_env_number("cache_max_entries", _CACHE_MAX_ENTRIES)),
+                )
+    return _cache
+
+
+def _cache_key(city: str) -> Tuple[str, str, str]:
+    """Известные города кэшируются по id, поэтому «Москва», «moscow» и «MOSCOW » делят одну запись."""
+    match = _lookup_city(city)
+    if match is not None:
+        return f"id:{match.id}", _UNITS, _LANG
+    return normalize_city(city), _UNITS, _LANG
+
+
+def _revalidate(cache: _WeatherCache, key: Tuple[str, str, str], api_entry_point: str, api_key: str, city: str) -> None:
+    try:
+        ok, data = _flight.do(key, _fetch_weather, api_entry_point, api_key, city)
+        if ok:
+            cache.put(key, data)
+    finally:
+        cache.end_refresh(key)
+
+
+def _get_weather(api_entry_point: str, api_key: str, city: str) -> Tuple[bool, Dict]:
+    """
+    Обёртка над _fetch_weather с кэшем и склейкой одновременных запросов:
+    - свежая запись отдаётся без сети;
+    - устаревшая (в окне stale_while_revalidate) отдаётся сразу, обновление идёт в фоне;
+    - при ошибке API отдаётся устаревшая запись (в окне stale_if_error), если она есть.
+    """
+    cache = _get_cache()
+    with _span("cache"):
+        key = _cache_key(city)
+        cached, age = cache.get(key)
+    if cached is not None:
+        if age <= cache.ttl:
+            return True, cached
+        if age <= cache.ttl + cache.stale_while_revalidate:
+            if cache.begin_refresh(key):
+                threading.Thread(
+                    target=_revalidate,
+                    args=(cache, key, api_entry_point, api_key, city),
+                    daemon=True,
+                ).start()
+            return True, cached
+
+    ok, data = _flight.do(key, _fetch_weather, api_entry_point, api_key, city)
+    if ok:
+        cache.put(key, data)
+        return ok, data
+    if cached is not None and age <= cache.ttl + cache.stale_if_error:
+        return True, cached
+    return ok, data
+
+
+_revalidate_tasks: Dict[Tuple[str, str, str], "asyncio.Task"] = {}
+
+
+async def _revalidate_async(cache: _WeatherCache, key: Tuple[str, str, str], api_entry_point: str, api_key: str, city: str) -> None:
+    try:
+        ok, data = await _aflight.do(key, _fetch_weather_async, api_entry_point, api_key, city)
+        if ok:
+            cache.put(key, data)
+    finally:
+        cache.end_refresh(key)
+        _revalidate_tasks.pop(key, None)
+
+
+async def _get_weather_async(api_entry_point: str, api_key: str, city: str) -> Tuple[bool, Dict]:
+    """
+    То же, что _get_weather, но для асинхронных обработчиков шины.
+    """
+    cache = _get_cache()
+    with _span("cache"):
+        key = _cache_key(city)
+        cached, age = cache.get(key)
+    if cached is not None:
+        if age <= cache.ttl:
+            return True, cached
+        if age <= cache.ttl + cache.stale_while_revalidate:
+            if cache.begin_refresh(key):
+                _revalidate_tasks[key] = asyncio.create_task(_revalidate_async(cache, key, api_entry_point, api_key, city))
+            return True, cached
+
+    ok, data = await _aflight.do(key, _fetch_weather_async, api_entry_point, api_key, city)
+    if ok:
+        cache.put(key, data)
+        return ok, data
+    if cached is not None and age <= cache.ttl + cache.stale_if_error:
+        return True, cached
+    return ok, data
+
+
 # ---------------------------
 # primary entrypoints
 # ---------------------------
 
 
+def _ensure_skill_ctx() -> None:
+    """Выставляет контекст навыка, только если текущий навык — не weather_skill."""
+    try:
+        if getattr(get_current_skill(), "name", None) == "weather_skill":
+            return
+    except Exception:
+        pass
+    ctx = get_ctx()
+    ctx.skill_ctx.set("weather_skill", ctx.paths.skills_dir() / "weather_skill")
+
+
+def _t(key: str, **kwargs) -> str:
+    with _span("i18n"):
+        return _(key, **kwargs)
+
+
+async def _notify(evt, text: str) -> None:
+    with _span("emit"):
+        await emit("ui.notify", {"text": text}, actor=evt.actor, source="weather_skill", trace_id=evt.trace_id)
+
+
 def handle(topic: str, payload: dict):
     """
     Унифицированная точка входа для локального запуска навыка:
@@ -120,24 +1065,30 @@ def handle(topic: str, payload: dict):
       - topic: строка события/интента
       - payload: словарь с возможным ключом "city"
     """
-    get_ctx().skill_ctx.set("weather_skill", get_ctx().paths.skills_dir() / "weather_skill")
-    api_key, api_entry_point, default_city = _load_and_cache_config()
+    with _entry_span("handle"):
+        _handle(payload)
+
+
+def _handle(payload: dict) -> None:
+    with _span("config"):
+        _ensure_skill_ctx()
+        api_key, api_entry_point, default_city, _batch = _get_config()
     if not api_key:
-        output(_("prep.weather.missing_key"))
+        output(_t("prep.weather.missing_key"))
         return
 
     city = _resolve_city((payload or {}).get("city"))
     if not city:
         # нет города — сообщим и выйдем
-        output(_("prep.weather.api_error", city=""))
+        output(_t("prep.weather.api_error", city=""))
         return
 
-    ok, data = _fetch_weather(api_entry_point, api_key, city)
+    ok, data = _get_weather(api_entry_point, api_key, city)
     if not ok:
-        output(_("prep.weather.api_error", city=city))
+        output(_t("prep.weather.api_error", city=city))
         return
 
-    output(_("prep.weather.success", city=data["city"], temp=data["temp"], description=data["description"]))
+    output(_t("prep.weather.success", city=data["city"], temp=data["temp"], description=data["description"]))
 
 
 # Back-compat: если кто-то всё ещё вызывает старую сигнатуру
@@ -153,7 +1104,13 @@ def handle_intent(intent: str, entities: dict):
 # инструмент для LLM (/api/tools/call)
 @tool("get_weather")
 def get_weather(city: str) -> dict:
-    api_key, api_entry_point, default_city = _load_and_cache_config()
+    with _entry_span("get_weather"):
+        return _get_weather_tool(city)
+
+
+def _get_weather_tool(city: str) -> dict:
+    with _span("config"):
+        api_key, api_entry_point, default_city, _batch = _get_config()
 
     if not api_key or not api_entry_point:
         return {"ok": False, "error": "missing api config"}
@@ -162,50 +1119,99 @@ def get_weather(city: str) -> dict:
     if not city:
         return {"ok": False, "error": "missing city"}
 
-    ok, data = _fetch_weather(api_entry_point, api_key, city)
+    ok, data = _get_weather(api_entry_point, api_key, city)
     if not ok:
         return {"ok": False, **data}
 
     return {"ok": True, **data}
 
 
+# пакетный инструмент для LLM: несколько городов за один вызов
+@tool("get_weather_many")
+def get_weather_many(cities: List[str]) -> dict:
+    api_key, api_entry_point, _default_city, batch_concurrency = _get_config()
+
+    if not api_key or not api_entry_point:
+        return {"ok": False, "error": "missing api config"}
+
+    # строка — тоже последовательность: без проверки "Berlin" разошёлся бы на 6 «городов»
+    if not isinstance(cities, (list, tuple)) or not all(isinstance(city, str) for city in cities):
+        return {"ok": False, "error": "cities must be a list of strings"}
+    if len(cities) > _BATCH_MAX_CITIES:
+        return {"ok": False, "error": f"too many cities (max {_BATCH_MAX_CITIES})"}
+
+    # дедупликация по ключу кэша с сохранением порядка
+    unique: Dict[Tuple[str, str, str], str] = {}
+    for city in cities:
+        if city.strip():
+            unique.setdefault(_cache_key(city), city.strip())
+    if not unique:
+        return {"ok": False, "error": "missing city"}
+
+    names = list(unique.values())
+    answers: Dict[str, Tuple[bool, Dict]] = {}
+
+    # свежие записи — из кэша; известные города без свежей записи — одним запросом /group
+    cache = _get_cache()
+    by_id: Dict[int, str] = {}
+    for city in names:
+        cached, age = cache.get(_cache_key(city))
+        if cached is not None and age <= cache.ttl:
+            answers[city] = (True, cached)
+            continue
+        match = _lookup_city(city)
+        if match is not None:
+            by_id[match.id] = city
+    if len(by_id) > 1:
+        ids = list(by_id)
+        for i in range(0, len(ids), _GROUP_MAX_IDS):
+            for city_id, (ok, data) in _fetch_group(api_entry_point, api_key, ids[i : i + _GROUP_MAX_IDS]).items():
+                if ok:
+                    cache.put(_cache_key(by_id[city_id]), data)
+                    answers[by_id[city_id]] = (ok, data)
+
+    # остальное — параллельно по одному городу
+    rest = [city for city in names if city not in answers]
+    if rest:
+        workers = max(1, min(batch_concurrency, len(rest)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="weather_batch") as pool:
+            for city, answer in zip(rest, pool.map(lambda c: _get_weather(api_entry_point, api_key, c), rest)):
+                answers[city] = answer
+
+    results = []
+    for city in names:
+        ok, data = answers[city]
+        if ok:
+            results.append({"ok": True, **data})
+        else:
+            results.append({"ok": False, "city": city, **data})
+    return {"ok": True, "results": results}
+
+
 # подписка на событие: nlp.intent.weather.get
 @subscribe("nlp.intent.weather.get")
 async def on_weather_intent(evt):
-    api_key, api_entry_point, _ = _load_and_cache_config()
+    with _entry_span("on_weather_intent", evt.trace_id):
+        await _on_weather_intent(evt)
+
+
+async def _on_weather_intent(evt) -> None:
+    with _span("config"):
+        api_key, api_entry_point, _default_city, _batch = _get_config()
     if not api_key or not api_entry_point:
-        await emit(
-            "ui.notify",
-            {"text": _("prep.weather.missing_key")},
-            actor=evt.actor,
-            source="weather_skill",
-            trace_id=evt.trace_id,
-        )
+        await _notify(evt, _t("prep.weather.missing_key"))
         return
 
     city = _resolve_city((evt.payload or {}).get("city"))
     if not city:
-        await emit(
-            "ui.notify",
-            {"text": _("prep.weather.api_error", city="")},
-            actor=evt.actor,
-            source="weather_skill",
-            trace_id=evt.trace_id,
-        )
+        await _notify(evt, _t("prep.weather.api_error", city=""))
         return
 
-    ok, data = _fetch_weather(api_entry_point, api_key, city)
+    ok, data = await _get_weather_async(api_entry_point, api_key, city)
     if ok:
-        msg = _("prep.weather.success", city=data["city"], temp=data["temp"], description=data["description"])
-        await emit("ui.notify", {"text": msg}, actor=evt.actor, source="weather_skill", trace_id=evt.trace_id)
+        await _notify(evt, _t("prep.weather.success", city=data["city"], temp=data["temp"], description=data["description"]))
     else:
-        await emit(
-            "ui.notify",
-            {"text": _("prep.weather.api_error", city=city)},
-            actor=evt.actor,
-            source="weather_skill",
-            trace_id=evt.trace_id,
-        )
+        await _notify(evt, _t("prep.weather.api_error", city=city))
 
 
 def lang_res() -> Dict[str, str]:
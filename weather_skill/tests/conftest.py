@@ -1,5 +1,10 @@
 # src/adaos/skills/weather_skill/tests/conftest.py
+import importlib
+import importlib.machinery
+import importlib.util
 import shutil
+import sys
+import time
 from pathlib import Path
 import pytest
 
@@ -13,3 +18,38 @@ def skill_root(tmp_path: Path) -> Path:
     tmp_skill = tmp_path / "weather_skill"
     shutil.copytree(here, tmp_skill, dirs_exist_ok=True)
     return tmp_skill
+
+
+class FakeClock:
+    """Подменяет модуль time в обработчике: monotonic() двигается только через advance()."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+        self.perf_counter = time.perf_counter
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture(scope="module")
+def weather():
+    """handlers/main.py навыка, загруженный отдельным модулем (нужен AdaOS SDK)."""
+    pytest.importorskip("adaos.sdk.core.decorators", reason="weather_skill handlers need the AdaOS SDK")
+    here = Path(__file__).resolve().parents[1]
+    # handlers/ — пакет: main.py импортирует city_slot относительно
+    spec = importlib.machinery.ModuleSpec("weather_skill_test", None, is_package=True)
+    spec.submodule_search_locations = [str(here / "handlers")]
+    sys.modules["weather_skill_test"] = importlib.util.module_from_spec(spec)
+    module = importlib.import_module("weather_skill_test.main")
+    yield module
+    module.shutdown()
+
+
+@pytest.fixture
+def clock(weather, monkeypatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(weather, "time", fake)
+    return fake
@@ -0,0 +1,209 @@
+# src/adaos/skills/weather_skill/tests/loadgen.py
+"""
+Генератор нагрузки для weather_skill: гоняет handle / get_weather / on_weather_intent
+против локальной заглушки OWM (owm_stub.py) с заданной частотой и печатает
+p50/p95/p99, пропускную способность и число upstream-вызовов.
+
+    python loadgen.py --rate 200 --duration 5 --cities 10 --latency-ms 40
+
+Работает офлайн; для CI есть пороги --max-p99-ms и --max-upstream-calls
+(при нарушении — код возврата 1).
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import math
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from owm_stub import OWMStub  # noqa: E402
+
+SKILL_DIR = Path(__file__).resolve().parents[1]  # weather_skill/
+ENTRIES = ("handle", "get_weather", "on_weather_intent")
+
+
+def load_skill(skill_dir: Path = SKILL_DIR) -> types.ModuleType:
+    spec = importlib.util.spec_from_file_location("weather_skill_loadgen_main", skill_dir / "handlers" / "main.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def prepare_skill(skill: types.ModuleType, api_entry_point: str) -> None:
+    """
+    Направляет навык на заглушку: фиксируем снимок конфига (без чтения env с диска),
+    глушим вывод и публикацию в шину, сбрасываем кэш и размыкатель.
+    """
+    try:
+        skill._ensure_skill_ctx()
+    except Exception:
+        pass
+    skill._config = skill._Config(
+        api_key="loadgen",
+        api_entry_point=api_entry_point,
+        default_city="Moscow",
+        batch_concurrency=skill._BATCH_CONCURRENCY,
+    )
+    skill._config_checked_at = math.inf
+    skill.output = lambda txt: None
+
+    async def _emit(*args, **kwargs):
+        return None
+
+    skill.emit = _emit
+    skill._get_cache().clear()
+    skill._breaker = None
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(math.ceil(q * len(ordered))) - 1)]
+
+
+def _run_sync(call: Callable[[str], object], cities: List[str], rate: float, duration: float, workers: int) -> Dict:
+    """
+    Открытая модель нагрузки: запросы ставятся по расписанию независимо от ответов,
+    задержка считается от запланированного момента (учитывает ожидание в очереди).
+    """
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    total = int(rate * duration)
+
+    def one(i: int, scheduled: float) -> None:
+        try:
+            call(cities[i % len(cities)])
+        except Exception:
+            with lock:
+                errors[0] += 1
+        elapsed = time.perf_counter() - scheduled
+        with lock:
+            latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="loadgen") as pool:
+        for i in range(total):
+            scheduled = start + i / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(one, i, scheduled)
+    wall = time.perf_counter() - start
+    return {"latencies": latencies, "errors": errors[0], "wall": wall}
+
+
+def _run_async(call: Callable[[str], object], cities: List[str], rate: float, duration: float, cleanup=None) -> Dict:
+    latencies: List[float] = []
+    errors = [0]
+    total = int(rate * duration)
+
+    async def one(i: int, scheduled: float) -> None:
+        try:
+            await call(cities[i % len(cities)])
+        except Exception:
+            errors[0] += 1
+        latencies.append(time.perf_counter() - scheduled)
+
+    async def drive() -> float:
+        start = time.perf_counter()
+        tasks = []
+        for i in range(total):
+            scheduled = start + i / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(i, scheduled)))
+        await asyncio.gather(*tasks)
+        wall = time.perf_counter() - start
+        if cleanup is not None:
+            await cleanup()
+        return wall
+
+    wall = asyncio.run(drive())
+    return {"latencies": latencies, "errors": errors[0], "wall": wall}
+
+
+def run_entry(skill: types.ModuleType, entry: str, stub: OWMStub, args: argparse.Namespace) -> Dict:
+    cities = [f"City{i}" for i in range(args.cities)]
+    prepare_skill(skill, stub.url)
+    stub.reset()
+
+    if entry == "handle":
+        stats = _run_sync(lambda c: skill.handle("nlp.intent.weather.get", {"city": c}), cities, args.rate, args.duration, args.workers)
+    elif entry == "get_weather":
+        stats = _run_sync(skill.get_weather, cities, args.rate, args.duration, args.workers)
+    else:
+        counter = iter(range(1 << 62))
+
+        def call(c: str):
+            evt = types.SimpleNamespace(actor="loadgen", trace_id=f"loadgen-{next(counter)}", payload={"city": c})
+            return skill.on_weather_intent(evt)
+
+        async def close_session():
+            # aiohttp-сессия привязана к циклу, который закроется вместе с asyncio.run
+            if skill._aio_session is not None:
+                await skill._aio_session.close()
+
+        stats = _run_async(call, cities, args.rate, args.duration, cleanup=close_session)
+
+    lat = stats["latencies"]
+    return {
+        "entry": entry,
+        "requests": len(lat),
+        "errors": stats["errors"],
+        "throughput_rps": round(len(lat) / stats["wall"], 1) if stats["wall"] else 0.0,
+        "p50_ms": round(percentile(lat, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(lat, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(lat, 0.99) * 1000, 3),
+        "upstream_calls": stub.calls,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="weather_skill load generator")
+    parser.add_argument("--entry", choices=ENTRIES + ("all",), default="all")
+    parser.add_argument("--rate", type=float, default=100.0, help="requests per second")
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per entry point")
+    parser.add_argument("--workers", type=int, default=32, help="threads for sync entry points")
+    parser.add_argument("--cities", type=int, default=5, help="distinct cities in rotation")
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="stub upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--json", action="store_true", help="print reports as JSON lines")
+    parser.add_argument("--max-p99-ms", type=float, help="fail if any entry's p99 exceeds this")
+    parser.add_argument("--max-upstream-calls", type=int, help="fail if any entry makes more upstream calls")
+    args = parser.parse_args(argv)
+
+    skill = load_skill()
+    entries = ENTRIES if args.entry == "all" else (args.entry,)
+    failed = False
+    with OWMStub(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000, error_rate=args.error_rate, seed=1) as stub:
+        for entry in entries:
+            report = run_entry(skill, entry, stub, args)
+            if args.json:
+                print(json.dumps(report))
+            else:
+                print(
+                    f"{entry:<18} n={report['requests']:<6} err={report['errors']:<4} "
+                    f"rps={report['throughput_rps']:<8} p50={report['p50_ms']}ms p95={report['p95_ms']}ms "
+                    f"p99={report['p99_ms']}ms upstream={report['upstream_calls']}"
+                )
+            if args.max_p99_ms is not None and report["p99_ms"] > args.max_p99_ms:
+                failed = True
+            if args.max_upstream_calls is not None and report["upstream_calls"] > args.max_upstream_calls:
+                failed = True
+    skill.shutdown()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
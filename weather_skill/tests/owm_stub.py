@@ -0,0 +1,176 @@
+# src/adaos/skills/weather_skill/tests/owm_stub.py
+"""
+Локальная заглушка OpenWeatherMap `/data/2.5/weather` (и `/data/2.5/group`) для офлайн-прогонов и бенчмарков.
+
+    with OWMStub(latency=0.05, error_rate=0.1) as stub:
+        ...  # api_entry_point = stub.url
+        print(stub.calls)
+
+Или отдельным процессом:
+    python owm_stub.py --port 8081 --latency-ms 50 --error-rate 0.1
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+WEATHER_PATH = "/data/2.5/weather"
+GROUP_PATH = "/data/2.5/group"
+
+
+def default_payload(city: str) -> Dict:
+    return {
+        "name": city,
+        "main": {"temp": 12.5, "humidity": 60},
+        "weather": [{"main": "Clouds", "description": "overcast clouds"}],
+    }
+
+
+class OWMStub:
+    """
+    HTTP-заглушка с настраиваемой задержкой, долей ошибок и телом ответа.
+
+    latency     — базовая задержка ответа, сек;
+    jitter      — случайная добавка к задержке, сек (равномерно 0..jitter);
+    error_rate  — доля ответов 500;
+    payload     — фиксированное тело ответа (dict) вместо default_payload(city);
+    unknown     — города, на которые отвечаем 404.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        payload: Optional[Dict] = None,
+        unknown: tuple = ("nowhere",),
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.payload = payload
+        self.unknown = {c.casefold() for c in unknown}
+        self.calls = 0
+        self.calls_by_city: Dict[str, int] = {}
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{WEATHER_PATH}"
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls = 0
+            self.calls_by_city.clear()
+
+    def start(self) -> "OWMStub":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="owm_stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "OWMStub":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _respond(self, query: Dict[str, list]) -> tuple:
+        city = (query.get("q") or query.get("id") or [""])[0]
+        with self._lock:
+            self.calls += 1
+            self.calls_by_city[city] = self.calls_by_city.get(city, 0) + 1
+            delay = self.latency + (self._rnd.uniform(0, self.jitter) if self.jitter else 0.0)
+            failed = self.error_rate > 0 and self._rnd.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        if failed:
+            return 500, {"cod": 500, "message": "stub error"}
+        if not city or city.casefold() in self.unknown:
+            return 404, {"cod": "404", "message": "city not found"}
+        return 200, self.payload if self.payload is not None else default_payload(city)
+
+    def _respond_group(self, query: Dict[str, list]) -> tuple:
+        ids = [i for i in (query.get("id") or [""])[0].split(",") if i]
+        status, body = self._respond({"id": [",".join(ids)]})
+        if status != 200:
+            return status, body
+        items = [{**(self.payload if self.payload is not None else default_payload(i)), "id": int(i)} for i in ids if i.isdigit()]
+        return 200, {"cnt": len(items), "list": items}
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, как у настоящего API
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == WEATHER_PATH:
+                    status, body = stub._respond(parse_qs(url.query))
+                elif url.path == GROUP_PATH:
+                    status, body = stub._respond_group(parse_qs(url.query))
+                else:
+                    status, body = 404, {"cod": "404", "message": "not found"}
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local OpenWeatherMap stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payload", help="JSON file with a fixed response body")
+    args = parser.parse_args()
+
+    payload = None
+    if args.payload:
+        with open(args.payload, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+
+    stub = OWMStub(
+        host=args.host,
+        port=args.port,
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        payload=payload,
+    )
+    print(f"OWM stub listening on {stub.url}")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
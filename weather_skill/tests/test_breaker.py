@@ -0,0 +1,159 @@
+# weather_skill/tests/test_breaker.py
+import pytest
+
+
+@pytest.fixture
+def breaker(weather, clock):
+    return weather._CircuitBreaker(error_rate=0.5, open_seconds=30.0)
+
+
+def _fill(breaker, clock, ok, count, latency=0.1):
+    for _ in range(count):
+        generation = breaker.allow()
+        assert generation is not None
+        breaker.record(ok, latency, generation)
+        clock.advance(0.1)
+
+
+def test_stays_closed_below_min_calls(weather, breaker, clock):
+    _fill(breaker, clock, False, weather._BREAKER_MIN_CALLS - 1)
+    assert breaker.state == breaker.CLOSED
+
+
+def test_opens_on_error_rate(weather, breaker, clock):
+    _fill(breaker, clock, True, 5)
+    _fill(breaker, clock, False, 5)
+    assert breaker.state == breaker.OPEN
+    assert not breaker.allow()
+
+
+def test_opens_on_slow_calls(weather, breaker, clock):
+    _fill(breaker, clock, True, weather._BREAKER_MIN_CALLS, latency=weather._BREAKER_SLOW_CALL)
+    assert breaker.state == breaker.OPEN
+
+
+def test_old_calls_leave_the_window(weather, breaker, clock):
+    _fill(breaker, clock, False, 4)
+    clock.advance(weather._BREAKER_WINDOW + 1)
+    _fill(breaker, clock, True, weather._BREAKER_MIN_CALLS)
+    assert breaker.state == breaker.CLOSED
+
+
+def _open(weather, breaker, clock):
+    _fill(breaker, clock, False, weather._BREAKER_MIN_CALLS)
+    assert breaker.state == breaker.OPEN
+
+
+def test_half_open_lets_one_probe_through(weather, breaker, clock):
+    _open(weather, breaker, clock)
+    clock.advance(29)
+    assert not breaker.allow()
+    clock.advance(2)
+    assert breaker.allow()
+    assert breaker.state == breaker.HALF_OPEN
+    assert not breaker.allow()  # only one probe at a time
+
+
+def test_successful_probe_closes(weather, breaker, clock):
+    _open(weather, breaker, clock)
+    clock.advance(31)
+    probe = breaker.allow()
+    breaker.record(True, 0.1, probe)
+    assert breaker.state == breaker.CLOSED
+    _fill(breaker, clock, False, weather._BREAKER_MIN_CALLS - 1)  # the old window was cleared
+    assert breaker.state == breaker.CLOSED
+
+
+def test_failed_probe_reopens(weather, breaker, clock):
+    _open(weather, breaker, clock)
+    clock.advance(31)
+    probe = breaker.allow()
+    breaker.record(False, 0.1, probe)
+    assert breaker.state == breaker.OPEN
+    clock.advance(29)
+    assert not breaker.allow()  # open_seconds counts from the failed probe
+
+
+def test_release_frees_an_abandoned_probe(weather, breaker, clock):
+    _open(weather, breaker, clock)
+    clock.advance(31)
+    probe = breaker.allow()
+    breaker.release(probe)  # the probe was cancelled before record()
+    assert breaker.state == breaker.HALF_OPEN
+    assert breaker.allow()
+
+
+def test_late_outcome_from_before_opening_is_ignored(weather, breaker, clock):
+    stale = breaker.allow()  # the request started while the breaker was closed
+    _open(weather, breaker, clock)
+    clock.advance(20)
+    breaker.record(False, 0.1, stale)
+    clock.advance(11)
+    assert breaker.allow() is not None  # a late failure did not extend OPEN
+
+    breaker.record(True, 0.1, stale)
+    assert breaker.state == breaker.HALF_OPEN  # nor did a late success close HALF_OPEN
+    assert breaker.allow() is None  # the real probe is still in flight
+
+
+def test_late_release_does_not_free_a_newer_probe(weather, breaker, clock):
+    _open(weather, breaker, clock)
+    clock.advance(31)
+    first = breaker.allow()
+    breaker.record(False, 0.1, first)
+    clock.advance(31)
+    probe = breaker.allow()
+    assert probe != first
+    breaker.release(first)
+    assert breaker.allow() is None  # only the current probe may free its slot
+    breaker.record(True, 0.1, probe)
+    assert breaker.state == breaker.CLOSED
+
+
+def test_release_outside_half_open_is_a_noop(weather, breaker, clock):
+    breaker.release(breaker.allow())
+    assert breaker.state == breaker.CLOSED
+    assert breaker.allow()
+
+
+def test_adaptive_timeout(weather, breaker, clock):
+    assert breaker.timeout() == weather._HTTP_TIMEOUT  # too few samples
+    _fill(breaker, clock, True, 20, latency=1.5)
+    clock.advance(1)
+    assert breaker.timeout() == pytest.approx(3.0)  # 2 x p99
+    clock.advance(weather._BREAKER_WINDOW)  # slow samples leave the window
+    _fill(breaker, clock, True, 20, latency=0.01)
+    clock.advance(1)
+    assert breaker.timeout() == weather._HTTP_TIMEOUT_MIN
+
+
+@pytest.mark.parametrize("status, ok", [(200, True), (404, True), (429, False), (500, False), (503, False)])
+def test_upstream_ok(weather, status, ok):
+    assert weather._upstream_ok(status) is ok
+
+
+def test_fetch_short_circuits_when_open(weather, breaker, clock, monkeypatch):
+    monkeypatch.setattr(weather, "_breaker", breaker)
+    _open(weather, breaker, clock)
+
+    def no_network():
+        raise AssertionError("the session must not be used while the breaker is open")
+
+    monkeypatch.setattr(weather, "_get_http_session", no_network)
+    assert weather._fetch_weather("http://owm.invalid", "key", "Tomsk") == (False, {"error": "circuit_open"})
+
+
+def test_fetch_releases_probe_on_base_exception(weather, breaker, clock, monkeypatch):
+    monkeypatch.setattr(weather, "_breaker", breaker)
+    _open(weather, breaker, clock)
+    clock.advance(31)
+
+    class Session:
+        def get(self, *args, **kwargs):
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(weather, "_get_http_session", Session)
+    with pytest.raises(KeyboardInterrupt):
+        weather._fetch_weather("http://owm.invalid", "key", "Tomsk")
+    assert breaker.state == breaker.HALF_OPEN
+    assert breaker.allow()
@@ -0,0 +1,21 @@
+# weather_skill/tests/test_city_query.py
+import pytest
+
+
+@pytest.mark.parametrize(
+    "city, query, name",
+    [
+        ("Москва", {"id": "524901"}, "Moscow"),
+        ("в Нижнем Новгороде", {"id": "520555"}, "Nizhniy Novgorod"),
+        ("Новосибирк", {"id": "1496747"}, "Novosibirsk"),  # одна опечатка, один кандидат
+        ("Томск", {"q": "Томск"}, "Томск"),  # в одной правке от «Омск», но слишком коротко
+        ("murich", {"q": "murich"}, "murich"),  # Munich или Zurich — не угадываем
+        ("Paris, Texas", {"q": "Paris, Texas"}, "Paris, Texas"),
+    ],
+)
+def test_weather_query(weather, city, query, name):
+    assert weather._weather_query(city) == (query, name)
+
+
+def test_typo_shares_the_cache_entry(weather):
+    assert weather._cache_key("Новосибирк") == weather._cache_key("Новосибирск")
@@ -0,0 +1,77 @@
+# weather_skill/tests/test_config_snapshot.py
+import json
+import os
+import types
+
+import pytest
+
+
+@pytest.fixture
+def skill(weather, clock, tmp_path, monkeypatch):
+    """Навык во временной папке; _load_and_cache_config читает ключ из prep_result.json и считает загрузки."""
+    (tmp_path / "prep").mkdir()
+    monkeypatch.setattr(weather, "get_current_skill", lambda: types.SimpleNamespace(path=tmp_path))
+    monkeypatch.setattr(weather, "_config", None)
+    monkeypatch.setattr(weather, "_config_stamp", None)
+    monkeypatch.setattr(weather, "_config_checked_at", 0.0)
+    loads = []
+
+    def load():
+        loads.append(True)
+        path = tmp_path / "prep" / "prep_result.json"
+        key = json.loads(path.read_text(encoding="utf-8"))["api_key"] if path.exists() else None
+        return key, "https://owm.invalid/data/2.5/weather", "Moscow"
+
+    monkeypatch.setattr(weather, "_load_and_cache_config", load)
+    return types.SimpleNamespace(root=tmp_path, loads=loads)
+
+
+def write_result(root, key, like=None):
+    """Как prep: новый файл рядом и os.replace. like — скопировать mtime, чтобы отличался только inode."""
+    tmp = root / "prep" / "prep_result.running.json"
+    tmp.write_text(json.dumps({"api_key": key}), encoding="utf-8")
+    if like is not None:
+        os.utime(tmp, ns=(like.st_atime_ns, like.st_mtime_ns))
+    os.replace(tmp, root / "prep" / "prep_result.json")
+
+
+def test_stamp_tracks_both_sources(weather, skill):
+    assert weather._config_stamp_now() == (None, None)
+    write_result(skill.root, "k1")
+    env_stamp, prep_stamp = weather._config_stamp_now()
+    st = (skill.root / "prep" / "prep_result.json").stat()
+    assert env_stamp is None and prep_stamp == (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def test_config_is_reread_only_after_a_change(weather, skill, clock):
+    write_result(skill.root, "k1")
+    assert weather._get_config().api_key == "k1"
+
+    clock.advance(weather._CONFIG_CHECK_INTERVAL / 2)
+    write_result(skill.root, "k2")
+    assert weather._get_config().api_key == "k1"  # диск не проверяется чаще интервала
+
+    clock.advance(weather._CONFIG_CHECK_INTERVAL)
+    assert weather._get_config().api_key == "k2"
+    clock.advance(weather._CONFIG_CHECK_INTERVAL)
+    assert weather._get_config().api_key == "k2"
+    assert len(skill.loads) == 2  # без изменений файл не перечитывается
+
+
+def test_replaced_file_with_same_mtime_and_size_is_noticed(weather, skill, clock):
+    write_result(skill.root, "k1")
+    assert weather._get_config().api_key == "k1"
+
+    before = (skill.root / "prep" / "prep_result.json").stat()
+    write_result(skill.root, "k2", like=before)
+    after = (skill.root / "prep" / "prep_result.json").stat()
+    assert (after.st_mtime_ns, after.st_size) == (before.st_mtime_ns, before.st_size)
+
+    clock.advance(weather._CONFIG_CHECK_INTERVAL)
+    assert weather._get_config().api_key == "k2"  # новый inode — новый конфиг
+
+
+def test_snapshot_is_immutable(weather, skill):
+    config = weather._get_config()
+    with pytest.raises(AttributeError):
+        config.api_key = "other"
@@ -0,0 +1,68 @@
+# weather_skill/tests/test_http_sessions.py
+import asyncio
+
+import pytest
+
+
+class FakeAtexit:
+    """Подменяет atexit в обработчике: хранит зарегистрированные функции списком."""
+
+    def __init__(self):
+        self.hooks = []
+
+    def register(self, func):
+        self.hooks.append(func)
+
+    def unregister(self, func):
+        self.hooks = [f for f in self.hooks if f != func]
+
+
+def test_shutdown_drops_the_atexit_hook(weather, monkeypatch):
+    weather.shutdown()
+    fake = FakeAtexit()
+    monkeypatch.setattr(weather, "atexit", fake)
+
+    weather._get_http_session()
+    weather._get_http_session()
+    assert fake.hooks == [weather.shutdown]  # одна регистрация, сколько бы раз ни брали сессию
+
+    weather.shutdown()
+    assert fake.hooks == []  # выгруженный при перезагрузке модуль не держится atexit'ом
+
+
+def test_one_aio_session_per_loop(weather):
+    pytest.importorskip("aiohttp")
+    weather.shutdown()
+
+    async def take_twice():
+        return weather._get_aio_session(), weather._get_aio_session()
+
+    first, again = asyncio.run(take_twice())
+    assert first is again  # внутри одного loop'а сессия общая
+    assert not first.closed
+
+    second, _ = asyncio.run(take_twice())
+    assert second is not first  # сессия другого loop'а к нему не привязывается
+    # сессия закрытого loop'а освобождена при следующем обращении
+    assert first.closed
+    assert list(weather._aio_sessions.values()) == [second]
+
+    weather.shutdown()
+    assert second.closed and weather._aio_sessions == {}
+
+
+def test_pooled_session_retries_only_statuses(weather):
+    weather.shutdown()
+    session = weather._get_http_session()
+    assert session is weather._get_http_session()
+
+    adapter = session.get_adapter("https://api.openweathermap.org/data/2.5/weather")
+    assert adapter is session.get_adapter("http://owm.invalid/")  # один пул на обе схемы
+    retry = adapter.max_retries
+    # таймауты соединения/чтения не повторяются: иначе ожидание обходит таймаут размыкателя
+    assert (retry.connect, retry.read) == (0, 0)
+    assert retry.total == weather._HTTP_RETRIES
+    assert set(retry.status_forcelist) == {429, 500, 502, 503, 504}
+    assert retry.allowed_methods == {"GET"}
+    assert adapter._pool_maxsize == weather._HTTP_POOL_SIZE
+    weather.shutdown()
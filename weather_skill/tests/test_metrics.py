@@ -0,0 +1,59 @@
+# weather_skill/tests/test_metrics.py
+import pytest
+
+
+@pytest.fixture
+def metrics(weather, monkeypatch):
+    metrics = weather._Metrics()
+    monkeypatch.setattr(weather, "_metrics", metrics)
+    return metrics
+
+
+def test_disabled_metrics_record_nothing(weather, metrics):
+    assert weather._span("http") is weather._NOOP_SPAN
+    with weather._entry_span("get_weather", "t1"), weather._span("http"):
+        pass
+    weather._observe("decode", 0.1)
+    assert weather.metrics_snapshot() == {}
+
+
+def test_spans_are_grouped_by_entry_point(weather, metrics):
+    weather.enable_metrics()
+    with weather._entry_span("get_weather", "t1"):
+        with weather._span("http"):
+            pass
+        weather._observe("decode", 0.003)
+    weather._observe("http", 0.2)  # вне точки входа — фоновое обновление кэша
+
+    snapshot = weather.metrics_snapshot()
+    assert sorted(snapshot) == ["background", "get_weather"]
+    assert sorted(snapshot["get_weather"]) == ["decode", "http", "total"]
+    decode = snapshot["get_weather"]["decode"]
+    assert (decode["count"], decode["sum"]) == (1, 0.003)
+    assert decode["buckets"]["0.005"] == 1 and sum(decode["buckets"].values()) == 1
+    assert decode["exemplar"] == {"trace_id": "t1", "seconds": 0.003}
+    assert snapshot["background"]["http"]["exemplar"] is None
+
+
+def test_prometheus_buckets_are_cumulative(weather, metrics):
+    for seconds in (0.003, 0.003, 0.2, 20.0):
+        metrics.observe("get_weather", "http", seconds, "t1" if seconds == 20.0 else None)
+
+    lines = weather.metrics_prometheus().splitlines()
+    assert lines[:2] == [
+        "# HELP weather_skill_stage_seconds Latency of weather_skill handler stages.",
+        "# TYPE weather_skill_stage_seconds histogram",
+    ]
+    labels = 'entry="get_weather",stage="http"'
+    buckets = {
+        line.split('le="')[1].split('"')[0]: line.split("} ", 1)[1]
+        for line in lines
+        if line.startswith("weather_skill_stage_seconds_bucket")
+    }
+    assert list(buckets) == [*map(str, weather._METRICS_BUCKETS), "+Inf"]
+    assert buckets["0.0025"] == "0" and buckets["0.005"] == "2" and buckets["0.25"] == "3" and buckets["10.0"] == "3"
+    # exemplar — на последней корзине, со значением последнего замера с trace_id
+    assert buckets["+Inf"] == '4 # {trace_id="t1"} 20.000000'
+    assert f"weather_skill_stage_seconds_sum{{{labels}}} 20.206000" in lines
+    assert f"weather_skill_stage_seconds_count{{{labels}}} 4" in lines
+    assert weather.metrics_prometheus().endswith("\n")
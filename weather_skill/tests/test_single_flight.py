@@ -0,0 +1,111 @@
+# weather_skill/tests/test_single_flight.py
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+@pytest.fixture
+def pool():
+    pool = ThreadPoolExecutor(8)
+    yield pool
+    pool.shutdown(wait=False)
+
+
+def test_concurrent_calls_share_one_upstream_call(weather, pool):
+    flight = weather._SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {"temp": 1}
+
+    futures = [pool.submit(flight.do, "moscow", fetch) for _ in range(8)]
+    time.sleep(0.05)  # followers find the leader's call and wait on it
+    release.set()
+    assert [f.result(5) for f in futures] == [{"temp": 1}] * len(futures)
+    assert len(calls) == 1
+
+
+def test_error_reaches_every_waiter(weather, pool):
+    flight = weather._SingleFlight()
+    release = threading.Event()
+
+    def fetch():
+        release.wait(5)
+        raise ConnectionError("upstream down")
+
+    futures = [pool.submit(flight.do, "moscow", fetch) for _ in range(4)]
+    time.sleep(0.05)
+    release.set()
+    for future in futures:
+        with pytest.raises(ConnectionError):
+            future.result(5)
+
+
+def test_key_is_released_after_the_call(weather):
+    flight = weather._SingleFlight()
+    results = iter([1, 2])
+    assert flight.do("k", lambda: next(results)) == 1
+    assert flight.do("k", lambda: next(results)) == 2
+    assert flight._calls == {}
+
+
+def test_different_keys_do_not_wait_for_each_other(weather, pool):
+    flight = weather._SingleFlight()
+    release = threading.Event()
+    slow = pool.submit(flight.do, "slow", lambda: release.wait(5) and "slow")
+    assert pool.submit(flight.do, "fast", lambda: "fast").result(5) == "fast"
+    release.set()
+    assert slow.result(5) == "slow"
+
+
+def test_async_calls_share_one_task(weather):
+    flight = weather._AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"temp": 1}
+
+    async def scenario():
+        return await asyncio.gather(*[flight.do("moscow", fetch) for _ in range(8)])
+
+    assert asyncio.run(scenario()) == [{"temp": 1}] * 8
+    assert len(calls) == 1
+    assert flight._calls == {}
+
+
+def test_async_cancelled_waiter_does_not_cancel_the_others(weather):
+    flight = weather._AsyncSingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        first = asyncio.ensure_future(flight.do("k", fetch))
+        second = asyncio.ensure_future(flight.do("k", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
+
+
+def test_async_flight_per_event_loop(weather):
+    flight = weather._AsyncSingleFlight()
+
+    async def fetch():
+        return asyncio.get_running_loop()
+
+    first = asyncio.run(flight.do("k", fetch))
+    second = asyncio.run(flight.do("k", fetch))
+    assert first is not second
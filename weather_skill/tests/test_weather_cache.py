@@ -0,0 +1,132 @@
+# weather_skill/tests/test_weather_cache.py
+import asyncio
+import time
+
+import pytest
+
+KEY = ("moscow", "metric", "en")
+
+
+@pytest.fixture
+def cache(weather, clock, monkeypatch):
+    cache = weather._WeatherCache(ttl=60.0, stale_while_revalidate=60.0, stale_if_error=600.0, max_entries=3)
+    monkeypatch.setattr(weather, "_cache", cache)
+    return cache
+
+
+class FakeUpstream:
+    """Подменяет _fetch_weather/_fetch_weather_async: считает вызовы, отвечает по очереди из replies."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    def _next(self):
+        self.calls += 1
+        return self.replies.pop(0) if len(self.replies) > 1 else self.replies[0]
+
+    def __call__(self, api_entry_point, api_key, city):
+        return self._next()
+
+    async def fetch_async(self, api_entry_point, api_key, city):
+        return self._next()
+
+
+def _install(weather, monkeypatch, upstream):
+    monkeypatch.setattr(weather, "_fetch_weather", upstream)
+    monkeypatch.setattr(weather, "_fetch_weather_async", upstream.fetch_async)
+
+
+# --- _WeatherCache ---
+
+
+def test_get_returns_age(weather, cache, clock):
+    cache.put(KEY, {"temp": 1})
+    clock.advance(5)
+    assert cache.get(KEY) == ({"temp": 1}, 5)
+    assert cache.get(("other", "metric", "en")) == (None, 0.0)
+
+
+def test_entry_dropped_after_max_age(weather, cache, clock):
+    cache.put(KEY, {"temp": 1})
+    clock.advance(60 + 600 + 1)  # ttl + max(swr, stale_if_error)
+    assert cache.get(KEY) == (None, 0.0)
+
+
+def test_lru_eviction(weather, cache):
+    for n in range(3):
+        cache.put((f"c{n}", "metric", "en"), {"n": n})
+    cache.get(("c0", "metric", "en"))  # c0 used recently: c1 is the oldest now
+    cache.put(("c3", "metric", "en"), {"n": 3})
+    assert cache.get(("c1", "metric", "en"))[0] is None
+    assert cache.get(("c0", "metric", "en"))[0] == {"n": 0}
+
+
+def test_refresh_marker_is_exclusive(weather, cache):
+    assert cache.begin_refresh(KEY)
+    assert not cache.begin_refresh(KEY)
+    cache.end_refresh(KEY)
+    assert cache.begin_refresh(KEY)
+
+
+# --- _get_weather: ttl / stale-while-revalidate / stale-if-error ---
+
+
+def test_fresh_entry_served_without_upstream(weather, cache, monkeypatch):
+    upstream = FakeUpstream([(True, {"temp": 1})])
+    _install(weather, monkeypatch, upstream)
+    assert weather._get_weather("url", "key", "Tomsk") == (True, {"temp": 1})
+    assert weather._get_weather("url", "key", "Tomsk") == (True, {"temp": 1})
+    assert upstream.calls == 1
+
+
+def test_stale_entry_served_and_revalidated_in_background(weather, cache, clock, monkeypatch):
+    upstream = FakeUpstream([(True, {"temp": 1}), (True, {"temp": 2})])
+    _install(weather, monkeypatch, upstream)
+    weather._get_weather("url", "key", "Tomsk")
+    clock.advance(90)  # ttl < age <= ttl + swr
+
+    assert weather._get_weather("url", "key", "Tomsk") == (True, {"temp": 1})
+    key = weather._cache_key("Tomsk")
+    for _ in range(500):  # the background thread puts the new entry
+        if cache.get(key)[0] == {"temp": 2}:
+            break
+        time.sleep(0.01)
+    assert weather._get_weather("url", "key", "Tomsk") == (True, {"temp": 2})
+    assert upstream.calls == 2
+
+
+def test_stale_if_error(weather, cache, clock, monkeypatch):
+    upstream = FakeUpstream([(True, {"temp": 1}), (False, {"error": "api down"})])
+    _install(weather, monkeypatch, upstream)
+    weather._get_weather("url", "key", "Tomsk")
+    clock.advance(300)  # past swr, within stale_if_error
+
+    assert weather._get_weather("url", "key", "Tomsk") == (True, {"temp": 1})
+    assert upstream.calls == 2
+
+    clock.advance(600)  # past stale_if_error: the error goes through
+    assert weather._get_weather("url", "key", "Tomsk") == (False, {"error": "api down"})
+
+
+def test_failed_fetch_is_not_cached(weather, cache, monkeypatch):
+    upstream = FakeUpstream([(False, {"error": "not found"}), (True, {"temp": 3})])
+    _install(weather, monkeypatch, upstream)
+    assert weather._get_weather("url", "key", "Tomsk")[0] is False
+    assert weather._get_weather("url", "key", "Tomsk") == (True, {"temp": 3})
+    assert upstream.calls == 2
+
+
+def test_async_stale_while_revalidate(weather, cache, clock, monkeypatch):
+    upstream = FakeUpstream([(True, {"temp": 1}), (True, {"temp": 2})])
+    _install(weather, monkeypatch, upstream)
+
+    async def scenario():
+        first = await weather._get_weather_async("url", "key", "Tomsk")
+        clock.advance(90)
+        stale = await weather._get_weather_async("url", "key", "Tomsk")
+        await asyncio.gather(*weather._revalidate_tasks.values())
+        return first, stale, await weather._get_weather_async("url", "key", "Tomsk")
+
+    assert asyncio.run(scenario()) == ((True, {"temp": 1}), (True, {"temp": 1}), (True, {"temp": 2}))
+    assert upstream.calls == 2
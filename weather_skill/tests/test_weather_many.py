@@ -0,0 +1,66 @@
+# weather_skill/tests/test_weather_many.py
+import types
+
+import pytest
+
+ENTRY = "https://owm.invalid/data/2.5/weather"
+
+
+@pytest.mark.parametrize(
+    "entry, url",
+    [
+        (ENTRY, "https://owm.invalid/data/2.5/group"),
+        (ENTRY + "/", "https://owm.invalid/data/2.5/group"),
+        ("http://proxy.local:8080/owm/weather?token=t#x", "http://proxy.local:8080/owm/group?token=t"),
+    ],
+)
+def test_group_url_follows_the_configured_entry_point(weather, entry, url):
+    assert weather._group_url(entry) == url
+
+
+@pytest.fixture
+def batch(weather, monkeypatch):
+    """Конфиг с ключом, пустой кэш и подменённые запросы: /group и по одному городу."""
+    monkeypatch.setattr(weather, "_get_config", lambda: weather._Config("key", ENTRY, None, 4))
+    monkeypatch.setattr(weather, "_cache", weather._WeatherCache(60.0, 0.0, 0.0, 100))
+    calls = types.SimpleNamespace(group=[], single=[])
+
+    def fetch_group(api_entry_point, api_key, ids):
+        calls.group.append(list(ids))
+        return {city_id: (True, {"city": f"id{city_id}", "temp": 1, "description": ""}) for city_id in ids}
+
+    def get_weather(api_entry_point, api_key, city):
+        calls.single.append(city)
+        return True, {"city": city, "temp": 2, "description": ""}
+
+    monkeypatch.setattr(weather, "_fetch_group", fetch_group)
+    monkeypatch.setattr(weather, "_get_weather", get_weather)
+    return calls
+
+
+@pytest.mark.parametrize("cities", ["Berlin", None, 42, ["Berlin", 1]])
+def test_cities_must_be_a_list_of_strings(weather, batch, cities):
+    assert weather.get_weather_many(cities) == {"ok": False, "error": "cities must be a list of strings"}
+    assert batch.group == batch.single == []
+
+
+def test_too_many_cities(weather, batch):
+    cities = [f"city{n}" for n in range(weather._BATCH_MAX_CITIES + 1)]
+    assert weather.get_weather_many(cities) == {"ok": False, "error": f"too many cities (max {weather._BATCH_MAX_CITIES})"}
+    assert batch.single == []
+
+
+def test_blank_cities_only(weather, batch):
+    assert weather.get_weather_many(["", "  "]) == {"ok": False, "error": "missing city"}
+
+
+def test_known_cities_go_through_group_in_chunks(weather, batch, monkeypatch):
+    monkeypatch.setattr(weather, "_GROUP_MAX_IDS", 3)  # по умолчанию = _BATCH_MAX_CITIES, и до разбиения не дойти
+    known = {f"known{n}": n + 1 for n in range(5)}
+    monkeypatch.setattr(weather, "_lookup_city", lambda city: types.SimpleNamespace(id=known[city]) if city in known else None)
+
+    result = weather.get_weather_many([*known, "Nowhere", "known0"])
+    assert result["ok"] and len(result["results"]) == len(known) + 1  # дубль known0 схлопнут
+    assert [len(chunk) for chunk in batch.group] == [3, 2]
+    assert batch.single == ["Nowhere"]
+    assert result["results"][-1] == {"ok": True, "city": "Nowhere", "temp": 2, "description": ""}
@@ -1,7 +1,11 @@
+import atexit
 import json
+import threading
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from adaos.i18n.translator import _
 from adaos.sdk.context import current_skill_path
@@ -9,6 +13,48 @@ from adaos.sdk.output import output
 from adaos.sdk.skill_env import get_env, set_env
 from adaos.sdk.skill_memory import get, set
 
+_http_session: Optional[requests.Session] = None
+_http_lock = threading.Lock()
+
+
+def _get_http_session() -> requests.Session:
+    """Общий keep-alive пул соединений на процесс навыка (http_pool_size, http_retries из env)."""
+    global _http_session
+    if _http_session is None:
+        with _http_lock:
+            if _http_session is None:
+                adapter = HTTPAdapter(
+                    pool_maxsize=int(get_env("http_pool_size") or 10),
+                    # повторяем только ответы 429/5xx: повтор таймаута соединения/чтения
+                    # умножает время ожидания на число попыток
+                    max_retries=Retry(
+                        total=int(get_env("http_retries") or 2),
+                        connect=0,
+                        read=0,
+                        backoff_factor=0.3,
+                        status_forcelist=(429, 500, 502, 503, 504),
+                        allowed_methods=frozenset({"GET"}),
+                        raise_on_status=False,
+                    ),
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _http_session = session
+    return _http_session
+
+
+def shutdown():
+    """Закрывает пул соединений при выгрузке навыка."""
+    global _http_session
+    with _http_lock:
+        if _http_session is not None:
+            _http_session.close()
+            _http_session = None
+
+
+atexit.register(shutdown)
+
 
 def handle(intent: str, entities: dict):
 
@@ -22,7 +68,8 @@ def handle(intent: str, entities: dict):
         if prep_file.exists():
             with open(prep_file, "r", encoding="utf-8") as f:
                 prep_data = json.load(f)
-                resources = prep_data.get("resources", {})
+                # resources of a failed prep (e.g. a rejected API key) are not used
+                resources = prep_data.get("resources", {}) if prep_data.get("status") == "ok" else {}
                 api_key = resources.get("api_key")
                 api_entry_point = resources.get("api_entry_point")
                 default_city = resources.get("default_city")
@@ -43,7 +90,7 @@ def handle(intent: str, entities: dict):
 
     # Make the API request
     try:
-        response = requests.get(
+        response = _get_http_session().get(
             api_entry_point,
             params={"q": city, "appid": api_key, "units": "metric", "lang": "en"},
             timeout=5,
@@ -1,10 +1,16 @@
-import json
-import logging
-from datetime import datetime
 from pathlib import Path
+from typing import Dict, List, Optional
 import requests
 from adaos.i18n.translator import _
 
+# Hypothesis DAG runner and result files — copy of tools/skill_lib/prep_runner.py (python -m tools.vendor)
+from .prep_runner import Hypothesis, Resource, code_hash, prepare
+
+# How long a passed hypothesis stays valid for re-runs with the same inputs (seconds)
+INTERNET_TTL = 3600
+WEATHER_API_TTL = 86400
+WEATHER_API_ENTRY_POINT = "https://api.openweathermap.org/data/2.5/weather"
+
 
 def lang_res():
     return {
@@ -21,87 +27,74 @@ def lang_res():
         "prep.tested_hypotheses": "Tested Hypotheses",
         "prep.failed_header": "Preparation Failed",
         "prep.reason": "Reason",
+        "prep.missing_resource": "Missing resource",
     }
 
 
-def test_internet_access():
+def test_internet_access(session=None, timeout=5):
     try:
-        response = requests.get("https://www.google.com", timeout=5)
+        response = (session or requests).get("https://www.google.com", timeout=timeout)
         return response.status_code == 200
     except Exception:
         return False
 
 
-def test_weather_api(api_key, api_entry_point, city):
+def test_weather_api(api_key, api_entry_point, city, session=None, timeout=5):
     try:
         params = {"q": city, "appid": api_key, "units": "metric"}
-        response = requests.get(api_entry_point, params=params, timeout=5)
+        response = (session or requests).get(api_entry_point, params=params, timeout=timeout)
         return response.status_code == 200
     except Exception:
         return False
 
 
-def run_prep(skill_path: Path):
-    prep_result = {"status": "ok", "timestamp": datetime.utcnow().isoformat(), "resources": {}, "tested_hypotheses": []}
-
-    # Setup logging
-    logs_dir = skill_path / "logs"
-    logs_dir.mkdir(exist_ok=True)
-    logging.basicConfig(filename=logs_dir / "prep.log", level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
-
+def hypotheses() -> List[Hypothesis]:
+    return [
+        Hypothesis(
+            "Internet access",
+            lambda res, session, timeout: test_internet_access(session, timeout),
+            ttl=INTERNET_TTL,
+            log_key="prep.test_internet_access",
+            fail_key="prep.fail_internet",
+        ),
+        Hypothesis(
+            "Weather API access",
+            lambda res, session, timeout: test_weather_api(res["api_key"], res["api_entry_point"], res["default_city"], session, timeout),
+            depends_on=("Internet access",),
+            requires=("api_key", "api_entry_point", "default_city"),
+            ttl=WEATHER_API_TTL,
+            log_key="prep.test_weather_api",
+            fail_key="prep.fail_weather_api",
+        ),
+    ]
+
+
+def resources() -> List[Resource]:
+    return [
+        Resource("api_key", "prep.ask_api_key"),
+        Resource("api_entry_point", None, WEATHER_API_ENTRY_POINT),
+        Resource("default_city", "prep.ask_default_city"),
+    ]
+
+
+def run_prep(skill_path: Path, force: bool = False, answers: Optional[Dict[str, str]] = None, session=None, probes=None):
+    """
+    force ignores the previous prep_result.json; otherwise its resources are reused
+    and hypotheses that are still valid for the same inputs are not re-tested.
+
+    answers switches to non-interactive mode: resources are taken from it (then from
+    the previous run) and never asked with input(). session and probes let batch
+    prep share one HTTP session and one probe cache between skills.
+    """
+    # One keep-alive session shared by all probes, closed when prep finishes
+    own_session = session is None
+    if own_session:
+        session = requests.Session()
     try:
-        # Test internet access
-        logging.info(_("prep.test_internet_access"))
-        internet_ok = test_internet_access()
-        prep_result["tested_hypotheses"].append({"name": "Internet access", "result": internet_ok, "critical": True})
-        if not internet_ok:
-            prep_result["status"] = "failed"
-            prep_result["reason"] = _("prep.fail_internet")
-            return prep_result
-
-        # Collect API key
-        api_key = input(_("prep.ask_api_key"))
-        prep_result["resources"]["api_key"] = api_key
-
-        # Set default API entry point
-        api_entry_point = "https://api.openweathermap.org/data/2.5/weather"
-        prep_result["resources"]["api_entry_point"] = api_entry_point
-
-        # Collect default city
-        default_city = input(_("prep.ask_default_city"))
-        prep_result["resources"]["default_city"] = default_city
-
-        # Test weather API
-        logging.info(_("prep.test_weather_api"))
-        weather_api_ok = test_weather_api(api_key, api_entry_point, default_city)
-        prep_result["tested_hypotheses"].append({"name": "Weather API access", "result": weather_api_ok, "critical": True})
-        if not weather_api_ok:
-            prep_result["status"] = "failed"
-            prep_result["reason"] = _("prep.fail_weather_api")
-            return prep_result
-
-    except Exception as e:
-        logging.error(_("prep.unexpected_error"), exc_info=True)
-        prep_result["status"] = "failed"
-        prep_result["reason"] = _("prep.unexpected_error")
-        return prep_result
-
-    # Write output files with UTF-8 encoding
-    with open(skill_path / "prep_result.json", "w", encoding="utf-8") as f:
-        json.dump(prep_result, f, indent=2)
-
-    with open(skill_path / "prep_result_prompt.md", "w", encoding="utf-8") as f:
-        if prep_result["status"] == "ok":
-            f.write(f"# {_('prep.summary_header')}\n\n")
-            f.write(f"## {_('prep.collected_resources')}\n")
-            for key, value in prep_result["resources"].items():
-                f.write(f"- **{key}**: {value}\n")
-            f.write(f"\n## {_('prep.tested_hypotheses')}\n")
-            for hypothesis in prep_result["tested_hypotheses"]:
-                status = "✅" if hypothesis["result"] else "❌"
-                f.write(f"- {status} {hypothesis['name']}\n")
-        else:
-            f.write(f"# {_('prep.failed_header')}\n\n")
-            f.write(f"**{_('prep.reason')}**: {prep_result['reason']}\n")
-
-    return prep_result
+        return prepare(
+            skill_path, hypotheses(), resources(), session,
+            translate=_, code=code_hash(Path(__file__)), force=force, answers=answers, probes=probes,
+        )
+    finally:
+        if own_session:
+            session.close()